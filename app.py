@@ -80,6 +80,19 @@ selection = st.sidebar.radio(
     key="current_page"
 )
 
+# 后台任务状态（简历分析等批处理在服务端运行，切换栏目不会中断）
+try:
+    from resume_core.jobs import get_job_manager
+    active_jobs = get_job_manager().jobs(active_only=True)
+except ImportError:
+    active_jobs = []
+if active_jobs:
+    st.sidebar.divider()
+    st.sidebar.caption(f"⏳ 后台任务 {len(active_jobs)} 个")
+    for job in active_jobs:
+        snap = job.snapshot(partial_since=None, log_tail=0)
+        st.sidebar.progress(snap['progress'], text=f"{snap['name']} · {snap['stage']} {snap['current']}/{snap['total']}")
+
 # 5. 页面路由逻辑
 
 # --- 🏠 首页 ---
@@ -1,77 +1,34 @@
 import streamlit as st
 import pandas as pd
-import docx
-import json
-import io
-import time
-import zipfile
 import os
-import asyncio
-import aiohttp
-import nest_asyncio
-import re  # 用于底层正则提取
-import struct # 新增：用于底层解剖二进制流
+import re
+import math
+import time
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any, Tuple
-import hashlib
-import pickle
-from dataclasses import dataclass
-
-# 应用 nest_asyncio 以支持在 Streamlit 中运行异步代码
-nest_asyncio.apply()
+from typing import Dict
+
+from resume_core.extract import PDF_SUPPORT, OLEFILE_SUPPORT, TESSERACT_SUPPORT
+from resume_core.archive import extract_archive_files, ARCHIVE_EXTENSIONS
+from resume_core.identity import ContentIndex, content_hash
+from resume_core.ledger import IngestionLedger, upload_key
+from resume_core.jobs import get_job_manager
+from resume_core.journal import JobJournal, list_jobs, STATUS_RUNNING
+from resume_core.spool import BlobSpool, SpoolQuotaExceeded, DEFAULT_QUOTA_MB
+from resume_core.sandbox import DEFAULT_PARSE_TIMEOUT, DEFAULT_MEMORY_LIMIT_MB
+from resume_core.pipeline import DEFAULT_CONFIG, run_resume_job
+from resume_core.rules import rescore_frame
+from resume_core.results_view import ResultTable, ResultQuery, LONG_TEXT_COLUMNS
+from resume_core.store import CandidateStore
+from resume_core.fulltext import FullTextIndex, FTS5_SUPPORT
+from resume_core.export import available_formats, export_bytes, debug_archive_bytes, has_debug, EXPORT_MIME, DEBUG_MIME
 
 # ============================
 # 可选依赖加载与状态监测
 # ============================
-try:
-    import fitz  # PyMuPDF
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
+if not PDF_SUPPORT:
     st.error("请安装 pymupdf: pip install pymupdf")
     st.stop()
 
-try:
-    import docx
-    DOCX_SUPPORT = True
-except ImportError:
-    DOCX_SUPPORT = False
-
-try:
-    import olefile
-    OLEFILE_SUPPORT = True
-except ImportError:
-    OLEFILE_SUPPORT = False
-
-try:
-    import rarfile
-    RAR_SUPPORT = True
-except ImportError:
-    RAR_SUPPORT = False
-
-try:
-    import py7zr
-    SEVENZ_SUPPORT = True
-except ImportError:
-    SEVENZ_SUPPORT = False
-
-# OCR 支持（可选）- 使用DeepSeek OCR API via 硅基流动
-OCR_SUPPORT = True  # 默认启用DeepSeek OCR
-OCR_ENGINE = "deepseek"  # 默认使用deepseek-ocr
-
-try:
-    import pytesseract
-    from PIL import Image
-    # 测试OCR是否真正可用
-    try:
-        pytesseract.get_tesseract_version()
-        TESSERACT_SUPPORT = True
-    except Exception:
-        TESSERACT_SUPPORT = False
-except ImportError:
-    TESSERACT_SUPPORT = False
-
 # ============================
 # 配置区
 # ============================
@@ -82,14 +39,13 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# 可配置参数 - 优化速度
-DEFAULT_CONFIG = {
-    "target_city": "",
-    "max_workers": 20,
-    "api_timeout": 60,  # 缩短超时时间
-    "enable_cache": True,
-    "max_concurrent_api": 100,  # 并发数
-    "api_retry": 2,  # 重试次数
+LIVE_REFRESH_INTERVAL = 2.0  # 后台任务运行时任务面板的刷新间隔(秒)，只重跑任务面板
+LIVE_TABLE_COLUMNS = ['文件名', '处理状态', '姓名', '任教学科', '本科学校', '本科层次', '综合评分']
+HISTORY_LIMIT = 200      # 历史候选人库每次显示的行数
+SEARCH_LIMIT = 20        # 全文检索每次显示的简历数
+HISTORY_COLUMNS = {
+    'filename': '文件名', 'uploaded_at': '上传时间', 'name': '姓名', 'phone': '手机号', 'subject': '任教学科',
+    'bachelor_school': '本科学校', 'employer': '现工作单位', 'score': '综合评分', 'detail': '评分详情', 'status': '处理状态',
 }
 
 # 立即初始化所有 session_state 变量
@@ -104,1436 +60,236 @@ if not OLEFILE_SUPPORT:
     st.sidebar.warning("未检测到 `olefile` 库，深度 .doc 解析功能已降级。建议执行 `pip install olefile`")
 
 # ============================
-# 缓存系统
-# ============================
-class ResumeCache:
-    """基于内存和pickle的缓存系统"""
-    def __init__(self, cache_dir: str = ".resume_cache"):
-        self.cache_dir = cache_dir
-        os.makedirs(cache_dir, exist_ok=True)
-    
-    def _get_hash(self, data: bytes) -> str:
-        return hashlib.sha256(data).hexdigest()[:16]
-    
-    def get(self, data: bytes) -> Dict:
-        try:
-            if not st.session_state.config.get('enable_cache', True):
-                return None
-        except:
-            return None
-        
-        key_hash = self._get_hash(data)
-        cache_path = os.path.join(self.cache_dir, f"{key_hash}.pkl")
-        
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'rb') as f:
-                    cached = pickle.load(f)
-                    if time.time() - cached['timestamp'] < 86400:
-                        return cached['data']
-            except:
-                pass
-        return None
-    
-    def set(self, data: bytes, value: Dict):
-        try:
-            if not st.session_state.config.get('enable_cache', True):
-                return
-        except:
-            return
-        
-        key_hash = self._get_hash(data)
-        cache_path = os.path.join(self.cache_dir, f"{key_hash}.pkl")
-        
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump({'timestamp': time.time(), 'data': value}, f)
-        except:
-            pass
-
-cache = ResumeCache()
-
-# ============================
-# 终极编码修复：精准解决跨平台与压缩包乱码
-# ============================
-
-def fix_garbled_filename(name: str) -> str:
-    """
-    终极乱码修复算法：严格逆转错乱编码，完美还原回真实中文。
-    核心原理：被损坏的其实是解码过程。我们需要将乱码按它错误的编码“反转回字节流”，再按正确的规则重新解剖。
-    """
-    if not name or not isinstance(name, str):
-        return name
-        
-    # 定义高频错乱映射字典: (底层被强制读取的错误格式 -> 应该使用的真实格式)
-    repair_pairs = [
-        ('cp437', 'utf-8'),    # 典型：τ«ÇσÄå -> UTF-8 (Mac/Linux 在 Windows 下的无标识解压)
-        ('gbk', 'utf-8'),      # 典型：鏉ㄦ湞鏅 -> UTF-8 (纯正UTF-8字节流被误当GBK读取)
-        ('latin1', 'utf-8'),   # 常见通用单字节错误读取格式
-        ('cp437', 'gbk'),      # 早期 ZIP 默认 CP437，实际是 GBK 编码
-        ('latin1', 'gbk'),
-        ('mac_roman', 'utf-8'),# Mac 特有错误格式
-    ]
-
-    best_result = name
-    
-    # 评分函数：评估转换结果的“健康度”
-    # 规则：有效汉字越多越好，乱码符号（拉丁目、希腊字母、特殊绘图符）越少越好
-    def score_text(text: str) -> int:
-        chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fa5')
-        garbled_chars = sum(1 for c in text if 
-                            ('\u0080' <= c <= '\u024F') or  
-                            ('\u0370' <= c <= '\u03FF') or  
-                            ('\u2000' <= c <= '\u206F') or  
-                            ('\u2500' <= c <= '\u259F'))
-        return chinese_chars * 10 - garbled_chars * 5
-
-    best_score = score_text(name)
-
-    # 前置风控：如果原本就是健康的纯英文拼音或纯中文，则拒绝执行转换以免破坏原数据
-    if best_score >= 0 and sum(1 for c in name if ('\u0080' <= c <= '\u024F' or '\u0370' <= c <= '\u03FF')) == 0:
-        return name
-
-    # 循环尝试严格流逆转
-    for encode_as, decode_as in repair_pairs:
-        try:
-            # 1. 严格双向流校验：反向抽取回原始错误字节流
-            raw_bytes = name.encode(encode_as)
-            # 2. 重新按正确的编码格式完美解剖
-            decoded = raw_bytes.decode(decode_as)
-            
-            current_score = score_text(decoded)
-            
-            # 3. 找到更完美、更合理的中文解析结果
-            if current_score > best_score:
-                best_score = current_score
-                best_result = decoded
-        except (UnicodeEncodeError, UnicodeDecodeError):
-            continue
-
-    return best_result
-
-def get_zip_filenames_raw(zf: zipfile.ZipFile) -> list:
-    """获取ZIP文件名列表，并对无标识的文件名执行深度乱码逆转"""
-    result = []
-    for info in zf.infolist():
-        original = info.filename
-        flag_utf8 = (info.flag_bits & 0x800) != 0
-        
-        # 如果 ZIP 规范内明确标记了 UTF-8 (例如较新版本打包工具)，通常本身就是正常的
-        if flag_utf8:
-            result.append((original, original))
-            continue
-        
-        # 核心：Python 对无标识文件默认使用 cp437 解码导致了 original 必定乱码，送入修复工厂逆转
-        fixed = fix_garbled_filename(original)
-        result.append((original, fixed))
-    
-    return result
-
-# ============================
-# OCR 后处理清洗
-# ============================
-def clean_ocr_text(text: str) -> str:
-    """清洗OCR结果中的坐标标签、HTML标签、孤立符号和重复内容"""
-    if not text or text.startswith("DeepSeek OCR") or text.startswith("OCR"):
-        return text
-    
-    # 1. 移除 DeepSeek OCR 的坐标标签: <|ref|>title<|/ref|><|det|>[[...]]<|/det|>
-    text = re.sub(r'<\|ref\|>.*?<\|/ref\|>', '', text)
-    text = re.sub(r'<\|det\|>\[\[.*?\]\]<\|/det\|>', '', text)
-    text = re.sub(r'<\|ref\|>|<\|/ref\|>|<\|det\|>|<\|/det\|>', '', text)
-    
-    # 2. 将 <br> 替换为换行
-    text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
-    
-    # 3. 移除孤立垃圾符号行（行内几乎没有有效字符）
-    lines = text.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
-        # 如果一行里有效字符（中文、英文单词、数字）少于2个，且长度很短，则丢弃
-        valid_chars = re.findall(r'[\u4e00-\u9fa5a-zA-Z0-9]', stripped)
-        if len(valid_chars) < 2 and len(stripped) <= 5:
-            continue
-        # 过滤没有中文且以特殊符号开头的短垃圾行（如 -responsive., np., ҳ ）
-        if len(re.findall(r'[\u4e00-\u9fa5]', stripped)) == 0 and re.match(r'^[^a-zA-Z0-9]', stripped) and len(stripped) <= 20:
-            continue
-        cleaned_lines.append(line)
-    
-    # 4. 去重：连续完全相同的行最多保留2次
-    deduped_lines = []
-    prev_line = None
-    repeat_count = 0
-    for line in cleaned_lines:
-        if line == prev_line:
-            repeat_count += 1
-            if repeat_count <= 1:
-                deduped_lines.append(line)
-        else:
-            repeat_count = 0
-            prev_line = line
-            deduped_lines.append(line)
-    
-    return '\n'.join(deduped_lines)
-
-
-# ============================
-# DeepSeek OCR 函数 (硅基流动)
-# ============================
-async def deepseek_ocr_image(image_bytes: bytes, api_key: str, prompt: str = "请识别图片中的所有文字内容，保持原有格式和排版。") -> str:
-    """使用DeepSeek OCR API (硅基流动) 识别图片中的文字"""
-    import base64
-    
-    url = "https://api.siliconflow.cn/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    # 将图片转换为base64
-    base64_image = base64.b64encode(image_bytes).decode('utf-8')
-    
-    # 检测图片格式
-    image_format = "png"
-    if image_bytes[:2] == b'\xff\xd8':
-        image_format = "jpeg"
-    elif image_bytes[:4] == b'\x89PNG':
-        image_format = "png"
-    elif image_bytes[:4] == b'GIF8':
-        image_format = "gif"
-    elif image_bytes[:4] == b'RIFF':
-        image_format = "webp"
-    
-    payload = {
-        "model": "deepseek-ai/DeepSeek-OCR",
-        "messages": [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/{image_format};base64,{base64_image}"
-                        }
-                    }
-                ]
-            }
-        ],
-        "temperature": 0.1,
-        "max_tokens": 4000
-    }
-    
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    return f"DeepSeek OCR失败 {response.status}: {error_text[:200]}"
-                
-                data = await response.json()
-                return clean_ocr_text(data['choices'][0]['message']['content'])
-    except Exception as e:
-        return f"DeepSeek OCR异常: {str(e)}"
-
-
-def deepseek_ocr_image_sync(image_bytes: bytes, api_key: str, prompt: str = "请识别图片中的所有文字内容，保持原有格式和排版。") -> str:
-    """同步版本的DeepSeek OCR"""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return clean_ocr_text(loop.run_until_complete(deepseek_ocr_image(image_bytes, api_key, prompt)))
-
-
-# ============================
-# 文件解析函数
+# 主界面
 # ============================
-@st.cache_data(ttl=3600, show_spinner=False)
-def extract_text_from_pdf_cached(file_bytes: bytes, use_ocr: bool = True, api_key: str = None) -> str:
-    """从PDF提取文本（带缓存），支持OCR"""
+def remember_job_id(job_id: str):
+    """把当前任务ID写进地址栏参数，刷新页面后仍能找到要继续的任务"""
+    st.session_state.job_id = job_id
     try:
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-            text = ""
-            image_count = 0
-            for page in doc:
-                page_text = page.get_text()
-                text += page_text + "\n"
-                # 检测页面中是否有图片
-                image_list = page.get_images()
-                if image_list:
-                    image_count += len(image_list)
-            
-            # 如果启用了OCR且文本太短/检测到图片，尝试OCR
-            should_ocr = use_ocr and api_key and (len(text.strip()) < 100 or image_count > 0)
-            if should_ocr:
-                try:
-                    loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                ocr_text = loop.run_until_complete(ocr_pdf_async(file_bytes, api_key))
-                if not ocr_text.startswith("OCR失败") and not ocr_text.startswith("OCR未识别") and not ocr_text.startswith("OCR不可用"):
-                    text += "\n\n[PDF OCR内容]\n" + ocr_text
-                else:
-                    text += "\n\n[PDF OCR结果: " + ocr_text + "]"
-            
-            # 针对混合PDF（文字层完整但顶部姓名/标题为图片）进行顶部OCR补充
-            if use_ocr and api_key and len(text.strip()) > 100:
-                top_ocr_text = ocr_pdf_top_region(file_bytes, api_key)
-                if top_ocr_text and not top_ocr_text.startswith("顶部OCR失败") and len(top_ocr_text.strip()) > 10:
-                    text = "[PDF顶部补充OCR]\n" + top_ocr_text + "\n\n[PDF正文提取]\n" + text
-            
-            return text
-    except Exception as e:
-        return f"PDF解析失败: {str(e)}"
-
-def ocr_pdf(file_bytes: bytes, api_key: str = None) -> str:
-    """对PDF进行OCR识别 - 支持DeepSeek OCR和Tesseract"""
-    text = ""
-    
-    try:
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-            for page_num, page in enumerate(doc):
-                # 将页面渲染为高清图片
-                pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
-                img_bytes = pix.tobytes("png")
-                
-                page_text = ""
-                # 优先使用DeepSeek OCR API
-                if api_key and OCR_ENGINE == "deepseek":
-                    page_text = deepseek_ocr_image_sync(
-                        img_bytes, 
-                        api_key, 
-                        prompt="请识别这张简历图片中的所有文字内容，包括姓名、联系方式、教育背景、工作经历等，保持原有格式。"
-                    )
-                    # 如果DeepSeek失败，尝试tesseract
-                    if page_text.startswith("DeepSeek OCR") and TESSERACT_SUPPORT:
-                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                        page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
-                elif TESSERACT_SUPPORT:
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
-                else:
-                    return "OCR不可用: 未配置API Key或安装Tesseract"
-                
-                if page_text.strip() and len(page_text.strip()) > 10:
-                    text += f"\n--- 第{page_num+1}页 ---\n" + page_text
-        
-        return text if text.strip() else "OCR未识别到文字"
-    except Exception as e:
-        return f"OCR失败: {str(e)}"
-
-
-def ocr_pdf_top_region(file_bytes: bytes, api_key: str = None) -> str:
-    """对PDF每页顶部区域进行OCR补充，用于捕获混合PDF中的图片型标题/姓名"""
-    text = ""
-    try:
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-            for page_num, page in enumerate(doc):
-                rect = page.rect
-                top_rect = fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * 0.30)
-                pix = page.get_pixmap(matrix=fitz.Matrix(3, 3), clip=top_rect)
-                img_bytes = pix.tobytes("png")
-                page_text = deepseek_ocr_image_sync(
-                    img_bytes,
-                    api_key,
-                    prompt="请识别这张简历图片顶部的文字内容，包括姓名、联系方式、标题等，保持原有格式。"
-                )
-                if page_text and not page_text.startswith("DeepSeek OCR") and not page_text.startswith("OCR") and len(page_text.strip()) > 5:
-                    text += f"\n--- 第{page_num+1}页顶部 ---\n" + page_text
-        return text
-    except Exception as e:
-        return f"顶部OCR失败: {str(e)}"
-
-
-async def ocr_pdf_async(file_bytes: bytes, api_key: str = None) -> str:
-    """对PDF进行异步并发OCR识别 - 优化多页图片PDF处理速度"""
-    text = ""
-    
-    try:
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-            semaphore = asyncio.Semaphore(5)  # 单PDF最多5页并发OCR
-            
-            async def ocr_one_page(page_num: int, page):
-                async with semaphore:
-                    pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
-                    img_bytes = pix.tobytes("png")
-                    
-                    page_text = ""
-                    if api_key and OCR_ENGINE == "deepseek":
-                        page_text = await deepseek_ocr_image(
-                            img_bytes,
-                            api_key,
-                            prompt="请识别这张简历图片中的所有文字内容，包括姓名、联系方式、教育背景、工作经历等，保持原有格式。"
-                        )
-                        if page_text.startswith("DeepSeek OCR") and TESSERACT_SUPPORT:
-                            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                            page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
-                    elif TESSERACT_SUPPORT:
-                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                        page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
-                    else:
-                        return page_num, "OCR不可用"
-                    
-                    return page_num, page_text
-            
-            tasks = [ocr_one_page(i, page) for i, page in enumerate(doc)]
-            page_results = await asyncio.gather(*tasks)
-            page_results.sort(key=lambda x: x[0])
-            
-            for page_num, page_text in page_results:
-                if page_text != "OCR不可用" and page_text.strip() and len(page_text.strip()) > 10:
-                    text += f"\n--- 第{page_num+1}页 ---\n" + page_text
-        
-        return text if text.strip() else "OCR未识别到文字"
-    except Exception as e:
-        return f"OCR失败: {str(e)}"
-
-
-def extract_images_from_docx(file_bytes: bytes) -> List[bytes]:
-    """从DOCX文件中提取图片"""
-    images = []
-    try:
-        import zipfile
-        from io import BytesIO
-        
-        # DOCX实际上是zip文件
-        with zipfile.ZipFile(BytesIO(file_bytes), 'r') as zf:
-            for name in zf.namelist():
-                if name.startswith('word/media/'):
-                    images.append(zf.read(name))
+        st.query_params["job"] = job_id
     except Exception:
         pass
-    return images
 
 
-def ocr_docx_images(file_bytes: bytes, api_key: str = None) -> str:
-    """对DOCX中的图片进行OCR识别"""
-    if not api_key:
-        return ""
-    
-    images = extract_images_from_docx(file_bytes)
-    if not images:
-        return ""
-    
-    ocr_texts = []
-    for i, img_bytes in enumerate(images[:10]):  # 最多处理10张图片
-        try:
-            text = deepseek_ocr_image_sync(
-                img_bytes,
-                api_key,
-                prompt="请识别这张图片中的所有文字内容，如果是简历内容请完整提取。"
-            )
-            if not text.startswith("DeepSeek OCR"):
-                ocr_texts.append(f"[图片{i+1}]\n{text}")
-        except Exception:
-            continue
-    
-    return "\n\n".join(ocr_texts)
-
-def extract_text_from_pdf(file_bytes: bytes, use_ocr: bool = True, api_key: str = None) -> str:
-    """优先从缓存获取PDF解析结果"""
-    cached = cache.get(file_bytes)
-    if cached and 'pdf_text' in cached:
-        return cached['pdf_text']
-    
-    result = extract_text_from_pdf_cached(file_bytes, use_ocr, api_key)
-    cache.set(file_bytes, {'pdf_text': result})
-    return result
-
-
-# ==========================================
-# 文本去重工具函数
-# ==========================================
-def deduplicate_text(text: str) -> str:
-    """
-    去除文本中的连续重复段落。
-    某些简历DOCX文件中内容会被重复多次（如文本框+正文同时存在），
-    此函数用于去除这些重复，保留第一次出现的内容。
-    """
-    if not text or len(text) < 50:
-        return text
-    
-    lines = text.split('\n')
-    seen_paragraphs = set()
-    result_lines = []
-    
-    def normalize(s: str) -> str:
-        """归一化字符串用于比较"""
-        # 去除所有空白字符和常见标点
-        return re.sub(r'[\s\/\.\,\:\;\、\，。\(\)（）@\-]', '', s)
-    
-    def is_similar(s1: str, s2: str) -> bool:
-        """检查两个字符串是否相似（用于检测重复内容）"""
-        if not s1 or not s2:
-            return False
-        n1, n2 = normalize(s1), normalize(s2)
-        # 如果归一化后完全相同，则是重复
-        if n1 == n2:
-            return True
-        # 如果一个是另一个的子串且长度超过80%，也认为是重复
-        if len(n1) > 50 and len(n2) > 50:
-            if n1 in n2 or n2 in n1:
-                return True
-            # 计算相似度（共同子串长度比例）
-            shorter, longer = (n1, n2) if len(n1) < len(n2) else (n2, n1)
-            if len(longer) > 0 and len(shorter) / len(longer) > 0.8:
-                # 检查shorter是否是longer的前缀或后缀
-                if longer.startswith(shorter) or longer.endswith(shorter):
-                    return True
+def submit_resume_job(journal: JobJournal, api_key: str, use_ocr: bool, debug_mode: bool):
+    """把批处理提交到后台任务管理器，任务ID与任务日志ID一致"""
+    manager = get_job_manager()
+    existing = manager.get(journal.job_id)
+    if existing is None or not existing.is_active:
+        config = dict(st.session_state.config, use_ocr=use_ocr, debug_mode=debug_mode)
+        manager.submit(
+            run_resume_job, journal.load_items(), api_key, config, journal,
+            name=f"简历分析 {len(journal.manifest()['items'])} 份", job_id=journal.job_id
+        )
+    st.session_state.active_job_id = journal.job_id
+    remember_job_id(journal.job_id)
+
+
+@st.fragment(run_every=LIVE_REFRESH_INTERVAL)
+def render_live_job(job_id: str):
+    """运行中的任务：进度、正在提取的字段、已完成的结果表。按固定间隔只重跑本片段，任务结束后整页重跑转入结果"""
+    job = get_job_manager().get(job_id)
+    if job is None or not job.is_active:
+        st.rerun()
+    # 已完成的结果行按任务缓存在会话中，每次刷新只取新增的部分
+    cached = st.session_state.get('live_rows')
+    if cached is None or cached[0] != job_id:
+        cached = st.session_state.live_rows = (job_id, [])
+    rows = cached[1]
+    snap = job.snapshot(partial_since=len(rows))
+    rows.extend(snap['partial'])
+    
+    st.subheader("⏳ 后台处理中")
+    st.progress(snap['progress'], text=f"{snap['stage']} {snap['current']}/{snap['total']} · 已用时 {snap['elapsed']:.0f}s")
+    st.caption(f"🗂️ 任务ID: `{job_id}`（可切换到其它栏目或关闭页面，任务在服务端继续运行）")
+    if st.button("⏹️ 停止", disabled=snap['cancel_requested'],
+                 help="进行中的解析和 AI 请求立即中止，已完成的简历照常评分并显示；剩余部分可在「未完成任务」中继续"):
+        job.cancel()
+    if snap['live']:
+        # 流式提取中：字段边解析边显示
+        st.caption(f"🤖 正在提取 {len(snap['live'])} 份")
+        live_df = pd.DataFrame([{'文件名': name, **fields} for name, fields in snap['live'].items()])
+        st.dataframe(live_df, use_container_width=True, height=min(250, 38 + 35 * len(live_df)))
+    if rows:
+        st.caption(f"已完成 {len(rows)} 份，按综合评分排序，处理中持续追加（每 {LIVE_REFRESH_INTERVAL:.0f} 秒刷新）")
+        partial_df = pd.DataFrame(rows)
+        if '综合评分' in partial_df.columns:
+            partial_df = partial_df.sort_values('综合评分', ascending=False, na_position='last')
+        partial_cols = [c for c in LIVE_TABLE_COLUMNS if c in partial_df.columns]
+        st.dataframe(partial_df[partial_cols], use_container_width=True, height=350, hide_index=True)
+    with st.expander("📜 运行日志"):
+        st.text("\n".join(snap['logs']))
+
+
+def render_job_panel(job_id: str) -> bool:
+    """显示后台任务进度与部分结果；任务结束时把结果转入会话。返回任务是否仍在运行"""
+    job = get_job_manager().get(job_id) if job_id else None
+    if job is None:
         return False
-    
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            result_lines.append(line)
-            continue
-        
-        # 对短行（少于20字符）使用精确匹配
-        if len(stripped) < 20:
-            key = stripped
-            if key not in seen_paragraphs:
-                seen_paragraphs.add(key)
-                result_lines.append(line)
-        else:
-            # 对长行使用相似度匹配
-            # 首先检查归一化后是否已存在
-            norm_key = normalize(stripped)
-            if norm_key in seen_paragraphs:
-                continue  # 跳过重复
-            
-            # 检查是否与已见过的长行相似
-            is_dup = False
-            for seen in list(seen_paragraphs):
-                if len(seen) > 50 and is_similar(stripped, seen):
-                    is_dup = True
-                    break
-            
-            if not is_dup:
-                seen_paragraphs.add(norm_key)
-                result_lines.append(line)
-    
-    return '\n'.join(result_lines)
-
-
-# ==========================================
-# 终极融合版：DOCX/DOC 解析
-# 结合了 OLE2底层穿透 与 原有的降级回退机制
-# ==========================================
-def extract_text_from_docx(file_bytes: bytes, file_name: str = "", use_ocr: bool = True, api_key: str = None) -> str:
-    """终极增强版 DOCX/DOC 解析：多路并发降级机制处理"""
-    text = ""
-    
-    # 【路口1】处理现代 .docx 格式 (高精度保持段落与表格的顺序)
-    # 增强版：提取文本框内容，处理简历模板中常见的文本框结构
-    if DOCX_SUPPORT and file_name.lower().endswith('.docx'):
-        try:
-            from docx.oxml.table import CT_Tbl
-            from docx.oxml.text.paragraph import CT_P
-            from docx.table import Table
-            from docx.text.paragraph import Paragraph
-            
-            doc = docx.Document(io.BytesIO(file_bytes))
-            
-            # 方法1: 标准遍历（段落+表格）
-            lines = []
-            for child in doc.element.body.iterchildren():
-                if isinstance(child, CT_P):
-                    p = Paragraph(child, doc)
-                    if p.text.strip():
-                        lines.append(p.text.strip())
-                elif isinstance(child, CT_Tbl):
-                    table = Table(child, doc)
-                    lines.append("")
-                    for i, row in enumerate(table.rows):
-                        row_data = [cell.text.replace('\n', ' ').replace('\r', '').replace('|', '｜').strip() for cell in row.cells]
-                        lines.append("| " + " | ".join(row_data) + " |")
-                        if i == 0:
-                            lines.append("|" + "|".join(["---"] * len(row.cells)) + "|")
-                    lines.append("")
-            
-            text = "\n".join(lines)
-            
-            # 方法2: 如果标准方法提取内容太少，尝试提取文本框
-            if len(text.strip()) < 100:
-                # 使用底层XML提取文本框内容
-                try:
-                    import xml.etree.ElementTree as ET
-                    root = ET.fromstring(doc.element.xml)
-                    ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-                    
-                    txbx_lines = []
-                    # 查找所有文本框内容
-                    for txbx in root.findall('.//w:txbxContent', ns):
-                        txbx_texts = []
-                        for t in txbx.findall('.//w:t', ns):
-                            if t.text:
-                                txbx_texts.append(t.text)
-                        if txbx_texts:
-                            txbx_lines.append(''.join(txbx_texts))
-                    
-                    # 也查找所有段落（包括文本框外的）
-                    for p in root.findall('.//w:p', ns):
-                        p_texts = []
-                        for t in p.findall('.//w:t', ns):
-                            if t.text:
-                                p_texts.append(t.text)
-                        if p_texts:
-                            line = ''.join(p_texts).strip()
-                            if line and line not in txbx_lines:  # 避免重复
-                                txbx_lines.append(line)
-                    
-                    if len('\n'.join(txbx_lines).strip()) > 50:
-                        text = '\n'.join(txbx_lines)
-                except Exception:
-                    pass
-            
-            if len(text.strip()) > 50: 
-                return deduplicate_text(text)
-        except Exception: pass
-    
-    # 【路口1.5】图片背景 DOCX 的 OCR 处理（将 DOCX 渲染为图片后识别）
-    if use_ocr and api_key and len(text.strip()) < 100 and file_name.lower().endswith('.docx') and PDF_SUPPORT:
-        try:
-            ocr_text = ""
-            with fitz.open(stream=file_bytes, filetype="docx") as doc:
-                for page_num, page in enumerate(doc):
-                    pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
-                    img_bytes = pix.tobytes("png")
-                    page_text = deepseek_ocr_image_sync(
-                        img_bytes,
-                        api_key,
-                        prompt="请识别这张简历图片中的所有文字内容，包括姓名、联系方式、教育背景、工作经历等，保持原有格式。"
-                    )
-                    if page_text.startswith("DeepSeek OCR") and TESSERACT_SUPPORT:
-                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                        page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
-                    if page_text and not page_text.startswith("DeepSeek OCR") and not page_text.startswith("OCR") and len(page_text.strip()) > 10:
-                        ocr_text += f"\n--- 第{page_num+1}页 ---\n" + page_text
-            if ocr_text.strip():
-                return deduplicate_text(ocr_text.strip())
-        except Exception as e:
-            text += f"\n[DOCX OCR尝试失败: {str(e)}]"
-
-    # 【路口2】核心增强：利用 olefile 定向解剖原生 .doc (OLE2格式)
-    if file_name.lower().endswith('.doc') and OLEFILE_SUPPORT:
-        bio = io.BytesIO(file_bytes)
-        try:
-            if olefile.isOleFile(bio):
-                with olefile.OleFileIO(bio) as ole:
-                    meta_lines = []
-                    # A. 提取隐藏元数据 (背调辅助)
-                    try:
-                        meta = ole.get_metadata()
-                        if meta.author: meta_lines.append(f"作者: {meta.author.decode('utf-8','ignore') if isinstance(meta.author, bytes) else meta.author}")
-                        if meta.creating_application: meta_lines.append(f"应用: {meta.creating_application.decode('utf-8','ignore') if isinstance(meta.creating_application, bytes) else meta.creating_application}")
-                        if meta.last_printed: meta_lines.append(f"最后打印日期: {meta.last_printed}")
-                    except: pass
-                    
-                    header = "【文档元数据】\n" + "\n".join(meta_lines) + "\n\n【正文提取】\n" if meta_lines else ""
-                    
-                    # B. 定向提取 WordDocument 数据流（绕过图片、对象池）
-                    if ole.exists('WordDocument'):
-                        stream = ole.openstream('WordDocument')
-                        raw_data = stream.read()
-                        
-                        # 解析 FIB (File Information Block) 指针实现物理级穿透
-                        if len(raw_data) > 0x20:
-                            wIdent = struct.unpack('<H', raw_data[0:2])[0]
-                            if wIdent == 0xA5EC: # 合法DOC特征码
-                                fcMin = struct.unpack('<I', raw_data[0x18:0x1C])[0]
-                                mac = struct.unpack('<I', raw_data[0x1C:0x20])[0]
-                                
-                                if fcMin < len(raw_data) and mac <= len(raw_data) and fcMin < mac:
-                                    text_data = raw_data[fcMin:mac]
-                                    # 智能解码：UTF-16LE 对应 Word 的 Unicode 存储，GB18030 对应旧版 ANSI
-                                    try:
-                                        decoded = text_data.decode('utf-16le', errors='ignore')
-                                    except:
-                                        decoded = text_data.decode('gb18030', errors='ignore')
-                                    
-                                    # 表格结构重建：Word 内部 \x07 为单元格界限
-                                    decoded = decoded.replace('\x07\x07', ' |\n| ').replace('\x07', ' | ').replace('\r', '\n')
-                                    # 去噪：剥离不可见字符
-                                    decoded = re.sub(r'[\x00-\x06\x08\x0B\x0C\x0E-\x1F]', '', decoded)
-                                    
-                                    if len(decoded.strip()) > 50:
-                                        return deduplicate_text(header + decoded.strip())
-        except Exception: pass
-
-    # 【路口3】备用机制：处理服务器级别的旧版 .doc 格式 (借助 antiword)
-    if file_name.lower().endswith('.doc'):
-        import subprocess
-        import tempfile
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.doc', delete=False) as tmp:
-                tmp.write(file_bytes)
-                tmp_path = tmp.name
-            result = subprocess.run(['antiword', tmp_path], capture_output=True, text=True, timeout=10)
-            os.unlink(tmp_path)
-            if result.returncode == 0 and len(result.stdout.strip()) > 50:
-                return deduplicate_text(result.stdout)
-        except Exception:
-            try:
-                if 'tmp_path' in locals() and os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-            except: pass
-
-    # 【路口4】终极降级特种部队：纯 Python 暴力穿透法
-    try:
-        best_text = ""
-        
-        # 4.1 尝试识别从招聘平台导出的“伪装 DOC” (实质为 MHT/HTML)
-        for enc in ['utf-8', 'gbk', 'gb18030']:
-            try:
-                decoded_text = file_bytes.decode(enc)
-                if '<html' in decoded_text.lower() or 'xmlns:w=' in decoded_text.lower():
-                    cleaned_html = re.sub(r'<style.*?>.*?</style>', '', decoded_text, flags=re.IGNORECASE|re.DOTALL)
-                    cleaned_html = re.sub(r'<script.*?>.*?</script>', '', cleaned_html, flags=re.IGNORECASE|re.DOTALL)
-                    cleaned_html = re.sub(r'<[^>]+>', ' | ', cleaned_html)
-                    cleaned_html = re.sub(r'(\s*\|\s*)+', ' | ', cleaned_html)
-                    if len(cleaned_html.strip()) > len(best_text):
-                        best_text = cleaned_html.strip()
-            except: pass
-
-        # 4.2 真正的 .doc 二进制流盲测暴力重组 (兜底方案)
-        for enc in ['utf-16le', 'gbk', 'gb18030', 'utf-8']:
-            try:
-                raw_text = file_bytes.decode(enc, errors='ignore')
-                cleaned = re.sub(r'[\x00-\x06\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', raw_text)
-                cleaned = cleaned.replace('\u0007', ' | ').replace('\r', '\n')
-                cleaned = re.sub(r' {2,}', ' ', cleaned)
-                cleaned = re.sub(r'\|\s*\|', '|', cleaned)
-                cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
-                
-                zh_count = len(re.findall(r'[\u4e00-\u9fa5]', cleaned))
-                best_zh_count = len(re.findall(r'[\u4e00-\u9fa5]', best_text))
-                
-                if zh_count > best_zh_count and len(cleaned.strip()) > 50:
-                    best_text = cleaned
-            except: continue
-        
-        if len(best_text.strip()) > 50:
-            return deduplicate_text(best_text)
-    except Exception: pass
-
-    # 【路口5】最后的退化方案：丢给 Fitz 盲算
-    if PDF_SUPPORT:
-        try:
-            filetype = "doc" if file_name.lower().endswith('.doc') else "docx"
-            with fitz.open(stream=file_bytes, filetype=filetype) as doc_fitz:
-                text_fitz = ""
-                for page in doc_fitz:
-                    text_fitz += page.get_text() + "\n"
-                if len(text_fitz.strip()) > 50:
-                    return deduplicate_text(text_fitz)
-        except Exception: pass
-
-    return deduplicate_text(text) if text.strip() else "Word文档解析失败或内容为空"
-
-def is_hidden_file(filename: str) -> bool:
-    """检查是否为隐藏文件"""
-    basename = os.path.basename(filename)
-    if basename.startswith('._'):
-        return True
-    if basename.startswith('.') or basename.startswith('~'):
-        return True
-    if basename.lower() in ['thumbs.db', 'desktop.ini', '.ds_store']:
+    if job.is_active:
+        render_live_job(job_id)
         return True
+    snap = job.snapshot()
+    
+    if st.session_state.get('collected_job_id') != job_id:
+        st.session_state.collected_job_id = job_id
+        # 停止（或到达整批截止时间）的任务同样返回已完成部分的完整结果
+        if job.result and job.result['final_results']:
+            st.session_state.final_results = job.result['final_results']
+            st.session_state.need_review = job.result['need_review']
+            st.session_state.near_dup_groups = job.result.get('near_dup_groups', [])
+        elif snap['partial']:
+            # 取消或出错时先展示已完成的部分，剩余部分可在「未完成任务」中继续
+            st.session_state.final_results = snap['partial']
+            st.session_state.need_review = [r for r in snap['partial'] if r.get('处理状态') == '需复核']
+            st.session_state.near_dup_groups = []
+    
+    if job.result and job.result.get('cancelled'):
+        st.warning(f"{snap['logs'][-1] if snap['logs'] else '⏹️ 任务已停止'}；剩余部分可在「未完成任务」中继续")
+    elif job.finished_ok:
+        st.success(snap['logs'][-1] if snap['logs'] else "🎉 全部完成！")
+    elif snap['status'] == 'cancelled':
+        st.warning(f"⏹️ 任务已停止，已完成 {snap['partial_count']} 份；可在「未完成任务」中继续")
+    else:
+        st.error(f"❌ 处理过程中出错: {(snap['error'] or '').splitlines()[0] if snap['error'] else ''}")
+        st.code(snap['error'] or '')
+    with st.expander("📜 运行日志"):
+        st.text("\n".join(snap['logs']))
     return False
 
-def extract_archive_files(file_bytes: bytes, file_name: str, max_size: int = 500 * 1024 * 1024) -> List[Dict]:
-    """批量解压压缩文件 - 支持大文件，接入严格逆转错乱编码算法"""
-    extracted_files = []
-    supported_ext = ('.pdf', '.docx', '.doc')
-    
-    archive_size = len(file_bytes)
-    if archive_size > max_size:
-        st.error(f"❌ 压缩包过大 ({archive_size/1024/1024:.0f}MB > {max_size/1024/1024:.0f}MB 上限)")
-        return extracted_files
-    
-    try:
-        if file_name.lower().endswith('.zip'):
-            # 已清理掉原来外层臃肿的 encodings 无效循环
-            zf = zipfile.ZipFile(io.BytesIO(file_bytes))
-            
-            with zf:
-                total_uncompressed = sum(info.file_size for info in zf.infolist())
-                if total_uncompressed > max_size * 2:
-                    st.warning(f"⚠️ 解压后文件过大 ({total_uncompressed/1024/1024:.0f}MB)")
-                
-                # 获取应用了终极反向纠错编码的映射列表
-                name_mapping = get_zip_filenames_raw(zf)
-                
-                for original_name, decoded_name in name_mapping:
-                    if is_hidden_file(decoded_name):
-                        continue
-                    
-                    if decoded_name.lower().endswith(supported_ext):
-                        extracted_files.append({
-                            'name': os.path.basename(decoded_name), 
-                            'bytes': zf.read(original_name)
-                        })
-        
-        elif file_name.lower().endswith('.rar') and RAR_SUPPORT:
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.rar') as tmp:
-                tmp.write(file_bytes)
-                tmp_path = tmp.name
-            try:
-                with rarfile.RarFile(tmp_path) as rf:
-                    for item in rf.namelist():
-                        if is_hidden_file(item):
-                            continue
-                        if item.lower().endswith(supported_ext):
-                            # 使用更强大的全局逆转算法
-                            decoded_name = fix_garbled_filename(item)
-                            extracted_files.append({
-                                'name': os.path.basename(decoded_name), 
-                                'bytes': rf.read(item)
-                            })
-            finally:
-                os.unlink(tmp_path)
-        
-        elif file_name.lower().endswith(('.7z', '.7zip')) and SEVENZ_SUPPORT:
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.7z') as tmp:
-                tmp.write(file_bytes)
-                tmp_path = tmp.name
-            try:
-                with py7zr.SevenZipFile(tmp_path, mode='r') as zf:
-                    for name, bio in zf.readall().items():
-                        if is_hidden_file(name):
-                            continue
-                        if name.lower().endswith(supported_ext):
-                            # 使用更强大的全局逆转算法
-                            decoded_name = fix_garbled_filename(name)
-                            extracted_files.append({
-                                'name': os.path.basename(decoded_name), 
-                                'bytes': bio.read()
-                            })
-            finally:
-                os.unlink(tmp_path)
-            
-    except Exception as e:
-        st.error(f"解压失败 {file_name}: {str(e)}")
-    
-    return extracted_files
-
-# ============================
-# 批量文件解析 - 高效并发
-# ============================
-@dataclass
-class ParseResult:
-    """解析结果数据结构"""
-    filename: str
-    content: str
-    error: str = None
-    file_size: int = 0
-    parse_time: float = 0.0
 
-def parse_single_file(item: Dict, use_ocr: bool = True, api_key: str = None) -> ParseResult:
-    """解析单个文件"""
-    start_time = time.time()
-    
+def recalled_job_id() -> str:
+    job_id = st.session_state.get('job_id', '')
     try:
-        file_name = item.get('name', 'unknown')
-        content_bytes = item.get('bytes', b'')
-        file_size = len(content_bytes)
-        
-        cached = cache.get(content_bytes)
-        if cached and 'parsed_result' in cached:
-            result = cached['parsed_result']
-            result.parse_time = time.time() - start_time
-            return result
-        
-        text = ""
-        error_msg = None
-        
-        if file_name.lower().endswith('.pdf'):
-            text = extract_text_from_pdf(content_bytes, use_ocr, api_key)
-        elif file_name.lower().endswith(('.docx', '.doc')):
-            text = extract_text_from_docx(content_bytes, file_name, use_ocr, api_key)
-            # 如果docx文本太短且启用了OCR，尝试提取嵌入图片OCR（作为补充）
-            if len(text.strip()) < 100 and use_ocr and api_key:
-                ocr_text = ocr_docx_images(content_bytes, api_key)
-                if ocr_text:
-                    text += "\n\n[图片OCR内容]\n" + ocr_text
-        else:
-            error_msg = "不支持的文件类型"
-        
-        if len(text) < 50 and not error_msg:
-            error_msg = "提取文本过短，可能解析失败"
-        
-        result = ParseResult(
-            filename=file_name,
-            content=text,
-            error=error_msg,
-            file_size=file_size,
-            parse_time=time.time() - start_time
-        )
-        
-        cache.set(content_bytes, {'parsed_result': result})
-        return result
-        
-    except Exception as e:
-        return ParseResult(
-            filename=item.get('name', 'unknown'),
-            content="",
-            error=str(e),
-            parse_time=time.time() - start_time
-        )
-
-def parse_files_batch(uploaded_items: List[Dict], progress_callback=None, use_ocr: bool = True, api_key: str = None) -> Tuple[List[ParseResult], List[Dict]]:
-    """批量文件解析，使用线程池并发处理"""
-    parsed_data = []
-    failed_files = []
-    max_workers = st.session_state.config.get('max_workers', 20)
-    
-    st.write(f"🔧 启动解析: {len(uploaded_items)} 个文件, {max_workers} 个并发 worker")
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_item = {
-            executor.submit(parse_single_file, item, use_ocr, api_key): item 
-            for item in uploaded_items
-        }
-        
-        for i, future in enumerate(as_completed(future_to_item)):
-            try:
-                result = future.result()
-                
-                if result.error:
-                    failed_files.append({
-                        'name': result.filename, 
-                        'error': result.error,
-                        'size': result.file_size,
-                        'content': result.content
-                    })
-                    st.write(f"❌ 解析失败: {result.filename} - {result.error}")
-                else:
-                    parsed_data.append(result)
-                    st.write(f"✓ 解析成功: {result.filename} ({len(result.content)} 字符)")
-            except Exception as e:
-                item = future_to_item[future]
-                failed_files.append({
-                    'name': item.get('name', 'unknown'), 
-                    'error': str(e),
-                    'size': len(item.get('bytes', b'')),
-                    'content': ''
-                })
-                st.write(f"❌ 解析异常: {item.get('name', 'unknown')} - {str(e)}")
-            
-            if progress_callback:
-                progress_callback(i + 1, len(uploaded_items))
-    
-    st.write(f"📊 解析完成: 成功 {len(parsed_data)}, 失败 {len(failed_files)}")
-    return parsed_data, failed_files
-
-# ============================
-# 异步API调用 - 优化并发
-# ============================
-async def call_deepseek_api_async(
-    session: aiohttp.ClientSession, 
-    text: str, 
-    api_key: str,
-    filename: str = ""
-) -> Dict:
-    """异步调用DeepSeek API - 单次调用，不带信号量（由调用方控制）"""
-    url = "https://api.siliconflow.cn/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}", 
-        "Content-Type": "application/json"
-    }
-    
-    target_city = ""
-    try:
-        target_city = st.session_state.config.get('target_city', '')
-    except:
+        job_id = st.query_params.get("job", job_id)
+    except Exception:
         pass
-    city_context = f"目标城市：{target_city}" if target_city else ""
-    
-    # 获取当前年份用于年龄计算
-    current_year = datetime.now().year
-    current_date = datetime.now().strftime("%Y年%m月%d日")
-    
-    # 文件名提示
-    filename_hint = f"\n【文件名参考】简历文件名：{filename}\n文件名通常包含姓名和学科信息，如'高中数学-张三.pdf'表示姓名为张三，学科为数学。如果简历文本中无法找到姓名或学科，请从文件名中提取。" if filename else ""
-    
-    system_prompt = f"""你是一个专业的HR简历分析助手。请从简历文本中提取结构化信息。
-{city_context}{filename_hint}
-
-【重要提示】今天是{current_date}，当前年份是{current_year}年。计算年龄时必须使用当前年份{current_year}减去出生年份。例如：2005年出生的人，年龄应该是{current_year - 2005}岁。
-
-【年龄估算规则】如果简历中没有直接写出年龄或出生年份，请根据以下信息估算：
-- 本科毕业年份：正常人18岁上大学，22岁本科毕业。例如2023年本科毕业，则年龄约为{current_year - (2023 - 22)}岁
-- 硕士毕业年份：正常人22岁本科毕业，25岁硕士毕业
-- 工作经验：如"3年工作经验"，假设开始工作年龄为22岁，则当前年龄约为22+3=25岁
-- 教育背景中的入学年份也可用于推算
-
-【重要】学校层次字段（tier）只能从以下选项中选择：
-- C9（九校联盟）
-- 985
-- 211
-- 海外名校
-- 双一流
-- 重点师范
-- 普通一本
-- 二本
-- 专科
-- 无法判断（如果不是中国高校）
-
-请提取以下信息并返回JSON格式：
-{{
-    "basic_info": {{
-        "name": "姓名",
-        "phone": "手机号(11位数字，如13812345678。从简历正文或文件名中提取)",
-        "gender": "性别(男/女)",
-        "age": "年龄(数字，根据当前年份{current_year}计算或估算)",
-        "subject": "任教学科(只填学科名称，如数学、语文、英语，不要带高中/初中/小学等前缀)",
-        "marital_status": "婚育状况(已婚已育/已婚未育/未婚/未提及)",
-        "residence": "现居住城市",
-        "partner_location": "配偶/伴侣工作地城市",
-        "parents_background": "父母职业或单位背景摘要"
-    }},
-    "education": {{
-        "high_school_tier": "高中层次（只能填：重点/县中/普通/无法判断）",
-        "bachelor_school": "本科学校（只填学校名称，不要专业）",
-        "bachelor_tier": "本科层次（只能从上述tier选项中选择）",
-        "master_school": "硕士学校（只填学校名称，不要专业）",
-        "master_tier": "硕士层次（只能从上述tier选项中选择）",
-        "study_abroad_years": "海外留学时长(年，数字，无则为0)",
-        "exchange_experience": "是否有交换经历(是/否)"
-    }},
-    "work_experience": {{
-        "current_company": "现工作单位",
-        "school_tier": "现单位档次(市重点/知名民办/普通/机构/其他)",
-        "non_teaching_gap": "非教行业空窗期(年，数字，无则为0)",
-        "overseas_work_years": "海外工作时长(年，数字，无则为0)",
-        "management_role": "曾任管理岗(中层/年级组长/教研组长/无)",
-        "head_teacher_years": "班主任年限(数字)",
-        "teaching_years": "教龄(预估数字)"
-    }},
-    "achievements": {{
-        "honor_titles": ["荣誉称号列表(如学科带头人, 骨干教师, 优青, 特级)"],
-        "teaching_competition": ["赛课获奖列表(如优质课一等奖)"],
-        "academic_results": ["课题或论文成果摘要"]
-    }},
-    "ai_assessment": {{
-        "summary": "一句话亮点摘要(50字以内)",
-        "risk_warning": "风险提示(如有)",
-        "potential_score": "AI潜质评分(1-5分，根据简历质量、职业轨迹综合评估)"
-    }}
-}}"""
-    
-    payload = {
-        "model": "deepseek-ai/DeepSeek-V3",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"请分析以下简历：\n\n{text}"}
-        ],
-        "temperature": 0.3,
-        "max_tokens": 2000,
-        "response_format": {"type": "json_object"}
-    }
-    
+    return job_id
+
+
+def get_result_table() -> ResultTable:
+    """结果表按 final_results 对象缓存，结果不变时页面重绘不重建索引"""
+    cached = st.session_state.get('result_table')
+    if cached is None or cached[0] is not st.session_state.final_results:
+        cached = (st.session_state.final_results, ResultTable(st.session_state.final_results))
+        st.session_state.result_table = cached
+    return cached[1]
+
+
+def render_result_table(table: ResultTable):
+    """候选人列表：筛选、排序、分页都在服务端完成，只把当前页发给浏览器"""
+    stats = table.stats
+    f_col1, f_col2, f_col3, f_col4 = st.columns(4)
+    with f_col1:
+        statuses = st.multiselect("处理状态", table.statuses)
+    with f_col2:
+        subjects = st.multiselect("任教学科", table.subjects)
+    with f_col3:
+        low, high = int(math.floor(stats['min_score'])), int(math.ceil(stats['max_score']))
+        score_range = st.slider("综合评分", low, high, (low, high)) if high > low else (low, high)
+    with f_col4:
+        keyword = st.text_input("搜索文件名 / 姓名")
+    
+    s_col1, s_col2, s_col3, s_col4 = st.columns(4)
+    with s_col1:
+        sort_by = st.selectbox("排序列", table.columns,
+                               index=table.columns.index('综合评分') if '综合评分' in table.columns else 0)
+    with s_col2:
+        descending = st.checkbox("降序", value=True)
+    with s_col3:
+        page_size = st.selectbox("每页行数", [20, 50, 100, 200], index=1)
+    with s_col4:
+        page = st.number_input("页码", min_value=1, value=1, step=1)
+    
+    # 评分范围未收窄时不按分数过滤，失败行（无评分）也能看到
+    narrowed = score_range != (low, high)
+    result = table.query(ResultQuery(
+        statuses=tuple(statuses), subjects=tuple(subjects),
+        min_score=score_range[0] if narrowed else None,
+        max_score=score_range[1] if narrowed else None,
+        keyword=keyword, sort_by=sort_by, descending=descending,
+        page=int(page), page_size=page_size
+    ))
+    st.caption(f"共 {result.total} 条，第 {result.page} / {result.pages} 页；长文本仅显示前 {table.preview_chars} 字")
     try:
-        async with session.post(url, headers=headers, json=payload) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                return {"error": f"API错误 {response.status}: {error_text[:200]}"}
-            
-            data = await response.json()
-            content = data['choices'][0]['message']['content']
-            
-            try:
-                parsed = json.loads(content)
-                for key in ['basic_info', 'education', 'work_experience', 'achievements', 'ai_assessment']:
-                    if key not in parsed:
-                        parsed[key] = {}
-                # 注入 debug 信息供排查
-                parsed['_debug_prompt'] = system_prompt
-                parsed['_debug_raw_response'] = content
-                return parsed
-            except json.JSONDecodeError as e:
-                return {"error": f"JSON解析失败: {str(e)}", "raw_content": content[:500], "_debug_prompt": system_prompt, "_debug_raw_response": content}
-                
-    except asyncio.TimeoutError:
-        return {"error": "API请求超时"}
+        st.dataframe(result.rows, use_container_width=True, height=500, hide_index=True)
     except Exception as e:
-        return {"error": f"请求异常: {str(e)}"}
-
-
-async def process_batch_async_fast(parsed_results: List[ParseResult], api_key: str, progress_callback=None) -> List[Dict]:
-    """
-    异步批量处理简历 - 极速版
-    真正的同时并发，而不是顺序await
-    """
-    results = [None] * len(parsed_results)  # 预分配结果列表
-    max_concurrent = st.session_state.config.get('max_concurrent_api', 100)
-    timeout = aiohttp.ClientTimeout(total=st.session_state.config.get('api_timeout', 60))
-    
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def process_one(idx: int, parse_result: ParseResult):
-        """处理单个简历"""
-        async with semaphore:
-            start_time = time.time()
-            try:
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    api_result = await call_deepseek_api_async(session, parse_result.content, api_key, parse_result.filename)
-                
-                results[idx] = {
-                    'filename': parse_result.filename,
-                    'parsed_content': parse_result.content[:200] + "..." if len(parse_result.content) > 200 else parse_result.content,
-                    'full_content': parse_result.content,
-                    'api_result': api_result,
-                    'parse_time': parse_result.parse_time,
-                    'api_time': time.time() - start_time
-                }
-            except Exception as e:
-                results[idx] = {
-                    'filename': parse_result.filename,
-                    'parsed_content': parse_result.content[:200] if len(parse_result.content) > 200 else parse_result.content,
-                    'full_content': parse_result.content,
-                    'api_result': {"error": str(e)},
-                    'parse_time': parse_result.parse_time,
-                    'api_time': time.time() - start_time
-                }
-            
-            if progress_callback:
-                progress_callback(sum(1 for r in results if r is not None), len(parsed_results))
-    
-    # 创建所有任务并同时运行
-    tasks = [process_one(i, pr) for i, pr in enumerate(parsed_results)]
-    await asyncio.gather(*tasks)
-    
-    return results
-
-
-# ============================
-# 评分算法 - 0410 合并版（不再区分敏感字段）
-# ============================
-def calculate_score(data: Dict) -> Tuple[int, str]:
-    """
-    简历评分算法 - 0410合并版
-    不再区分公开/敏感，统一评分标准
-    返回: (总分, 评分详情)
-    """
-    score = 0
-    logs = []
-    
-    basic = data.get('basic_info', {})
-    edu = data.get('education', {})
-    work = data.get('work_experience', {})
-    achieve = data.get('achievements', {})
-    ai = data.get('ai_assessment', {})
-    
-    def get_num(val):
-        try:
-            return float(val)
-        except (ValueError, TypeError):
-            return 0.0
-    
-    target_city = ""
-    try:
-        target_city = st.session_state.config.get('target_city', '')
-    except:
-        pass
-    
-    # ========== 1. 专业匹配 (+5) ==========
-    comp_str = str(achieve.get('teaching_competition', [])) + str(achieve.get('honor_titles', []))
-    if "省" in comp_str and ("一等奖" in comp_str or "前三" in comp_str):
-        score += 5
-        logs.append("专业: 省级奖项 +5")
-    
-    # ========== 2. 学习经历 (+19 max) ==========
-    hs_tier = str(edu.get('high_school_tier', ''))
-    if "重点" in hs_tier or "县中" in hs_tier:
-        score += 3
-        logs.append(f"高中: {hs_tier} +3")
-    
-    # 本科层次
-    b_tier = str(edu.get('bachelor_tier', ''))
-    if "C9" in b_tier:
-        score += 5
-        logs.append("本科: C9 +5")
-    elif "985" in b_tier or "海外名校" in b_tier:
-        score += 3
-        logs.append(f"本科: {b_tier} +3")
-    elif "211" in b_tier or "重点师范" in b_tier:
-        score += 1
-        logs.append(f"本科: {b_tier} +1")
-    
-    # 硕士层次
-    m_tier = str(edu.get('master_tier', ''))
-    if "C9" in m_tier:
-        score += 5
-        logs.append("硕士: C9 +5")
-    elif "985" in m_tier or "海外名校" in m_tier:
-        score += 3
-        logs.append(f"硕士: {m_tier} +3")
-    elif "211" in m_tier or "重点师范" in m_tier:
-        score += 1
-        logs.append(f"硕士: {m_tier} +1")
-    
-    # 留学经历
-    abroad = get_num(edu.get('study_abroad_years'))
-    if abroad >= 2:
-        score += 2
-        logs.append("留学: 2年以上 +2")
-    if str(edu.get('exchange_experience', '否')) == '是':
-        score += 1
-        logs.append("留学: 交换经历 +1")
-    
-    # ========== 3. 家庭背景 (+7 max) ==========
-    gender = str(basic.get('gender', ''))
-    if gender == '男':
-        score += 3
-        logs.append("背景: 男性 +3")
-    if gender == '女' and '已育' in str(basic.get('marital_status', '')):
-        score += 1
-        logs.append("背景: 已婚已育 +1")
-    
-    parents = str(basic.get('parents_background', ''))
-    if any(k in parents for k in ['教师', '学校', '机关', '研发', '公务员']):
-        score += 1
-        logs.append("背景: 书香/机关家庭 +1")
-    
-    # 居住情况
-    if target_city:
-        if target_city in str(basic.get('residence', '')):
-            score += 1
-            logs.append(f"居住: 住{target_city} +1")
-        if target_city in str(basic.get('partner_location', '')):
-            score += 1
-            logs.append(f"家庭: 配偶在{target_city} +1")
-    
-    # ========== 4. 工作经历 (+3/-3) ==========
-    work_tier = str(work.get('school_tier', ''))
-    if "重点" in work_tier or "知名" in work_tier:
-        score += 3
-        logs.append(f"工作: {work_tier} +3")
-    
-    # 空窗期扣分
-    if get_num(work.get('non_teaching_gap')) > 2:
-        score -= 3
-        logs.append("工作: 非教空窗期>2年 -3")
-    
-    # 海外工作
-    if get_num(work.get('overseas_work_years')) >= 1:
-        score += 3
-        logs.append("工作: 海外工作 +3")
-    
-    # ========== 5. 教学科研 (+9 max) ==========
-    titles = str(achieve.get('honor_titles', []))
-    if any(k in titles for k in ['特级', '学科带头人', '骨干', '优青']):
-        score += 5
-        logs.append("科研: 核心称号 +5")
-    
-    contest = str(achieve.get('teaching_competition', []))
-    if "一等奖" in contest and ("区" in contest or "市" in contest or "省" in contest):
-        score += 3
-        logs.append("教学: 赛课一等奖 +3")
-    
-    academic = str(achieve.get('academic_results', []))
-    if "课题" in academic or "论文" in academic:
-        score += 1
-        logs.append("学术: 课题/论文 +1")
-    
-    # ========== 6. 管理能力 (+7 max) ==========
-    mgmt = str(work.get('management_role', ''))
-    if mgmt and mgmt not in ['无', '未提及', 'None', 'null']:
-        if "年级组长" in mgmt or "教研" in mgmt or "中层" in mgmt:
-            score += 3
-            logs.append("管理: 组长/中层 +3")
-    
-    ht_years = get_num(work.get('head_teacher_years'))
-    if ht_years >= 5:
-        score += 3
-        logs.append("管理: 班主任5年+ +3")
-    elif ht_years > 0:
-        score += 1
-        logs.append("管理: 班主任经验 +1")
-    
-    # ========== 7. AI潜质 ==========
-    potential = get_num(ai.get('potential_score'))
-    if potential > 0:
-        score += int(potential)
-        logs.append(f"潜质: AI评分 +{int(potential)}")
-    
-    if not logs:
-        logs.append("未匹配评分条件")
-    
-    return score, "; ".join(logs)
-
-
-# ============================
-# 结果处理
-# ============================
-def process_results(api_results: List[Dict], debug_mode: bool = False) -> Tuple[List[Dict], List[Dict]]:
-    """处理API结果，生成最终表格 - 0410合并版"""
-    final_results = []
-    need_review = []
-    
-    for result in api_results:
-        filename = result['filename']
-        api_data = result.get('api_result', {})
-        
-        if 'error' in api_data:
-            row = {
-                '文件名': filename,
-                '处理状态': '失败',
-                '错误信息': api_data['error'],
-            }
-            if debug_mode:
-                row['_debug_extracted_text'] = result.get('full_content', result.get('parsed_content', ''))
-                row['_debug_prompt'] = api_data.get('_debug_prompt', '')
-                row['_debug_raw_response'] = api_data.get('_debug_raw_response', '')
-            final_results.append(row)
-            continue
-        
-        basic = api_data.get('basic_info', {})
-        edu = api_data.get('education', {})
-        work = api_data.get('work_experience', {})
-        achieve = api_data.get('achievements', {})
-        ai_eval = api_data.get('ai_assessment', {})
-        
-        total_score, score_logs = calculate_score(api_data)
-        
-        # 从文件名提取姓名、学科和手机号的备用逻辑
-        def extract_from_filename(fname: str) -> tuple:
-            """从文件名提取学科、姓名和手机号，如'高中数学-张三-13812345678.pdf' -> (张三, 数学, 13812345678)"""
-            import re
-            # 移除扩展名
-            name_part = re.sub(r'\.(pdf|docx|doc)$', '', fname, flags=re.IGNORECASE)
-            
-            # 提取手机号（11位数字，1开头）
-            phone_match = re.search(r'(1[3-9]\d{9})', name_part)
-            phone = phone_match.group(1) if phone_match else ""
-            
-            # 移除手机号后再提取姓名和学科
-            name_part_no_phone = re.sub(r'1[3-9]\d{9}', '', name_part)
-            
-            # 尝试匹配常见格式：学科-姓名、姓名-学科、高中学科-姓名等
-            # 格式1: 高中数学-张三、数学-张三
-            match = re.search(r'(?:高中|初中|小学)?([\u4e00-\u9fa5]{2,})[-_\s]+([\u4e00-\u9fa5]{2,4})', name_part_no_phone)
-            if match:
-                subject, name = match.groups()
-                return name, subject, phone
-            # 格式2: 张三-高中数学、张三-数学
-            match = re.search(r'([\u4e00-\u9fa5]{2,4})[-_\s]+(?:高中|初中|小学)?([\u4e00-\u9fa5]{2,})', name_part_no_phone)
-            if match:
-                name, subject = match.groups()
-                return name, subject, phone
-            # 格式3: 只包含一个中文字符串，可能是姓名
-            match = re.search(r'([\u4e00-\u9fa5]{2,4})', name_part_no_phone)
-            if match:
-                return match.group(1), "", phone
-            return "", "", phone
-        
-        # 从文件内容中提取手机号
-        def extract_phone_from_content(content: str) -> str:
-            """从文件内容中提取手机号"""
-            import re
-            if not content:
-                return ""
-            # 匹配手机号：1开头，第二位3-9，后面9位数字
-            phone_match = re.search(r'(1[3-9]\d{9})', content)
-            return phone_match.group(1) if phone_match else ""
-        
-        # 统一学科名称格式：去除"高中"、"初中"、"小学"等前缀
-        subject = basic.get('subject', '')
-        if subject:
-            subject = re.sub(r'^(高中|初中|小学)', '', subject).strip()
-            basic['subject'] = subject
-        
-        # 如果API返回的姓名、学科或手机号为空，尝试从文件名或内容提取
-        name_from_file, subject_from_file, phone_from_file = extract_from_filename(filename)
-        phone_from_content = extract_phone_from_content(result.get('full_content', ''))
-        
-        if not basic.get('name') and name_from_file:
-            basic['name'] = name_from_file
-        if not basic.get('subject') and subject_from_file:
-            # 文件名提取的学科也需要去除前缀
-            basic['subject'] = re.sub(r'^(高中|初中|小学)', '', subject_from_file).strip()
-        if not basic.get('phone'):
-            # 优先使用文件名中的手机号，其次使用内容中提取的
-            basic['phone'] = phone_from_file or phone_from_content
-        
-        # 检查是否需要人工复核
-        needs_review = False
-        review_fields = []
-        for field_name, key in [('姓名', 'name'), ('性别', 'gender'), ('学科', 'subject')]:
-            val = basic.get(key, '')
-            if not val or val in ['null', 'None', '']:
-                needs_review = True
-                review_fields.append(field_name)
-        
-        # 0410 完整字段（删除敏感字样）
-        row = {
-            '文件名': filename,
-            '处理状态': '需复核' if needs_review else '成功',
-            # 基本信息
-            '姓名': basic.get('name', ''),
-            '手机号': basic.get('phone', ''),
-            '性别': basic.get('gender', ''),
-            '年龄': basic.get('age', ''),
-            '任教学科': basic.get('subject', ''),
-            '婚姻状况': basic.get('marital_status', ''),
-            '现居地': basic.get('residence', ''),
-            # 教育背景
-            '高中层次': edu.get('high_school_tier', ''),
-            '本科学校': edu.get('bachelor_school', ''),
-            '本科层次': edu.get('bachelor_tier', ''),
-            '硕士学校': edu.get('master_school', ''),
-            '硕士层次': edu.get('master_tier', ''),
-            '海外留学': edu.get('study_abroad_years', ''),
-            '交换经历': edu.get('exchange_experience', ''),
-            # 工作经历
-            '现工作单位': work.get('current_company', ''),
-            '单位档次': work.get('school_tier', ''),
-            '教龄': work.get('teaching_years', ''),
-            '班主任年限': work.get('head_teacher_years', ''),
-            '管理职务': work.get('management_role', ''),
-            '非教空窗': work.get('non_teaching_gap', ''),
-            '海外工作': work.get('overseas_work_years', ''),
-            # 成就荣誉
-            '荣誉称号': ', '.join(api_data.get('achievements', {}).get('honor_titles', [])) if isinstance(api_data.get('achievements', {}).get('honor_titles'), list) else str(api_data.get('achievements', {}).get('honor_titles', '')),
-            '教学竞赛': ', '.join(api_data.get('achievements', {}).get('teaching_competition', [])) if isinstance(api_data.get('achievements', {}).get('teaching_competition'), list) else str(api_data.get('achievements', {}).get('teaching_competition', '')),
-            '学术成果': ', '.join(api_data.get('achievements', {}).get('academic_results', [])) if isinstance(api_data.get('achievements', {}).get('academic_results'), list) else str(api_data.get('achievements', {}).get('academic_results', '')),
-            # 评分（合并版）
-            '综合评分': total_score,
-            '评分详情': score_logs,
-            # AI评估
-            'AI评语': ai_eval.get('summary', ''),
-            '风险提示': ai_eval.get('risk_warning', ''),
-            'AI潜质分': ai_eval.get('potential_score', ''),
-            # 家庭信息
-            '配偶工作地': basic.get('partner_location', ''),
-            '父母背景': basic.get('parents_background', ''),
-            '需复核字段': ','.join(review_fields) if needs_review else ''
-        }
-        
-        if debug_mode:
-            row['_debug_extracted_text'] = result.get('full_content', result.get('parsed_content', ''))
-            row['_debug_prompt'] = api_data.get('_debug_prompt', '')
-            row['_debug_raw_response'] = api_data.get('_debug_raw_response', '')
-        
-        final_results.append(row)
-        if needs_review:
-            need_review.append(row)
-    
-    return final_results, need_review
+        st.warning(f"表格渲染失败: {str(e)}")
+        st.dataframe(result.rows.astype(str), use_container_width=True)
+    
+    # 按需展开单行完整内容
+    if '文件名' in result.rows.columns and len(result.rows):
+        selected = st.selectbox("查看完整内容", [''] + result.rows['文件名'].tolist())
+        if selected:
+            row = table.row(selected) or {}
+            for col in LONG_TEXT_COLUMNS:
+                value = row.get(col)
+                if isinstance(value, str) and value:
+                    st.markdown(f"**{col}**")
+                    st.text(value)
+
+
+def md_escape(text: str) -> str:
+    """转义 Markdown 特殊字符，简历原文按普通文本显示"""
+    return re.sub(r'([\\`*_{}\[\]()#+\-.!|<>~$])', r'\\\1', text)
+
+
+def render_fulltext_search():
+    """全文检索：在历次上传的简历正文中按关键词检索，BM25 排序，显示高亮片段"""
+    path = st.session_state.config.get('candidate_store')
+    if not FTS5_SUPPORT or not path or not os.path.exists(path):
+        return
+    index = FullTextIndex(path)
+    query = st.text_input("🔎 简历全文检索", placeholder="如：竞赛 金牌教练、华东师范大学（多个词用空格分隔，需同时出现）")
+    if not query.strip():
+        return
+    hits = index.search(query, limit=SEARCH_LIMIT, escape=md_escape, mark=('**', '**'))
+    st.caption(f"命中 {index.count(query)} 份，按相关度显示前 {SEARCH_LIMIT} 份")
+    store = CandidateStore(path)
+    for hit in hits:
+        row = store.candidate(hit.sha256) or {}
+        info = ' · '.join(str(v) for v in [row.get('姓名'), row.get('任教学科'),
+                                           f"{row['综合评分']}分" if row.get('综合评分') is not None else None] if v)
+        st.markdown(f"**{md_escape(hit.filename)}**" + (f" · {md_escape(info)}" if info else "") +
+                    f" · 相关度 {hit.score:.2f}")
+        for snippet in hit.snippets:
+            st.markdown(f"> {snippet}")
+
+
+def render_candidate_history():
+    """历史候选人库：跨批次累积的结果，按学科 / 最低分 / 上传时间 / 手机号查询"""
+    path = st.session_state.config.get('candidate_store')
+    if not path or not os.path.exists(path):
+        return
+    store = CandidateStore(path)
+    stats = store.stats()
+    with st.expander(f"🗄️ 历史候选人库（{stats['candidates']} 人，{stats['runs']} 批）"):
+        h_col1, h_col2, h_col3, h_col4 = st.columns(4)
+        with h_col1:
+            subject = st.selectbox("学科", ['全部'] + store.subjects(), key='history_subject')
+        with h_col2:
+            min_score = st.number_input("最低评分", value=0, step=1, key='history_min_score')
+        with h_col3:
+            days = st.selectbox("上传时间", [7, 30, 90, 365, 0], index=2, key='history_days',
+                                format_func=lambda d: f"最近 {d} 天" if d else "全部")
+        with h_col4:
+            phone = st.text_input("手机号", key='history_phone')
+        query = dict(
+            subject=None if subject == '全部' else subject,
+            min_score=min_score,
+            since=time.time() - days * 86400 if days else None,
+            phone=phone.strip() or None,
+            profile=st.session_state.config.get('profile', DEFAULT_CONFIG['profile']),
+        )
+        rows = store.search(limit=HISTORY_LIMIT, **query)
+        st.caption(f"共 {store.count(**query)} 人，按评分显示前 {HISTORY_LIMIT} 人")
+        if rows:
+            history_df = pd.DataFrame(rows)
+            history_df['uploaded_at'] = pd.to_datetime(history_df['uploaded_at'], unit='s').dt.strftime('%Y-%m-%d %H:%M')
+            st.dataframe(history_df.rename(columns=HISTORY_COLUMNS)[list(HISTORY_COLUMNS.values())],
+                         use_container_width=True, hide_index=True)
 
 
-# ============================
-# 主界面
-# ============================
 def main():
     st.title("🎓 智能简历筛选系统 0410")
     st.caption("")
@@ -1565,40 +321,87 @@ def main():
         # OCR选项（默认启用）
         use_ocr = st.checkbox("启用OCR（识别图片型PDF/DOCX）", value=True)
         if use_ocr:
-            st.success(f"✅ DeepSeek OCR已启用")
+            st.success("✅ DeepSeek OCR已启用")
             if TESSERACT_SUPPORT:
                 st.caption("📎 本地Tesseract作为备用")
         
         # Debug模式
-        debug_mode = st.checkbox("🐛 Debug Mode", value=False, help="开启后在导出的Excel中附带原始解析文本和API请求/响应记录")
+        debug_mode = st.checkbox("🐛 Debug Mode", value=False, help="开启后记录原始解析文本和API请求/响应，可单独导出调试数据 (zip)")
         
         # 显示缓存状态
         if st.session_state.config.get('enable_cache', True):
             st.caption("💾 缓存已启用")
+        
+        # 已处理记录：同一会话内重新上传相同内容会被跳过，需要重跑时先重置
+        if 'ledger' in st.session_state and st.session_state.ledger.processed:
+            if st.button(f"♻️ 重新接收文件（已处理 {len(st.session_state.ledger.processed)} 个）",
+                         help="清除本会话的上传与处理记录，上传框中的文件将重新进入队列"):
+                st.session_state.ledger.reset()
+                st.rerun()
+    
+    # 添加到队列：按内容哈希去重，同一份简历换了文件名或出现在多个压缩包里只保留一份
+    # 文件字节落到会话暂存区，队列里只保存句柄
+    if 'queue_index' not in st.session_state:
+        st.session_state.queue_index = ContentIndex()
+    if 'spool' not in st.session_state:
+        st.session_state.spool = BlobSpool(quota_mb=st.session_state.config.get('spool_quota_mb', DEFAULT_QUOTA_MB))
+    # 上传登记簿跨 rerun 保存：已接收的上传对象不再读取，已处理过的内容不再入队
+    if 'ledger' not in st.session_state:
+        st.session_state.ledger = IngestionLedger()
+    queue_index = st.session_state.queue_index
+    spool = st.session_state.spool
+    ledger = st.session_state.ledger
     
-    # 添加到队列
     new_count = 0
+    dup_count = 0
+    processed_count = 0
+    
+    def enqueue(item: Dict):
+        nonlocal new_count, dup_count, processed_count
+        if ledger.is_processed(item['sha256']):
+            processed_count += 1
+            if item['sha256'] not in queue_index.by_hash:
+                spool.release(item['sha256'])
+            return
+        if queue_index.add(item):
+            st.session_state.uploaded_files_queue.append(item)
+            new_count += 1
+        else:
+            dup_count += 1
+    
     if all_files:
-        existing_names = [qf['name'] for qf in st.session_state.uploaded_files_queue]
-        
-        for f in all_files:
-            if f.name in existing_names:
-                continue
-                
-            if f.name.lower().endswith(('.zip', '.rar', '.7z', '.7zip')):
-                with st.spinner(f"解压 {f.name}..."):
-                    extracted = extract_archive_files(f.read(), f.name)
+        try:
+            for f in all_files:
+                key = upload_key(f)
+                if ledger.seen_upload(key):
+                    continue
+                    
+                if f.name.lower().endswith(ARCHIVE_EXTENSIONS):
+                    archive_sha = content_hash(f)
+                    extracted = ledger.archive_members(archive_sha)
+                    if extracted is None:
+                        with st.spinner(f"解压 {f.name}..."):
+                            extracted = extract_archive_files(f, f.name, spool=spool, warn=st.warning)
+                        ledger.record_archive(archive_sha, extracted)
+                        st.success(f"📦 {f.name}: 提取 {len(extracted)} 个文件")
                     for ef in extracted:
-                        if ef['name'] not in existing_names:
-                            st.session_state.uploaded_files_queue.append(ef)
-                            new_count += 1
-                    st.success(f"📦 {f.name}: 提取 {len(extracted)} 个文件")
-            else:
-                st.session_state.uploaded_files_queue.append({'name': f.name, 'bytes': f.read()})
-                new_count += 1
+                        if ef['name'] not in queue_index:
+                            enqueue(ef)
+                    ledger.record_upload(key, f.name, archive_sha)
+                else:
+                    item = spool.put(f)
+                    item['name'] = f.name
+                    enqueue(item)
+                    ledger.record_upload(key, f.name, item['sha256'])
+        except SpoolQuotaExceeded as e:
+            st.error(f"❌ {e}")
     
     if new_count > 0:
         st.success(f"✅ 新增 {new_count} 个文件，队列共 {len(st.session_state.uploaded_files_queue)} 个")
+    if dup_count > 0:
+        st.info(f"♻️ 检测到 {dup_count} 个内容重复的文件，已合并到同一条记录，不会重复解析和调用 API")
+    if processed_count > 0:
+        st.info(f"⏭️ {processed_count} 个文件本会话内已处理过，已跳过")
     
     # 显示队列
     if st.session_state.uploaded_files_queue:
@@ -1609,6 +412,8 @@ def main():
         
         if st.button("🗑️ 清空队列", type="secondary"):
             st.session_state.uploaded_files_queue = []
+            st.session_state.queue_index = ContentIndex()
+            st.session_state.spool.clear()
             st.rerun()
     
     st.divider()
@@ -1629,15 +434,58 @@ def main():
     with cfg_col2:
         max_workers = st.number_input("🔧 解析并发数", min_value=1, max_value=50, value=20)
         st.session_state.config['max_workers'] = max_workers
+        st.session_state.config['shortest_first'] = st.checkbox(
+            "⏩ 短简历优先", value=st.session_state.config.get('shortest_first', True),
+            help="按预估耗时（文件类型与大小、是否命中缓存、token 数）从短到长解析和分析，先出结果的可以先看；扫描件排在最后")
         enable_cache = st.checkbox("💾 启用缓存", value=True)
         st.session_state.config['enable_cache'] = enable_cache
-    
+        isolated_parse = st.checkbox("🛡️ 隔离解析模式", value=st.session_state.config.get('isolated_parse', False),
+                                     help="每个文件在独立子进程中解析，超时或内存超限时强制终止，避免畸形文件卡死整批任务")
+        st.session_state.config['isolated_parse'] = isolated_parse
+        if isolated_parse:
+            st.session_state.config['parse_timeout'] = st.number_input(
+                "⏱️ 单文件解析超时(秒)", min_value=10, max_value=600,
+                value=int(st.session_state.config.get('parse_timeout', DEFAULT_PARSE_TIMEOUT)))
+            st.session_state.config['parse_memory_mb'] = st.number_input(
+                "🧠 单进程内存上限(MB)", min_value=256, max_value=8192,
+                value=int(st.session_state.config.get('parse_memory_mb', DEFAULT_MEMORY_LIMIT_MB)))
+
     with cfg_col3:
         api_concurrent = st.number_input("⚡ API并发数", min_value=1, max_value=200, value=100,
                                         help="真正的同时并发，不是顺序执行")
         st.session_state.config['max_concurrent_api'] = api_concurrent
         api_timeout = st.number_input("⏱️ API超时(秒)", min_value=10, max_value=300, value=60)
         st.session_state.config['api_timeout'] = api_timeout
+        st.session_state.config['batch_deadline'] = st.number_input(
+            "⏳ 整批时限(秒)", min_value=0, max_value=86400, step=60,
+            value=int(st.session_state.config.get('batch_deadline', DEFAULT_CONFIG['batch_deadline'])),
+            help="到时停止：进行中的解析和 AI 请求立即中止，返回已完成的部分；0 表示不限")
+        st.session_state.config['token_budget'] = st.number_input(
+            "✂️ 单份简历 token 上限", min_value=0, max_value=32000, step=500,
+            value=int(st.session_state.config.get('token_budget', DEFAULT_CONFIG['token_budget'])),
+            help="送入 AI 前压缩文本：去掉表格分隔线、页码、重复的 OCR 内容，超出上限时优先删除自我评价、附件等段落；0 表示不压缩")
+        near_dup_detect = st.checkbox("🔁 近似重复合并", value=st.session_state.config.get('near_dup_detect', True),
+                                      help="同一候选人的 PDF/DOCX 版本或微调后重投的简历只调用一次 AI，结果分发给同组文件")
+        st.session_state.config['near_dup_detect'] = near_dup_detect
+        st.session_state.config['pack_requests'] = st.checkbox(
+            "📦 短简历合并请求", value=st.session_state.config.get('pack_requests', False),
+            help="多份短简历合并为一次 AI 请求，共用系统提示词，减少请求次数和输入 token；合并结果缺失的简历自动单独重试")
+        st.session_state.config['cascade'] = st.checkbox(
+            "🪜 小模型优先", value=st.session_state.config.get('cascade', False),
+            help="先用便宜的小模型提取，姓名/性别/学科缺失或结果可疑时再交给大模型；各层命中率、耗时和 token 用量见处理日志")
+        if st.session_state.config['cascade']:
+            st.session_state.config['fast_model'] = st.text_input(
+                "小模型", value=st.session_state.config.get('fast_model', DEFAULT_CONFIG['fast_model']))
+        st.session_state.config['hedge_requests'] = st.checkbox(
+            "🛡️ 慢请求对冲", value=st.session_state.config.get('hedge_requests', False),
+            help="请求耗时超过近期同模型请求的分位数仍未返回时再发一份，先返回的采用、另一份取消；额外请求数不超过预算")
+        if st.session_state.config['hedge_requests']:
+            st.session_state.config['hedge_percentile'] = st.number_input(
+                "触发分位数", min_value=50.0, max_value=99.9, step=1.0,
+                value=float(st.session_state.config.get('hedge_percentile', DEFAULT_CONFIG['hedge_percentile'])))
+            st.session_state.config['hedge_budget'] = st.number_input(
+                "对冲预算（占请求数比例）", min_value=0.01, max_value=1.0, step=0.05,
+                value=float(st.session_state.config.get('hedge_budget', DEFAULT_CONFIG['hedge_budget'])))
     
     st.divider()
     
@@ -1654,47 +502,89 @@ def main():
     if start_btn and st.session_state.uploaded_files_queue:
         items_to_process = st.session_state.uploaded_files_queue.copy()
         st.session_state.uploaded_files_queue = []
-        
-        results = process_all_files(items_to_process, api_key, use_ocr, debug_mode)
-        
-        if results['final_results']:
-            st.session_state.final_results = results['final_results']
-            st.session_state.need_review = results['need_review']
-    
-    # 导出按钮
+        st.session_state.queue_index = ContentIndex()
+        
+        # 任务日志：输入文件和每个阶段的结果都落盘，中断后可用任务ID继续
+        journal = JobJournal.create(items_to_process, st.session_state.config)
+        submit_resume_job(journal, api_key, use_ocr, debug_mode)
+        ledger.mark_processed(item['sha256'] for item in items_to_process)
+        # 输入文件已复制到任务目录，释放会话暂存区
+        for item in items_to_process:
+            st.session_state.spool.release(item['sha256'])
+    
+    # 后台任务：刷新页面后按地址栏中的任务ID重新关联
+    manager = get_job_manager()
+    recalled = manager.get(recalled_job_id())
+    if recalled is not None and recalled.is_active:
+        st.session_state.active_job_id = recalled.job_id
+    job_running = render_job_panel(st.session_state.get('active_job_id'))
+    
+    # 未完成任务：页面刷新或会话中断后从任务日志继续（正在后台运行的不列出）
+    unfinished_jobs = [job for job in list_jobs() if job.get('status') == STATUS_RUNNING
+                       and not (manager.get(job['job_id']) and manager.get(job['job_id']).is_active)]
+    if unfinished_jobs and not start_btn:
+        with st.expander(f"♻️ 未完成任务 ({len(unfinished_jobs)} 个)", expanded=bool(recalled_job_id())):
+            job_ids = [job['job_id'] for job in unfinished_jobs]
+            default_idx = job_ids.index(recalled_job_id()) if recalled_job_id() in job_ids else 0
+            resume_id = st.selectbox(
+                "选择任务", job_ids, index=default_idx,
+                format_func=lambda jid: f"{jid}（{len(next(j for j in unfinished_jobs if j['job_id'] == jid)['items'])} 个文件）"
+            )
+            if st.button("▶️ 继续任务", type="primary"):
+                submit_resume_job(JobJournal.open(resume_id), api_key, use_ocr, debug_mode)
+                st.rerun()
+    
+    # 重新评分：修改目标城市后不必重跑 AI，直接按规则表对现有结果重新打分
+    if st.session_state.final_results and not job_running:
+        if st.button("🔄 按当前目标城市重新评分"):
+            rescored = rescore_frame(pd.DataFrame(st.session_state.final_results),
+                                     st.session_state.config.get('target_city', ''))
+            rows = rescored.astype(object).where(rescored.notna(), None).to_dict('records')
+            st.session_state.final_results = rows
+            st.session_state.need_review = [r for r in rows if r.get('处理状态') == '需复核']
+            st.rerun()
+
+    # 导出按钮：文件在点击下载时才生成（流式写出），页面重绘不再重复导出
     if st.session_state.final_results:
-        output = io.BytesIO()
-        df_export = pd.DataFrame(st.session_state.final_results)
-        df_export.to_excel(output, index=False)
-        output.seek(0)
-        st.download_button(
-            "📥 导出Excel结果",
-            data=output.getvalue(),
-            file_name=f"简历筛选结果_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        export_rows_snapshot = st.session_state.final_results
+        stamp = datetime.now().strftime('%Y%m%d_%H%M')
+        exp_col1, exp_col2, exp_col3 = st.columns([1, 2, 2])
+        with exp_col1:
+            export_fmt = st.selectbox("导出格式", available_formats(), label_visibility="collapsed")
+        with exp_col2:
+            st.download_button(
+                f"📥 导出结果 ({export_fmt})",
+                data=lambda: export_bytes(export_rows_snapshot, export_fmt),
+                file_name=f"简历筛选结果_{stamp}.{export_fmt}",
+                mime=EXPORT_MIME[export_fmt]
+            )
+        if has_debug(export_rows_snapshot):
+            with exp_col3:
+                st.download_button(
+                    "🐞 导出调试数据 (zip)",
+                    data=lambda: debug_archive_bytes(export_rows_snapshot),
+                    file_name=f"简历筛选结果_{stamp}.debug.zip",
+                    mime=DEBUG_MIME
+                )
     
     st.divider()
     
     # ========== 结果显示 ==========
     if st.session_state.final_results:
-        df = pd.DataFrame(st.session_state.final_results)
+        table = get_result_table()
+        stats = table.stats
         
-        # 统计卡片
+        # 统计卡片（构建结果表时一次算好）
         st.subheader("📊 处理统计")
         stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
         with stat_col1:
-            st.metric("总简历数", len(df))
+            st.metric("总简历数", stats['total'])
         with stat_col2:
-            success_count = len(df[df['处理状态'] == '成功'])
-            st.metric("成功解析", success_count)
+            st.metric("成功解析", stats['success'])
         with stat_col3:
-            review_count = len(df[df['处理状态'] == '需复核'])
-            st.metric("需复核", review_count)
+            st.metric("需复核", stats['review'])
         with stat_col4:
-            avg_score = df['综合评分'].mean() if '综合评分' in df.columns else 0
-            max_score = df['综合评分'].max() if '综合评分' in df.columns else 0
-            st.metric("平均/最高评分", f"{avg_score:.1f} / {max_score}")
+            st.metric("平均/最高评分", f"{stats['avg_score']:.1f} / {stats['max_score']:.0f}")
         
         # 评分维度说明
         with st.expander("📋 评分标准说明 (0410 - 合并版)"):
@@ -1712,23 +602,7 @@ def main():
         # 候选人列表
         st.subheader("📋 候选人列表")
         
-        display_cols = [
-            '文件名', '处理状态', '姓名', '手机号', '性别', '年龄', '任教学科',
-            '本科学校', '本科层次', '硕士学校', '硕士层次',
-            '现工作单位', '单位档次', '教龄', '班主任年限', '管理职务',
-            '荣誉称号', '教学竞赛',
-            '综合评分', '评分详情', 'AI评语', '风险提示'
-        ]
-        
-        # 过滤存在的列
-        display_cols = [c for c in display_cols if c in df.columns]
-        df_display = df[display_cols].sort_values('综合评分', ascending=False)
-        
-        try:
-            st.dataframe(df_display, use_container_width=True, height=500)
-        except Exception as e:
-            st.warning(f"表格渲染失败: {str(e)}")
-            st.dataframe(df_display.astype(str), use_container_width=True)
+        render_result_table(table)
         
         # 需复核名单
         if st.session_state.need_review:
@@ -1738,105 +612,21 @@ def main():
             review_display_cols = [c for c in review_display_cols if c in review_df.columns]
             st.dataframe(review_df[review_display_cols], use_container_width=True)
         
-        # Debug 信息不直接展示在UI上，仅保留在导出的Excel中
-
-# ============================
-# 处理逻辑
-# ============================
-def process_all_files(uploaded_items, api_key, use_ocr=True, debug_mode=False):
-    """处理所有文件的完整流程 - 极速版"""
-    total_files = len(uploaded_items)
-    results = {
-        'parsed_results': [],
-        'failed_parse': [],
-        'api_results': [],
-        'final_results': [],
-        'need_review': [],
-        'parse_time': 0,
-        'ai_time': 0
-    }
-    
-    overall_start = time.time()
-    st.info(f"📁 开始处理 {total_files} 个文件...")
-    
-    try:
-        # 阶段1: 文件解析
-        with st.spinner(f'📖 解析中 ({total_files} 个文件)...'):
-            parse_progress = st.progress(0)
-            
-            def update_parse_progress(current, total):
-                parse_progress.progress(current / total)
-            
-            start_time = time.time()
-            parsed_results, failed_parse = parse_files_batch(
-                uploaded_items, 
-                update_parse_progress,
-                use_ocr,
-                api_key  # 传递api_key用于DeepSeek OCR
-            )
-            results['parse_time'] = time.time() - start_time
-            results['parsed_results'] = parsed_results
-            results['failed_parse'] = failed_parse
-            parse_progress.empty()
-        
-        if not parsed_results:
-            st.error("❌ 没有成功解析的文件")
-            return results
-        
-        st.success(f"✅ 解析完成: {len(parsed_results)} 成功, 耗时{results['parse_time']:.1f}s")
-        
-        # 阶段2: AI分析（真正并发版）
-        with st.spinner(f'🤖 AI分析中 ({len(parsed_results)} 份简历，真{st.session_state.config.get("max_concurrent_api", 100)}并发)...'):
-            ai_progress = st.progress(0)
-            
-            def update_ai_progress(current, total):
-                ai_progress.progress(current / total, text=f"已完成 {current}/{total}")
-            
-            start_time = time.time()
-            
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            # 使用新的极速版处理函数
-            api_results = loop.run_until_complete(
-                process_batch_async_fast(parsed_results, api_key, update_ai_progress)
-            )
-            results['ai_time'] = time.time() - start_time
-            results['api_results'] = api_results
-            ai_progress.empty()
-        
-        total_api_time = sum(r.get('api_time', 0) for r in api_results if r)
-        avg_api_time = total_api_time / len(api_results) if api_results else 0
-        st.success(f"✅ AI分析完成: {len(api_results)} 个, 总耗时{results['ai_time']:.1f}s, 平均每个{avg_api_time:.1f}s")
-        
-        # 阶段3: 结果处理
-        with st.spinner('📊 生成报告...'):
-            final_results, need_review = process_results(api_results, debug_mode)
-            # 将解析失败的文件也纳入最终结果，确保用户能看到
-            for fail in failed_parse:
-                fail_row = {
-                    '文件名': fail['name'],
-                    '处理状态': '失败',
-                    '错误信息': fail['error'],
-                }
-                if debug_mode:
-                    fail_row['_debug_extracted_text'] = fail.get('content', '')
-                final_results.append(fail_row)
-            results['final_results'] = final_results
-            results['need_review'] = need_review
-        
-        total_time = time.time() - overall_start
-        st.success(f"🎉 全部完成！总耗时 {total_time:.1f}s | 成功: {len([r for r in final_results if r['处理状态'] != '失败'])}, 需复核: {len(need_review)}")
-        
-    except Exception as e:
-        st.error(f"❌ 处理过程中出错: {str(e)}")
-        import traceback
-        st.code(traceback.format_exc())
-    
-    return results
+        # 近似重复组
+        if st.session_state.get('near_dup_groups'):
+            groups = st.session_state.near_dup_groups
+            with st.expander(f"🔁 近似重复简历 ({len(groups)} 组)"):
+                st.dataframe(pd.DataFrame([{
+                    '代表文件': g.representative,
+                    '同组文件': ', '.join(g.members),
+                    '相似度': f"{g.similarity:.0%}",
+                    '判定依据': g.reason
+                } for g in groups]), use_container_width=True)
+        
+        # Debug 信息不直接展示在UI上，仅在导出的调试附件中
+    
+    render_fulltext_search()
+    render_candidate_history()
 
 if __name__ == "__main__":
     main()
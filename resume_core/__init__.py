@@ -0,0 +1,6 @@
+"""
+简历筛选流水线核心库（不依赖 Streamlit）。
+
+resume.py 等页面脚本只负责界面交互，解析、隔离执行等重活都放在这里，
+以便在线程池、子进程和命令行中复用。
+"""
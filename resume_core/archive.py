@@ -0,0 +1,128 @@
+"""
+压缩包解压：ZIP / RAR / 7Z 中的简历文件流式写入暂存区。
+本模块不依赖 Streamlit，提示信息通过 warn 回调交给调用方显示。
+"""
+import io
+import os
+import zipfile
+from typing import List, Dict
+
+from resume_core.spool import BlobSpool, SpoolQuotaExceeded
+from resume_core.filenames import fix_garbled_filename, decode_zip_filenames
+
+try:
+    import rarfile
+    RAR_SUPPORT = True
+except ImportError:
+    RAR_SUPPORT = False
+
+try:
+    import py7zr
+    SEVENZ_SUPPORT = True
+except ImportError:
+    SEVENZ_SUPPORT = False
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+ARCHIVE_EXTENSIONS = ('.zip', '.rar', '.7z', '.7zip')
+
+
+def is_hidden_file(filename: str) -> bool:
+    """检查是否为隐藏文件"""
+    basename = os.path.basename(filename)
+    if basename.startswith('._'):
+        return True
+    if basename.startswith('.') or basename.startswith('~'):
+        return True
+    if basename.lower() in ['thumbs.db', 'desktop.ini', '.ds_store']:
+        return True
+    return False
+
+def extract_archive_files(source, file_name: str, max_size: int = 500 * 1024 * 1024, spool: BlobSpool = None,
+                          warn=None) -> List[Dict]:
+    """
+    批量解压压缩文件 - 支持大文件，接入整包文件名编码探测。
+    source 可以是 bytes 或上传文件对象；传入 spool 时解压出的文件直接流式写入暂存区，
+    返回的条目只带句柄 {'name', 'sha256', 'size', 'blob'}，不在内存中保留文件字节。
+    warn: 提示信息回调（过大、解压失败等），默认忽略
+    """
+    extracted_files = []
+    supported_ext = SUPPORTED_EXTENSIONS
+    warn = warn or (lambda message: None)
+    
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    source.seek(0, os.SEEK_END)
+    archive_size = source.tell()
+    source.seek(0)
+    if archive_size > max_size:
+        warn(f"❌ 压缩包过大 ({archive_size/1024/1024:.0f}MB > {max_size/1024/1024:.0f}MB 上限)")
+        return extracted_files
+    
+    def add_member(name: str, member) -> None:
+        if spool is not None:
+            item = spool.put(member)
+        else:
+            item = {'bytes': member.read()}
+        item['name'] = os.path.basename(name)
+        extracted_files.append(item)
+    
+    def spill_to_tempfile(suffix: str) -> str:
+        import tempfile
+        import shutil
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            shutil.copyfileobj(source, tmp, 1024 * 1024)
+            return tmp.name
+    
+    try:
+        if file_name.lower().endswith('.zip'):
+            zf = zipfile.ZipFile(source)
+            
+            with zf:
+                total_uncompressed = sum(info.file_size for info in zf.infolist())
+                if total_uncompressed > max_size * 2:
+                    warn(f"⚠️ 解压后文件过大 ({total_uncompressed/1024/1024:.0f}MB)")
+                
+                # 整包探测一次文件名编码，单遍解码全部文件名
+                name_mapping = decode_zip_filenames(zf)
+                
+                for original_name, decoded_name in name_mapping:
+                    if is_hidden_file(decoded_name):
+                        continue
+                    
+                    if decoded_name.lower().endswith(supported_ext):
+                        with zf.open(original_name) as member:
+                            add_member(decoded_name, member)
+        
+        elif file_name.lower().endswith('.rar') and RAR_SUPPORT:
+            tmp_path = spill_to_tempfile('.rar')
+            try:
+                with rarfile.RarFile(tmp_path) as rf:
+                    for item in rf.namelist():
+                        if is_hidden_file(item):
+                            continue
+                        if item.lower().endswith(supported_ext):
+                            # 使用更强大的全局逆转算法
+                            with rf.open(item) as member:
+                                add_member(fix_garbled_filename(item), member)
+            finally:
+                os.unlink(tmp_path)
+        
+        elif file_name.lower().endswith(('.7z', '.7zip')) and SEVENZ_SUPPORT:
+            tmp_path = spill_to_tempfile('.7z')
+            try:
+                with py7zr.SevenZipFile(tmp_path, mode='r') as zf:
+                    for name, bio in zf.readall().items():
+                        if is_hidden_file(name):
+                            continue
+                        if name.lower().endswith(supported_ext):
+                            # 使用更强大的全局逆转算法
+                            add_member(fix_garbled_filename(name), bio)
+            finally:
+                os.unlink(tmp_path)
+    
+    except SpoolQuotaExceeded:
+        raise
+    except Exception as e:
+        warn(f"解压失败 {file_name}: {str(e)}")
+    
+    return extracted_files
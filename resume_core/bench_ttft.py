@@ -0,0 +1,188 @@
+"""
+首字延迟（TTFT）基准：比较两种提示词布局下服务端前缀缓存的效果。
+
+- legacy：旧布局，日期、目标城市、文件名写在系统提示词开头，每个请求的前缀都不同
+- stable：当前布局，系统提示词逐字节固定，可变内容放在用户消息里
+
+    python -m resume_core.bench_ttft -n 20 --inputs 简历目录/
+    python -m resume_core.bench_ttft --profile 0319 --layouts stable --concurrency 4
+
+用流式接口计时到第一个内容片段；max_tokens 很小，只为测首字延迟。
+服务端返回缓存命中 token 数时一并统计（DeepSeek 的 prompt_cache_hit_tokens，
+或 OpenAI 兼容格式的 prompt_tokens_details.cached_tokens）。结果每种布局一行 JSON 输出到标准输出。
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict, List, Tuple
+
+import aiohttp
+
+from resume_core import llm
+from resume_core.compact import compact_resume_text
+from resume_core.extract import parse_single_file
+from resume_core.profiles import PROFILES, get_profile
+
+LAYOUTS = ('legacy', 'stable')
+
+SAMPLE_RESUME = """个人简历
+姓名：张三 性别：男 出生年月：1994年5月 电话：13800000000
+求职意向：高中数学教师
+教育背景
+2012-2016 华东师范大学 数学与应用数学 本科
+2016-2019 北京师范大学 课程与教学论 硕士
+工作经历
+2019-至今 深圳市某中学 高中数学教师，班主任 3 年，高二年级备课组长
+荣誉奖项
+2021 区优秀教师；2022 市青年教师教学大赛一等奖"""
+
+
+def load_texts(paths: List[str]) -> List[Tuple[str, str]]:
+    """读取输入简历：.txt 直接读取，其它格式走解析（不做 OCR）；没有输入时用内置样例"""
+    texts = []
+    for path in paths:
+        files = [os.path.join(root, f) for root, _, names in os.walk(path) for f in sorted(names)] if os.path.isdir(path) else [path]
+        for file_path in files:
+            name = os.path.basename(file_path)
+            if name.lower().endswith('.txt'):
+                with open(file_path, encoding='utf-8', errors='ignore') as f:
+                    texts.append((name, f.read()))
+            elif name.lower().endswith(('.pdf', '.docx', '.doc')):
+                result = parse_single_file({'name': name, 'blob': file_path}, use_ocr=False)
+                if not result.error and result.content.strip():
+                    texts.append((name, result.content))
+    return texts or [("高中数学-张三.pdf", SAMPLE_RESUME)]
+
+
+def build_layout(layout: str, profile, text: str, filename: str, target_city: str) -> Tuple[str, str]:
+    if layout == 'legacy':
+        # 旧布局：可变上下文在最前面，前缀因文件、日期而异
+        return profile.context(filename, target_city) + "\n\n" + profile.system_prompt, profile.user_prompt(text)
+    return llm.build_messages(profile, text, filename, target_city)
+
+
+def _cached_tokens(usage: Dict) -> int:
+    if not usage:
+        return 0
+    if 'prompt_cache_hit_tokens' in usage:
+        return usage.get('prompt_cache_hit_tokens') or 0
+    return (usage.get('prompt_tokens_details') or {}).get('cached_tokens') or 0
+
+
+async def measure_one(session: aiohttp.ClientSession, api_key: str, payload: Dict) -> Dict:
+    """发送一次流式请求，返回 {ttft, total, prompt_tokens, cached_tokens, error}"""
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    start = time.perf_counter()
+    ttft = None
+    usage = {}
+    try:
+        async with session.post(llm.API_URL, headers=headers, json=payload) as response:
+            if response.status != 200:
+                return {'error': f"API错误 {response.status}: {(await response.text())[:200]}"}
+            async for raw in response.content:
+                line = raw.decode('utf-8', errors='ignore').strip()
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                chunk = json.loads(data)
+                if chunk.get('usage'):
+                    usage = chunk['usage']
+                delta = (chunk.get('choices') or [{}])[0].get('delta') or {}
+                if ttft is None and (delta.get('content') or delta.get('reasoning_content')):
+                    ttft = time.perf_counter() - start
+    except Exception as e:
+        return {'error': f"请求异常: {str(e)}"}
+    return {
+        'ttft': ttft,
+        'total': time.perf_counter() - start,
+        'prompt_tokens': usage.get('prompt_tokens', 0),
+        'cached_tokens': _cached_tokens(usage),
+    }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def run_layout(layout: str, args, profile, texts: List[Tuple[str, str]]) -> Dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    async def one(i: int):
+        name, text = texts[i % len(texts)]
+        # 文件名带序号，模拟批量中每份简历各不相同
+        system_prompt, user_prompt = build_layout(layout, profile, compact_resume_text(text).text,
+                                                  f"{i:03d}-{name}", args.target_city)
+        payload = {
+            "model": args.model or profile.model,
+            "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            "temperature": profile.temperature,
+            "max_tokens": args.max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            **profile.extra_payload
+        }
+        async with semaphore:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                return await measure_one(session, args.api_key, payload)
+
+    samples = await asyncio.gather(*[one(i) for i in range(args.requests)])
+    ok = [s for s in samples if not s.get('error') and s.get('ttft') is not None]
+    ttfts = [s['ttft'] for s in ok]
+    prompt_tokens = sum(s['prompt_tokens'] for s in ok)
+    cached_tokens = sum(s['cached_tokens'] for s in ok)
+    return {
+        'layout': layout,
+        'profile': profile.name,
+        'prompt_key': profile.prompt_key,
+        'requests': len(samples),
+        'ok': len(ok),
+        'errors': sorted({s['error'] for s in samples if s.get('error')})[:3],
+        'ttft_p50': round(_percentile(ttfts, 0.5), 3),
+        'ttft_p90': round(_percentile(ttfts, 0.9), 3),
+        'ttft_mean': round(sum(ttfts) / len(ttfts), 3) if ttfts else 0.0,
+        'prompt_tokens': prompt_tokens,
+        'cached_tokens': cached_tokens,
+        'cache_hit_rate': round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m resume_core.bench_ttft", description="提示词布局首字延迟基准")
+    parser.add_argument('--inputs', nargs='*', default=[], help="简历文件或目录（.txt/.pdf/.docx/.doc），默认用内置样例")
+    parser.add_argument('--api-key', default=os.environ.get('SILICONFLOW_API_KEY'), help="默认读取环境变量 SILICONFLOW_API_KEY")
+    parser.add_argument('--profile', choices=list(PROFILES), default='0410', help="分析方案")
+    parser.add_argument('--model', default='', help="默认取分析方案的模型")
+    parser.add_argument('--layouts', nargs='+', choices=LAYOUTS, default=list(LAYOUTS), help="要测试的布局")
+    parser.add_argument('-n', '--requests', type=int, default=20, help="每种布局的请求数")
+    parser.add_argument('--concurrency', type=int, default=1, help="并发数（默认串行，计时最干净）")
+    parser.add_argument('--max-tokens', type=int, default=16, help="每次请求的输出上限")
+    parser.add_argument('--timeout', type=int, default=120, help="单次请求超时(秒)")
+    parser.add_argument('--target-city', default='深圳', help="目标城市")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("缺少 API key：使用 --api-key 或设置环境变量 SILICONFLOW_API_KEY")
+    profile = get_profile(args.profile)
+    texts = load_texts(args.inputs)
+    print(f"📝 {len(texts)} 份简历，每种布局 {args.requests} 次请求，并发 {args.concurrency}", file=sys.stderr)
+    for layout in args.layouts:
+        report = asyncio.run(run_layout(layout, args, profile, texts))
+        print(json.dumps(report, ensure_ascii=False), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import os
+import time
+import pickle
+import hashlib
+from typing import Dict
+
+
+# ============================
+# 缓存系统
+# ============================
+class ResumeCache:
+    """
+    基于内存和pickle的缓存系统。
+    实例是进程级共享的（后台任务管理器里多个会话的批处理同时使用），开关不放在实例上，
+    由调用方按本批配置（PipelineConfig.enable_cache）逐次传入 enabled
+    """
+    def __init__(self, cache_dir: str = ".resume_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_hash(self, data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()[:16]
+
+    def get(self, data: bytes, content_hash: str = None, enabled: bool = True) -> Dict:
+        """content_hash 为调用方已算好的内容 SHA-256，传入后不再重复哈希整个文件"""
+        if not enabled:
+            return None
+
+        key_hash = content_hash[:16] if content_hash else self._get_hash(data)
+        cache_path = os.path.join(self.cache_dir, f"{key_hash}.pkl")
+
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = pickle.load(f)
+                    if time.time() - cached['timestamp'] < 86400:
+                        return cached['data']
+            except:
+                pass
+        return None
+
+    def contains(self, content_hash: str, enabled: bool = True) -> bool:
+        """按内容哈希判断是否有未过期的缓存（只看文件时间，不读取内容）"""
+        if not enabled or not content_hash:
+            return False
+        cache_path = os.path.join(self.cache_dir, f"{content_hash[:16]}.pkl")
+        try:
+            return time.time() - os.path.getmtime(cache_path) < 86400
+        except OSError:
+            return False
+
+    def set(self, data: bytes, value: Dict, content_hash: str = None, enabled: bool = True):
+        if not enabled:
+            return
+
+        key_hash = content_hash[:16] if content_hash else self._get_hash(data)
+        cache_path = os.path.join(self.cache_dir, f"{key_hash}.pkl")
+
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump({'timestamp': time.time(), 'data': value}, f)
+        except:
+            pass
+
+cache = ResumeCache()
@@ -0,0 +1,104 @@
+"""
+批次级取消令牌：停止按钮、任务取消、整批截止时间统一通过令牌传到解析线程、OCR 请求和大模型请求。
+
+- token.cancelled 在调用 cancel()、超过截止时间或 should_stop() 返回 True 时为真，reason 说明原因
+- 解析线程内用 use_token(token) 绑定令牌，OCR 等长操作用 current_token() 取得，已取消时不再发请求
+- 协程用 run_cancellable(协程, token) 执行：令牌取消时中止协程（HTTP 连接随之关闭、信号量槽位立即释放），
+  抛出 Cancelled
+"""
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+
+POLL_INTERVAL = 0.1      # 协程检查令牌的间隔(秒)
+
+REASON_CANCELLED = 'cancelled'
+REASON_DEADLINE = 'deadline'
+REASON_LABELS = {REASON_CANCELLED: '已停止', REASON_DEADLINE: '超过整批截止时间'}
+
+
+class Cancelled(Exception):
+    """令牌取消后中止的操作抛出"""
+
+    def __init__(self, reason: str = REASON_CANCELLED):
+        super().__init__(REASON_LABELS.get(reason, reason))
+        self.reason = reason
+
+
+class CancelToken:
+    """
+    timeout: 整批截止时间（秒，从创建时算起），0 表示不限
+    should_stop: 外部的停止信号（例如后台任务的取消请求），检查令牌时一并轮询
+    """
+
+    def __init__(self, timeout: float = 0, should_stop: Callable[[], bool] = None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason = ''
+        self._should_stop = should_stop
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = REASON_CANCELLED):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set():
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.cancel(REASON_DEADLINE)
+            elif self._should_stop and self._should_stop():
+                self.cancel(REASON_CANCELLED)
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """距截止时间的秒数，不限时返回 None"""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled(self.reason)
+
+    async def wait(self):
+        """协程内等待令牌取消"""
+        while not self.cancelled:
+            remaining = self.remaining()
+            await asyncio.sleep(POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining))
+
+
+_current = contextvars.ContextVar('resume_cancel_token', default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    """当前线程（或协程上下文）绑定的令牌，未绑定时为 None"""
+    return _current.get()
+
+
+@contextmanager
+def use_token(token: Optional[CancelToken]):
+    """在当前上下文绑定令牌；线程内新建的事件循环中的协程同样能取到"""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+async def run_cancellable(coro: Awaitable, token: Optional[CancelToken]):
+    """执行协程，令牌取消时中止它并抛出 Cancelled；token 为 None 时直接执行"""
+    if token is None:
+        return await coro
+    task = asyncio.ensure_future(coro)
+    watcher = asyncio.ensure_future(token.wait())
+    try:
+        done, _ = await asyncio.wait([task, watcher], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for pending in (task, watcher):
+            pending.cancel()
+        await asyncio.gather(task, watcher, return_exceptions=True)
+    if task in done:
+        return task.result()
+    raise Cancelled(token.reason)
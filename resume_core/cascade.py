@@ -0,0 +1,146 @@
+"""
+分级提取：先用便宜的小模型提取，结果校验不通过再升级到大模型。
+
+校验与结果表的"需复核"标准一致（姓名、性别、学科齐全，本地预提取能补上的不算缺），
+另外检查明显不可信的输出：姓名在正文和文件名中都找不到、性别不是男/女、
+本地在正文里找到了本科学校而模型没给出、返回的段落为空。
+
+每份简历的每次请求记为一条 attempt（层级、模型、耗时、token 数、是否采用、不通过原因），
+cascade_stats 按层级汇总命中率、平均耗时、token 用量和按 MODEL_PRICES 估算的费用。
+"""
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_FAST_MODEL = "Qwen/Qwen2.5-7B-Instruct"
+
+TIER_FAST = 'fast'
+TIER_FULL = 'full'
+TIER_LABELS = {TIER_FAST: '小模型', TIER_FULL: '大模型'}
+
+# 模型单价（元 / 1K tokens）：(输入, 输出)，按硅基流动公开价格，调价时在这里更新；不在表里的模型不计费用
+MODEL_PRICES = {
+    'deepseek-ai/DeepSeek-V3': (0.002, 0.008),
+    'Pro/deepseek-ai/DeepSeek-V3.2': (0.002, 0.003),
+    'Qwen/Qwen2.5-7B-Instruct': (0.0, 0.0),
+}
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+def _text(value) -> str:
+    if value is None:
+        return ''
+    text = str(value).strip()
+    return '' if text in ('null', 'None') else text
+
+
+def check_extraction(api_result: Dict, sections: Sequence[str], content: str = '', filename: str = '',
+                     local: Dict = None) -> List[str]:
+    """返回不通过的原因，空列表表示结果可以直接采用。local 为本地预提取的字段（PreExtracted.to_dict()）"""
+    if 'error' in api_result:
+        return [f"请求失败: {str(api_result['error'])[:40]}"]
+    local = local or {}
+    reasons = [f"缺少{section}" for section in sections if not api_result.get(section)]
+    basic = api_result.get('basic_info') or {}
+    edu = api_result.get('education') or {}
+
+    name = _text(basic.get('name'))
+    if not (name or local.get('name')):
+        reasons.append("缺少姓名")
+    elif name and content:
+        # 模型给出的姓名在正文和文件名中都找不到，多半是编造的
+        haystack = _SPACE_RE.sub('', content) + filename
+        if _SPACE_RE.sub('', name) not in haystack:
+            reasons.append("姓名与原文不符")
+    gender = _text(basic.get('gender')) or local.get('gender', '')
+    if not gender:
+        reasons.append("缺少性别")
+    elif gender not in ('男', '女'):
+        reasons.append("性别无效")
+    if not (_text(basic.get('subject')) or local.get('subject')):
+        reasons.append("缺少学科")
+    if local.get('bachelor_school') and not _text(edu.get('bachelor_school')):
+        reasons.append("遗漏本科学校")
+    return reasons
+
+
+def request_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """一次请求的费用（元），模型不在 MODEL_PRICES 中时返回 None"""
+    price = MODEL_PRICES.get(model)
+    if price is None:
+        return None
+    return prompt_tokens / 1000 * price[0] + completion_tokens / 1000 * price[1]
+
+
+def _new_tier_stats() -> Dict:
+    return {'requests': 0, 'accepted': 0, 'latency': 0.0, 'prompt_tokens': 0, 'completion_tokens': 0,
+            'cost': 0.0, 'unpriced': 0, 'models': Counter(), 'reasons': Counter()}
+
+
+def cascade_stats(records: Iterable[Dict]) -> Dict[str, Dict]:
+    """
+    按层级汇总：请求数、采用数、命中率、平均耗时、token 用量、费用、常见的不通过原因。
+    cost 只计单价已知的请求，unpriced_requests 为模型不在 MODEL_PRICES 中、未计入费用的请求数
+    """
+    tiers: Dict[str, Dict] = {}
+    for record in records:
+        for attempt in (record or {}).get('attempts') or []:
+            stats = tiers.setdefault(attempt['tier'], _new_tier_stats())
+            stats['requests'] += 1
+            stats['accepted'] += bool(attempt.get('accepted'))
+            stats['latency'] += attempt.get('latency', 0.0)
+            stats['prompt_tokens'] += attempt.get('prompt_tokens', 0)
+            stats['completion_tokens'] += attempt.get('completion_tokens', 0)
+            cost = request_cost(attempt.get('model', ''), attempt.get('prompt_tokens', 0),
+                                attempt.get('completion_tokens', 0))
+            if cost is None:
+                stats['unpriced'] += 1
+            else:
+                stats['cost'] += cost
+            stats['models'][attempt.get('model', '')] += 1
+            stats['reasons'].update(attempt.get('reasons') or [])
+    summary = {}
+    for tier in sorted(tiers, key=lambda t: (t != TIER_FAST, t)):
+        stats = tiers[tier]
+        summary[tier] = {
+            'models': dict(stats['models']),
+            'requests': stats['requests'],
+            'accepted': stats['accepted'],
+            'hit_rate': round(stats['accepted'] / stats['requests'], 3) if stats['requests'] else 0.0,
+            'avg_latency': round(stats['latency'] / stats['requests'], 3) if stats['requests'] else 0.0,
+            'prompt_tokens': stats['prompt_tokens'],
+            'completion_tokens': stats['completion_tokens'],
+            'cost': round(stats['cost'], 4),
+            'unpriced_requests': stats['unpriced'],
+            'top_reasons': dict(stats['reasons'].most_common(5)),
+        }
+    return summary
+
+
+def total_cost(summary: Dict[str, Dict]) -> float:
+    """各层费用合计（元）"""
+    return round(sum(stats.get('cost', 0.0) for stats in summary.values()), 4)
+
+
+def _format_cost(stats: Dict) -> str:
+    text = f"费用 ¥{stats.get('cost', 0.0):.4f}"
+    if stats.get('unpriced_requests'):
+        text += f"（{stats['unpriced_requests']} 次请求的模型单价未知，未计入）"
+    return text
+
+
+def format_cascade_stats(summary: Dict[str, Dict]) -> List[str]:
+    """日志用的每层一行，多层时另加一行费用合计"""
+    lines = []
+    for tier, stats in summary.items():
+        line = (f"🪜 {TIER_LABELS.get(tier, tier)} ({', '.join(stats['models'])}): {stats['requests']} 次请求，"
+                f"采用 {stats['accepted']} ({stats['hit_rate']:.0%})，平均 {stats['avg_latency']:.1f}s，"
+                f"tokens 输入 {stats['prompt_tokens']} / 输出 {stats['completion_tokens']}，{_format_cost(stats)}")
+        if stats['top_reasons']:
+            line += "；未通过: " + ', '.join(f"{reason}×{n}" for reason, n in stats['top_reasons'].items())
+        lines.append(line)
+    if len(summary) > 1:
+        unpriced = sum(stats.get('unpriced_requests', 0) for stats in summary.values())
+        lines.append(f"💰 费用合计 ¥{total_cost(summary):.4f}" + (f"（{unpriced} 次请求未计入）" if unpriced else ""))
+    return lines
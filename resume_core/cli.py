@@ -0,0 +1,268 @@
+"""
+命令行批处理：不启动 Streamlit，直接对目录或压缩包跑完整流程并导出 Excel / CSV / Parquet。
+
+    python -m resume_core.cli 简历目录/ -o 结果.xlsx --api-concurrency 50
+    python -m resume_core.cli 简历.zip 补充简历/ -o 结果.parquet --no-cache --model deepseek-ai/DeepSeek-V3
+    python -m resume_core.cli 简历目录/ --profile 0319        # 使用 0319 版提示词与评分
+    python -m resume_core.cli 简历目录/ --journal            # 写任务日志，中断后可 --resume <任务ID> 继续
+    python -m resume_core.cli 简历目录/ -o 结果.csv --debug   # 调试数据另存为 结果.debug.zip
+    python -m resume_core.cli 简历目录/ --cascade            # 先用小模型提取，不合格的再交给大模型
+    python -m resume_core.cli 简历目录/ --hedge              # 慢请求超过近期 p95 耗时后补发一份，先返回的采用
+    python -m resume_core.cli 简历目录/ --deadline 600       # 10 分钟后停止，导出已完成的部分
+
+API key 取 --api-key 或环境变量 SILICONFLOW_API_KEY。
+Ctrl+C 第一次按下时停止批次（进行中的请求立即中止）并照常导出已完成的部分，再按一次直接退出。
+处理日志输出到标准错误，结束时在标准输出打印一行 JSON 计时汇总，便于定时任务采集。
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import tempfile
+from datetime import datetime
+from typing import List, Dict, Tuple
+
+from resume_core.cache import cache
+from resume_core.archive import extract_archive_files, is_hidden_file, SUPPORTED_EXTENSIONS, ARCHIVE_EXTENSIONS
+from resume_core.identity import ContentIndex, content_hash
+from resume_core.config import PipelineConfig
+from resume_core.export import EXPORT_FORMATS, export_rows, format_from_path, has_debug, write_debug_archive, debug_archive_path
+from resume_core.journal import JobJournal
+from resume_core.pipeline import PipelineCallbacks, run_pipeline
+from resume_core.profiles import PROFILES, get_profile
+from resume_core.spool import BlobSpool
+
+
+def collect_items(paths: List[str], spool: BlobSpool, warn) -> Tuple[List[Dict], int]:
+    """
+    收集输入：目录递归查找简历文件和压缩包，压缩包解压到暂存区。
+    目录中的文件直接按路径读取，不复制；按内容哈希去重。返回 (队列条目, 合并掉的重复文件数)
+    """
+    index = ContentIndex()
+    items = []
+    seen_names = set()
+
+    def unique_name(name: str, rel_path: str) -> str:
+        # 不同子目录下的同名文件用相对路径区分，避免结果行和任务日志按文件名冲突
+        return rel_path if name in seen_names else name
+
+    def add(item: Dict):
+        if index.add(item):
+            items.append(item)
+            seen_names.add(item['name'])
+
+    def add_archive(path: str):
+        with open(path, 'rb') as f:
+            for member in extract_archive_files(f, os.path.basename(path), spool=spool, warn=warn):
+                member['name'] = unique_name(member['name'], f"{os.path.basename(path)}/{member['name']}")
+                add(member)
+
+    def add_file(path: str, rel_path: str):
+        with open(path, 'rb') as f:
+            sha256 = content_hash(f)
+        name = unique_name(os.path.basename(path), rel_path)
+        add({'name': name, 'sha256': sha256, 'size': os.path.getsize(path), 'blob': path})
+
+    for path in paths:
+        lower = path.lower()
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not is_hidden_file(d))
+                for file_name in sorted(files):
+                    if is_hidden_file(file_name):
+                        continue
+                    full_path = os.path.join(root, file_name)
+                    if file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        add_file(full_path, os.path.relpath(full_path, path))
+                    elif file_name.lower().endswith(ARCHIVE_EXTENSIONS):
+                        add_archive(full_path)
+        elif lower.endswith(ARCHIVE_EXTENSIONS):
+            add_archive(path)
+        elif lower.endswith(SUPPORTED_EXTENSIONS):
+            add_file(path, os.path.basename(path))
+        else:
+            warn(f"⚠️ 跳过不支持的输入: {path}")
+    return items, index.collapsed
+
+
+def build_parser() -> argparse.ArgumentParser:
+    defaults = PipelineConfig()
+    parser = argparse.ArgumentParser(
+        prog="python -m resume_core.cli",
+        description="简历批量解析（命令行模式）：目录或压缩包 -> Excel / CSV / Parquet"
+    )
+    parser.add_argument('inputs', nargs='*', help="简历目录、压缩包或单个简历文件（可多个）")
+    parser.add_argument('-o', '--output', help="输出文件（.xlsx / .csv / .parquet），默认 简历筛选结果_<时间>.xlsx")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), help="输出格式，默认按输出文件扩展名判断")
+    parser.add_argument('--api-key', default=os.environ.get('SILICONFLOW_API_KEY'), help="默认读取环境变量 SILICONFLOW_API_KEY")
+    parser.add_argument('--profile', choices=list(PROFILES), default=defaults.profile, help="分析方案（提示词 + 评分规则）")
+    parser.add_argument('--model', default='', help="结构化提取使用的模型，默认取分析方案的模型")
+    parser.add_argument('--cascade', action='store_true', help="分级提取：先用小模型，校验不通过再升级到大模型")
+    parser.add_argument('--fast-model', default=defaults.fast_model, help="分级提取第一层使用的小模型")
+    parser.add_argument('--workers', type=int, default=defaults.max_workers, help="解析并发数")
+    parser.add_argument('--upload-order', action='store_true', help="按输入顺序处理（默认按预估耗时从短到长）")
+    parser.add_argument('--api-concurrency', type=int, default=defaults.max_concurrent_api, help="API 并发数")
+    parser.add_argument('--api-timeout', type=int, default=defaults.api_timeout, help="单次 API 超时(秒)")
+    parser.add_argument('--deadline', type=int, default=defaults.batch_deadline, help="整批截止时间(秒)，到时停止并导出已完成的部分；0 表示不限")
+    parser.add_argument('--no-stream', action='store_true', help="不使用流式响应（关闭停滞检测）")
+    parser.add_argument('--ttft-timeout', type=float, default=defaults.ttft_timeout, help="流式响应首字超时(秒)，超时中止重试")
+    parser.add_argument('--stall-timeout', type=float, default=defaults.stall_timeout, help="流式响应相邻片段最长间隔(秒)")
+    parser.add_argument('--hedge', action='store_true', help="对冲请求：耗时超过近期分位数仍未返回时再发一份，先返回的采用")
+    parser.add_argument('--hedge-percentile', type=float, default=defaults.hedge_percentile, help="触发对冲的耗时分位数")
+    parser.add_argument('--hedge-budget', type=float, default=defaults.hedge_budget, help="对冲请求数上限（占已发请求数的比例）")
+    parser.add_argument('--token-budget', type=int, default=defaults.token_budget, help="单份简历送入大模型的 token 上限，0 表示不压缩")
+    parser.add_argument('--pack', action='store_true', help="短简历合并请求（多份共用一次请求）")
+    parser.add_argument('--pack-max-items', type=int, default=defaults.pack_max_items, help="每次合并请求最多几份简历")
+    parser.add_argument('--target-city', default='', help="目标城市（参与评分）")
+    parser.add_argument('--no-ocr', action='store_true', help="不对图片型 PDF/DOCX 做 OCR")
+    parser.add_argument('--no-cache', action='store_true', help="不读写解析缓存")
+    parser.add_argument('--cache-dir', help="解析缓存目录")
+    parser.add_argument('--isolated', action='store_true', help="隔离解析：每个文件在子进程中解析，超时强制终止")
+    parser.add_argument('--parse-timeout', type=int, default=defaults.parse_timeout, help="隔离解析单文件超时(秒)")
+    parser.add_argument('--no-near-dup', action='store_true', help="关闭近似重复合并")
+    parser.add_argument('--store', default=defaults.candidate_store, help="候选人库（SQLite）路径，结果跨批次累积")
+    parser.add_argument('--no-store', action='store_true', help="不写入候选人库")
+    parser.add_argument('--debug', action='store_true', help="附带原始解析文本和 API 请求/响应，另存为 <输出文件名>.debug.zip")
+    parser.add_argument('--journal', action='store_true', help="写任务日志，中断后可用 --resume 继续")
+    parser.add_argument('--resume', metavar='JOB_ID', help="从任务日志继续一个未完成的任务（忽略 inputs）")
+    parser.add_argument('--summary', help="计时汇总 JSON 另存到该文件")
+    parser.add_argument('-q', '--quiet', action='store_true', help="不输出处理日志")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("缺少 API key：使用 --api-key 或设置环境变量 SILICONFLOW_API_KEY")
+    if not args.inputs and not args.resume:
+        parser.error("请指定输入目录/压缩包，或使用 --resume 继续任务")
+
+    output = args.output or f"简历筛选结果_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+    fmt = args.format or format_from_path(output)
+    debug_output = None
+
+    config = PipelineConfig(
+        target_city=args.target_city,
+        max_workers=args.workers,
+        shortest_first=not args.upload_order,
+        max_concurrent_api=args.api_concurrency,
+        api_timeout=args.api_timeout,
+        batch_deadline=args.deadline,
+        token_budget=args.token_budget,
+        stream_responses=not args.no_stream,
+        ttft_timeout=args.ttft_timeout,
+        stall_timeout=args.stall_timeout,
+        hedge_requests=args.hedge,
+        hedge_percentile=args.hedge_percentile,
+        hedge_budget=args.hedge_budget,
+        pack_requests=args.pack,
+        pack_max_items=args.pack_max_items,
+        enable_cache=not args.no_cache,
+        isolated_parse=args.isolated,
+        parse_timeout=args.parse_timeout,
+        near_dup_detect=not args.no_near_dup,
+        profile=args.profile,
+        model=args.model,
+        cascade=args.cascade,
+        fast_model=args.fast_model,
+        use_ocr=not args.no_ocr,
+        debug_mode=args.debug,
+        candidate_store='' if args.no_store else args.store,
+    )
+    if args.cache_dir:
+        cache.cache_dir = args.cache_dir
+        os.makedirs(args.cache_dir, exist_ok=True)
+
+    warn = lambda message: print(message, file=sys.stderr, flush=True)
+    stop = threading.Event()
+
+    def on_interrupt(signum, frame):
+        # 第一次 Ctrl+C 停止批次并保留已完成的部分，第二次恢复默认行为直接退出
+        stop.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        warn("⏹️ 正在停止，已完成的结果照常导出（再按一次 Ctrl+C 直接退出）")
+
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread():
+        previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+    callbacks = (PipelineCallbacks(log=warn, should_stop=stop.is_set) if not args.quiet
+                 else PipelineCallbacks(should_stop=stop.is_set))
+    overall_start = time.time()
+    spool = BlobSpool(root=os.path.join(tempfile.gettempdir(), "resume_cli_spool"))
+    try:
+        collect_start = time.time()
+        collapsed = 0
+        journal = None
+        if args.resume:
+            journal = JobJournal.open(args.resume)
+            if journal is None:
+                parser.error(f"找不到任务日志: {args.resume}")
+            items = journal.load_items()
+        else:
+            items, collapsed = collect_items(args.inputs, spool, warn)
+            if args.journal:
+                journal = JobJournal.create(items, config.to_dict())
+                items = journal.load_items()
+        collect_time = time.time() - collect_start
+        if not items:
+            warn("❌ 没有找到可处理的简历文件")
+            return 1
+        if journal:
+            warn(f"🗂️ 任务ID: {journal.job_id}")
+
+        results = run_pipeline(items, args.api_key, config, callbacks, journal)
+        if results['final_results']:
+            export_rows(results['final_results'], output, fmt)
+            if has_debug(results['final_results']):
+                debug_output = debug_archive_path(output)
+                write_debug_archive(results['final_results'], debug_output)
+    finally:
+        spool.cleanup()
+        if previous_handler is not None:
+            signal.signal(signal.SIGINT, previous_handler)
+
+    final_results = results['final_results']
+    summary = {
+        'job_id': journal.job_id if journal else None,
+        'output': output if final_results else None,
+        'format': fmt,
+        'debug_archive': debug_output,
+        'candidate_store': config.candidate_store or None,
+        'files': len(items),
+        'duplicates_collapsed': collapsed,
+        'parsed': len(results['parsed_results']),
+        'parse_failed': len(results['failed_parse']),
+        'rows': len(final_results),
+        'stopped': results.get('cancel_reason') or None,
+        'need_review': len(results['need_review']),
+        'saved_api_calls': results['saved_api_calls'],
+        'api_requests': results.get('api_requests', 0),
+        'stall_retries': results.get('stall_retries', 0),
+        'model_tiers': results.get('model_tiers', {}),
+        'model_cost': results.get('model_cost', 0.0),
+        'latency': results.get('latency', {}),
+        'tokens': {'input': results.get('input_tokens', 0), 'saved': results.get('tokens_saved', 0)},
+        'profile': config.profile,
+        'prompt_key': get_profile(config.profile).prompt_key,
+        'model': config.model or get_profile(config.profile).model,
+        'timings': {
+            'collect': round(collect_time, 3),
+            'parse': round(results['parse_time'], 3),
+            'llm': round(results['ai_time'], 3),
+            'total': round(time.time() - overall_start, 3),
+        },
+    }
+    line = json.dumps(summary, ensure_ascii=False)
+    print(line, flush=True)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            f.write(line + "\n")
+    return 0 if final_results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
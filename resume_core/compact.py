@@ -0,0 +1,162 @@
+"""
+送入大模型前的简历文本压缩：按 token 预算裁剪，减少输入 token 和首字延迟。
+
+解析结果里常混有大量对提取无用的内容：Markdown 表格分隔行、页码标记、文档元数据头、
+顶部补充 OCR 与正文重复的行，以及动辄上万字的证书 / 附件扫描文本。这里分三步处理：
+1. 规范化：全角转半角、去掉解析标记和表格分隔行、压缩空白、删除重复行
+2. 分段：按小标题把文本切成 基本信息 / 教育背景 / 工作经历 / 荣誉 / 其它 等段落
+3. 裁剪：超出预算时按价值从低到高整段删除，仍超出则从最长的段落末尾逐行截断
+
+token 数用本地估算（不调用分词器服务）：按 DeepSeek 官方换算，
+1 个中文字符约 0.6 token，1 个英文字符/数字/符号约 0.3 token。
+"""
+import re
+import math
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+DEFAULT_TOKEN_BUDGET = 6000   # 单份简历送入大模型的 token 上限，0 表示不压缩
+MIN_DEDUP_LINE = 8            # 长度不足的行（日期、单个词）不参与去重，避免误删表格内容
+
+# 段落类别与保留优先级（数值越大越重要，裁剪时最后删除）
+SECTION_BASIC = '基本信息'
+SECTION_EDUCATION = '教育背景'
+SECTION_WORK = '工作经历'
+SECTION_HONOR = '荣誉'
+SECTION_OTHER = '其它'
+SECTION_LOW = '附加材料'
+
+SECTION_PRIORITY = {
+    SECTION_BASIC: 5,
+    SECTION_EDUCATION: 4,
+    SECTION_WORK: 4,
+    SECTION_HONOR: 3,
+    SECTION_OTHER: 2,
+    SECTION_LOW: 1,
+}
+
+# 小标题关键词 -> 段落类别（按顺序匹配，先匹配先得）
+_SECTION_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+    (SECTION_LOW, ('附件', '证书扫描', '证件照', '自我评价', '个人评价', '自我介绍', '兴趣爱好', '个人爱好', '特长爱好')),
+    (SECTION_BASIC, ('基本信息', '个人信息', '基本资料', '个人资料', '联系方式', '求职意向', '应聘岗位')),
+    (SECTION_EDUCATION, ('教育背景', '教育经历', '学习经历', '学历', '教育情况')),
+    (SECTION_WORK, ('工作经历', '工作经验', '任教经历', '教学经历', '实习经历', '项目经历', '工作履历', '从业经历')),
+    (SECTION_HONOR, ('荣誉', '获奖', '奖项', '证书', '科研成果', '教学成果', '论文', '竞赛')),
+    (SECTION_OTHER, ('培训经历', '校园经历', '社会实践', '社团', '技能', '其他', '其它')),
+]
+_HEADING_MAX_LEN = 14         # 超过该长度的行不视为小标题
+_HEADING_STRIP = '【】[]■□●◆◇▲►▶★☆#*:：|-—_ \t0123456789.、一二三四五六七八九十()（）'
+
+_CJK_RE = re.compile(r'[\u4e00-\u9fa5]')
+_SPACE_RE = re.compile(r'\s+')
+_TABLE_SEP_RE = re.compile(r'^\|?(\s*:?-{3,}:?\s*\|)+\s*:?-*:?\s*\|?$')
+_EMPTY_CELLS_RE = re.compile(r'(\|\s*){2,}')
+_PAGE_MARK_RE = re.compile(r'^-{2,}\s*第\d+页[^-]*-{2,}$')
+_MARKER_RE = re.compile(r'^\[(PDF[^\]]*|图片OCR内容|图片\d+|DOCX OCR[^\]]*)\]$|^【正文提取】$')
+_META_BLOCK_RE = re.compile(r'【文档元数据】.*?(?=【正文提取】|$)', re.DOTALL)
+
+
+@dataclass
+class CompactResult:
+    text: str
+    original_tokens: int
+    tokens: int
+    dropped_sections: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """本地 token 估算：中文 0.6/字，其它非空白字符 0.3/字"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk - text.count(' ') - text.count('\n')
+    return math.ceil(cjk * 0.6 + max(other, 0) * 0.3)
+
+
+def normalize_resume_text(text: str) -> str:
+    """全角转半角、去掉解析标记/元数据/表格分隔行、压缩空白、删除重复的长行"""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = _META_BLOCK_RE.sub('', text)
+    lines = []
+    seen = set()
+    for line in text.splitlines():
+        line = _EMPTY_CELLS_RE.sub('| ', _SPACE_RE.sub(' ', line)).strip(' |')
+        if not line or _TABLE_SEP_RE.match(line) or _PAGE_MARK_RE.match(line) or _MARKER_RE.match(line):
+            continue
+        if len(line) >= MIN_DEDUP_LINE:
+            # 顶部补充 OCR、OCR 与文字层重复的内容只保留第一次出现
+            key = line.replace(' ', '')
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def _heading_section(line: str) -> str:
+    """判断一行是否是小标题，是则返回段落类别，否则返回空字符串"""
+    core = line.strip(_HEADING_STRIP)
+    # "学历：本科" 这类键值行不是小标题
+    if not core or len(core) > _HEADING_MAX_LEN or ':' in core:
+        return ''
+    for section, keywords in _SECTION_KEYWORDS:
+        if any(k in core for k in keywords):
+            return section
+    return ''
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """按小标题切分为 [(段落类别, 行列表)]，第一个小标题之前的内容归入基本信息"""
+    sections = [(SECTION_BASIC, [])]
+    for line in text.splitlines():
+        section = _heading_section(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if lines]
+
+
+def compact_resume_text(text: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> CompactResult:
+    """规范化 + 分段 + 按预算裁剪；token_budget <= 0 时只做规范化"""
+    original_tokens = estimate_tokens(text)
+    normalized = normalize_resume_text(text)
+    tokens = estimate_tokens(normalized)
+    if token_budget <= 0 or tokens <= token_budget:
+        return CompactResult(normalized, original_tokens, tokens)
+
+    sections = split_sections(normalized)
+    costs = [estimate_tokens('\n'.join(lines)) for _, lines in sections]
+    kept = list(range(len(sections)))
+    dropped = []
+    # 价值低的先删；同一优先级先删靠后的段落（附件、补充材料通常在末尾）
+    for idx in sorted(kept, key=lambda i: (SECTION_PRIORITY[sections[i][0]], -i)):
+        if tokens <= token_budget or SECTION_PRIORITY[sections[idx][0]] >= SECTION_PRIORITY[SECTION_EDUCATION]:
+            break
+        if len(kept) == 1:
+            break
+        kept.remove(idx)
+        dropped.append(sections[idx][0])
+        tokens -= costs[idx]
+
+    # 核心段落本身就超预算：从最长的段落末尾逐行截断
+    truncated = False
+    kept_lines = {i: list(sections[i][1]) for i in kept}
+    while tokens > token_budget:
+        longest = max(kept_lines, key=lambda i: costs[i] if len(kept_lines[i]) > 1 else -1)
+        if len(kept_lines[longest]) <= 1:
+            break
+        line = kept_lines[longest].pop()
+        cost = estimate_tokens(line)
+        costs[longest] -= cost
+        tokens -= cost
+        truncated = True
+
+    text = '\n'.join(line for i in kept for line in kept_lines[i])
+    return CompactResult(text, original_tokens, estimate_tokens(text), dropped, truncated)
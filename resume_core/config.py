@@ -0,0 +1,64 @@
+"""
+流程配置对象：页面、后台任务、命令行共用，替代散落在各处的 st.session_state.config 读取。
+
+页面里仍以字典形式保存在 session_state（便于控件直接读写），
+提交任务时用 PipelineConfig.from_dict 转成配置对象，未知键忽略、缺失键取默认值。
+"""
+from dataclasses import dataclass, asdict, fields
+from typing import Dict
+
+from resume_core.cascade import DEFAULT_FAST_MODEL
+from resume_core.compact import DEFAULT_TOKEN_BUDGET
+from resume_core.hedge import DEFAULT_HEDGE_PERCENTILE, DEFAULT_HEDGE_BUDGET
+from resume_core.packing import DEFAULT_PACK_MAX_ITEMS, DEFAULT_PACK_ITEM_TOKENS, DEFAULT_PACK_BUDGET_TOKENS
+from resume_core.neardup import DEFAULT_THRESHOLD as NEAR_DUP_THRESHOLD
+from resume_core.sandbox import DEFAULT_PARSE_TIMEOUT, DEFAULT_MEMORY_LIMIT_MB
+from resume_core.spool import DEFAULT_QUOTA_MB
+from resume_core.store import DEFAULT_STORE_PATH
+
+
+@dataclass
+class PipelineConfig:
+    target_city: str = ""
+    max_workers: int = 20                         # 解析并发数
+    shortest_first: bool = True                   # 按预估耗时从短到长安排解析和 AI 分析，短简历先出结果
+    api_timeout: int = 60                         # 单次 API 超时(秒)
+    batch_deadline: int = 0                       # 整批截止时间(秒)，到时停止并返回已完成的部分；0 表示不限
+    enable_cache: bool = True                     # 解析缓存
+    max_concurrent_api: int = 100                 # API 并发数
+    api_retry: int = 2                            # 重试次数（流式响应停滞后重新请求）
+    stream_responses: bool = True                 # 流式响应：停滞检测 + 字段边收边显示
+    ttft_timeout: float = 20.0                    # 流式响应首字超时(秒)，超时中止并重试
+    stall_timeout: float = 15.0                   # 流式响应相邻片段最长间隔(秒)
+    hedge_requests: bool = False                  # 对冲请求：耗时超过近期分位数仍未返回时再发一份，先返回的采用
+    hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE  # 触发对冲的耗时分位数
+    hedge_budget: float = DEFAULT_HEDGE_BUDGET    # 对冲请求数上限（占已发请求数的比例）
+    isolated_parse: bool = False                  # 隔离解析：每个文件在子进程中执行，可强制超时终止
+    parse_timeout: int = DEFAULT_PARSE_TIMEOUT    # 隔离模式下单文件超时(秒)
+    parse_memory_mb: int = DEFAULT_MEMORY_LIMIT_MB  # 隔离模式下单进程内存上限(MB)
+    near_dup_detect: bool = True                  # 近似重复检测：同组简历只调用一次 AI
+    near_dup_threshold: float = NEAR_DUP_THRESHOLD  # 近似重复的文本相似度阈值
+    spool_quota_mb: int = DEFAULT_QUOTA_MB        # 单会话磁盘暂存配额(MB)
+    token_budget: int = DEFAULT_TOKEN_BUDGET      # 单份简历送入大模型的 token 上限，0 表示不压缩
+    pack_requests: bool = False                   # 短简历合并请求：多份共用一次请求和系统提示词
+    pack_max_items: int = DEFAULT_PACK_MAX_ITEMS  # 每次合并请求最多几份
+    pack_item_tokens: int = DEFAULT_PACK_ITEM_TOKENS  # 参与合并的单份简历 token 上限
+    pack_budget_tokens: int = DEFAULT_PACK_BUDGET_TOKENS  # 合并请求的简历正文 token 总上限
+    profile: str = "0410"                         # 分析方案：提示词 + 评分规则（见 resume_core.profiles）
+    model: str = ""                               # 结构化提取模型，留空使用分析方案的默认模型
+    cascade: bool = False                         # 分级提取：先用小模型，校验不通过再升级到大模型
+    fast_model: str = DEFAULT_FAST_MODEL          # 分级提取的第一层（小模型）
+    use_ocr: bool = True                          # 图片型 PDF/DOCX 走 OCR
+    debug_mode: bool = False                      # 结果中附带原始解析文本和 API 请求/响应
+    candidate_store: str = DEFAULT_STORE_PATH     # 候选人库（SQLite）路径，结果跨批次累积；留空不写入
+    fulltext_index: bool = True                   # 解析出的正文写入候选人库的全文索引（需要 SQLite FTS5）
+
+    @classmethod
+    def from_dict(cls, data: Dict = None) -> 'PipelineConfig':
+        if isinstance(data, cls):
+            return data
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in names})
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
@@ -0,0 +1,271 @@
+"""
+结果导出：Excel / CSV / Parquet 逐行流式写出，调试数据另存为压缩附件。
+
+- Excel 用 xlsxwriter 的 constant_memory 模式逐行写盘，内存占用与行数无关
+- CSV 带 BOM，Excel 直接打开不乱码
+- Parquet 按列推断类型后分批写入（需要 pyarrow）
+
+调试模式下每行带有 _debug_extracted_text / _debug_prompt / _debug_raw_response，
+其中提示词每行重复一整份系统提示词。导出时这些列从主表剥离，写入 zip 附件：
+prompts.json 存去重后的提示词模板，debug.jsonl 每行一条，以 row（主表数据行下标，从 0 开始）
+和文件名为键，只记录模板编号和各行不同的上下文部分。
+"""
+import io
+import os
+import csv
+import json
+import math
+import hashlib
+import zipfile
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from resume_core.profiles import PROFILES
+
+# ============================
+# 可选依赖加载与状态监测
+# ============================
+try:
+    import xlsxwriter
+    XLSXWRITER_SUPPORT = True
+except ImportError:
+    XLSXWRITER_SUPPORT = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_SUPPORT = True
+except ImportError:
+    PARQUET_SUPPORT = False
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+EXPORT_MIME = {
+    'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    'csv': "text/csv",
+    'parquet': "application/vnd.apache.parquet",
+}
+DEBUG_PREFIX = '_debug_'
+DEBUG_MIME = "application/zip"
+XLSX_MAX_CELL = 32767        # Excel 单元格字符上限，超出截断
+PARQUET_BATCH_ROWS = 5000    # Parquet 每批写入行数
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or PARQUET_SUPPORT]
+
+
+def format_from_path(path: str, default: str = 'xlsx') -> str:
+    lower = path.lower()
+    for fmt in EXPORT_FORMATS:
+        if lower.endswith('.' + fmt):
+            return fmt
+    return default
+
+
+def export_columns(rows: Iterable[Dict]) -> List[str]:
+    """所有行的列名并集（按首次出现顺序），不含调试列"""
+    columns = {}
+    for row in rows:
+        for key in row:
+            if key not in columns and not key.startswith(DEBUG_PREFIX):
+                columns[key] = None
+    return list(columns)
+
+
+def has_debug(rows: Iterable[Dict]) -> bool:
+    return any(key.startswith(DEBUG_PREFIX) for row in rows for key in row)
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _cell_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _number(value):
+    """数值（含 numpy 标量）返回 Python 数字，否则返回 None；布尔值不算数值"""
+    if isinstance(value, bool) or not hasattr(value, '__float__'):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(number):
+        return None
+    return int(value) if number.is_integer() and not isinstance(value, float) else number
+
+
+# ============================
+# 主表写出
+# ============================
+def _write_xlsx(rows: Sequence[Dict], columns: List[str], target):
+    if not XLSXWRITER_SUPPORT:
+        import pandas as pd
+        pd.DataFrame(list(rows), columns=columns).to_excel(target, index=False)
+        return
+    workbook = xlsxwriter.Workbook(target, {
+        'constant_memory': True,
+        # 简历内容里的 "=" 开头文本、网址都按普通文本写入
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'strings_to_numbers': False,
+    })
+    sheet = workbook.add_worksheet('简历筛选结果')
+    header = workbook.add_format({'bold': True})
+    for c, name in enumerate(columns):
+        sheet.write_string(0, c, name, header)
+    sheet.freeze_panes(1, 0)
+    for r, row in enumerate(rows, start=1):
+        for c, name in enumerate(columns):
+            value = row.get(name)
+            if _is_missing(value):
+                continue
+            if isinstance(value, bool):
+                sheet.write_boolean(r, c, value)
+                continue
+            number = _number(value)
+            if number is not None:
+                sheet.write_number(r, c, number)
+            else:
+                sheet.write_string(r, c, _cell_text(value)[:XLSX_MAX_CELL])
+    workbook.close()
+
+
+def _write_csv(rows: Sequence[Dict], columns: List[str], target):
+    def write(f):
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(['' if _is_missing(row.get(name)) else _cell_text(row.get(name)) for name in columns])
+
+    if isinstance(target, str):
+        with open(target, 'w', encoding='utf-8-sig', newline='') as f:
+            write(f)
+    else:
+        f = io.TextIOWrapper(target, encoding='utf-8-sig', newline='')
+        write(f)
+        f.flush()
+        f.detach()
+
+
+def _parquet_type(values: Iterable):
+    """按非空值推断列类型：全为整数 -> int64，全为数值 -> float64，全为布尔 -> bool，否则字符串"""
+    kinds = set()
+    for value in values:
+        if _is_missing(value):
+            continue
+        if isinstance(value, bool):
+            kinds.add('bool')
+        elif _number(value) is not None:
+            kinds.add('int' if isinstance(_number(value), int) else 'float')
+        else:
+            return pa.string()
+    if kinds == {'bool'}:
+        return pa.bool_()
+    if kinds == {'int'}:
+        return pa.int64()
+    if kinds and kinds <= {'int', 'float'}:
+        return pa.float64()
+    return pa.string()
+
+
+def _write_parquet(rows: Sequence[Dict], columns: List[str], target):
+    if not PARQUET_SUPPORT:
+        raise RuntimeError("Parquet 导出需要 pyarrow: pip install pyarrow")
+    # 大模型返回的字段类型不固定（如年龄可能是数字或文字），混合类型的列统一转成字符串
+    schema = pa.schema([(name, _parquet_type(row.get(name) for row in rows)) for name in columns])
+
+    def convert(value, kind):
+        if _is_missing(value):
+            return None
+        if kind == pa.string():
+            return _cell_text(value)
+        if kind == pa.bool_():
+            return bool(value)
+        return _number(value)
+
+    with pq.ParquetWriter(target, schema) as writer:
+        for start in range(0, len(rows), PARQUET_BATCH_ROWS):
+            batch = rows[start:start + PARQUET_BATCH_ROWS]
+            arrays = [pa.array([convert(row.get(f.name), f.type) for row in batch], type=f.type) for f in schema]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+_WRITERS = {'xlsx': _write_xlsx, 'csv': _write_csv, 'parquet': _write_parquet}
+
+
+def export_rows(rows: Sequence[Dict], target, fmt: str = 'xlsx'):
+    """把结果行写到文件路径或二进制文件对象，调试列不写入主表"""
+    if fmt not in _WRITERS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    _WRITERS[fmt](rows, export_columns(rows), target)
+
+
+def export_bytes(rows: Sequence[Dict], fmt: str = 'xlsx') -> bytes:
+    output = io.BytesIO()
+    export_rows(rows, output, fmt)
+    return output.getvalue()
+
+
+# ============================
+# 调试附件
+# ============================
+def _prompt_id(template: str) -> str:
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:8]
+
+
+def split_prompt(prompt: str, templates: Sequence[str]) -> Tuple[str, str]:
+    """把调试提示词拆成 (模板, 各行不同的上下文)；不以已知模板开头的整段作为模板"""
+    for template in templates:
+        if template and prompt.startswith(template):
+            return template, prompt[len(template):]
+    return prompt, ''
+
+
+def write_debug_archive(rows: Sequence[Dict], target, templates: Sequence[str] = None) -> int:
+    """
+    调试数据写入 zip 附件（target 为路径或二进制文件对象），返回写入的记录数。
+    templates 为已知的提示词模板，默认取所有分析方案的系统提示词。
+    """
+    if templates is None:
+        templates = [p.system_prompt for p in PROFILES.values()]
+    # 长的优先匹配，避免一个模板是另一个的前缀时拆错
+    templates = sorted(templates, key=len, reverse=True)
+    prompts: Dict[str, str] = {}
+    count = 0
+    with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open('debug.jsonl', 'w') as f:
+            for i, row in enumerate(rows):
+                if not any(key.startswith(DEBUG_PREFIX) for key in row):
+                    continue
+                record = {'row': i, '文件名': row.get('文件名', '')}
+                prompt = row.get('_debug_prompt') or ''
+                if prompt:
+                    template, context = split_prompt(prompt, templates)
+                    pid = _prompt_id(template)
+                    prompts.setdefault(pid, template)
+                    record['prompt_id'] = pid
+                    record['prompt_context'] = context
+                for key, value in row.items():
+                    if key.startswith(DEBUG_PREFIX) and key != '_debug_prompt':
+                        record[key[len(DEBUG_PREFIX):]] = value
+                f.write((json.dumps(record, ensure_ascii=False, default=str) + "\n").encode('utf-8'))
+                count += 1
+        zf.writestr('prompts.json', json.dumps(prompts, ensure_ascii=False, indent=1))
+    return count
+
+
+def debug_archive_bytes(rows: Sequence[Dict]) -> bytes:
+    output = io.BytesIO()
+    write_debug_archive(rows, output)
+    return output.getvalue()
+
+
+def debug_archive_path(output: str) -> str:
+    """主表文件对应的调试附件路径：结果.xlsx -> 结果.debug.zip"""
+    return os.path.splitext(output)[0] + '.debug.zip'
@@ -0,0 +1,743 @@
+"""
+简历文件解析核心：PDF / DOCX / DOC 文本提取与 OCR。
+本模块不依赖 Streamlit，可在线程池、子进程或命令行中直接调用。
+"""
+import io
+import os
+import re
+import time
+import struct
+import asyncio
+import aiohttp
+from typing import List, Dict
+from dataclasses import dataclass
+
+from resume_core.cache import cache
+from resume_core.cancel import REASON_LABELS, Cancelled, current_token, run_cancellable
+from resume_core.spool import read_item_bytes
+
+# ============================
+# 可选依赖加载与状态监测
+# ============================
+try:
+    import fitz  # PyMuPDF
+    PDF_SUPPORT = True
+except ImportError:
+    PDF_SUPPORT = False
+
+try:
+    import docx
+    DOCX_SUPPORT = True
+except ImportError:
+    DOCX_SUPPORT = False
+
+try:
+    import olefile
+    OLEFILE_SUPPORT = True
+except ImportError:
+    OLEFILE_SUPPORT = False
+
+# OCR 支持（可选）- 使用DeepSeek OCR API via 硅基流动
+OCR_SUPPORT = True  # 默认启用DeepSeek OCR
+OCR_ENGINE = "deepseek"  # 默认使用deepseek-ocr
+
+try:
+    import pytesseract
+    from PIL import Image
+    # 测试OCR是否真正可用
+    try:
+        pytesseract.get_tesseract_version()
+        TESSERACT_SUPPORT = True
+    except Exception:
+        TESSERACT_SUPPORT = False
+except ImportError:
+    TESSERACT_SUPPORT = False
+
+# ============================
+# OCR 后处理清洗
+# ============================
+def clean_ocr_text(text: str) -> str:
+    """清洗OCR结果中的坐标标签、HTML标签、孤立符号和重复内容"""
+    if not text or text.startswith("DeepSeek OCR") or text.startswith("OCR"):
+        return text
+    
+    # 1. 移除 DeepSeek OCR 的坐标标签: <|ref|>title<|/ref|><|det|>[[...]]<|/det|>
+    text = re.sub(r'<\|ref\|>.*?<\|/ref\|>', '', text)
+    text = re.sub(r'<\|det\|>\[\[.*?\]\]<\|/det\|>', '', text)
+    text = re.sub(r'<\|ref\|>|<\|/ref\|>|<\|det\|>|<\|/det\|>', '', text)
+    
+    # 2. 将 <br> 替换为换行
+    text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
+    
+    # 3. 移除孤立垃圾符号行（行内几乎没有有效字符）
+    lines = text.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        # 如果一行里有效字符（中文、英文单词、数字）少于2个，且长度很短，则丢弃
+        valid_chars = re.findall(r'[\u4e00-\u9fa5a-zA-Z0-9]', stripped)
+        if len(valid_chars) < 2 and len(stripped) <= 5:
+            continue
+        # 过滤没有中文且以特殊符号开头的短垃圾行（如 -responsive., np., ҳ ）
+        if len(re.findall(r'[\u4e00-\u9fa5]', stripped)) == 0 and re.match(r'^[^a-zA-Z0-9]', stripped) and len(stripped) <= 20:
+            continue
+        cleaned_lines.append(line)
+    
+    # 4. 去重：连续完全相同的行最多保留2次
+    deduped_lines = []
+    prev_line = None
+    repeat_count = 0
+    for line in cleaned_lines:
+        if line == prev_line:
+            repeat_count += 1
+            if repeat_count <= 1:
+                deduped_lines.append(line)
+        else:
+            repeat_count = 0
+            prev_line = line
+            deduped_lines.append(line)
+    
+    return '\n'.join(deduped_lines)
+
+
+# ============================
+# DeepSeek OCR 函数 (硅基流动)
+# ============================
+async def deepseek_ocr_image(image_bytes: bytes, api_key: str, prompt: str = "请识别图片中的所有文字内容，保持原有格式和排版。") -> str:
+    """使用DeepSeek OCR API (硅基流动) 识别图片中的文字"""
+    import base64
+    
+    url = "https://api.siliconflow.cn/v1/chat/completions"
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    
+    # 将图片转换为base64
+    base64_image = base64.b64encode(image_bytes).decode('utf-8')
+    
+    # 检测图片格式
+    image_format = "png"
+    if image_bytes[:2] == b'\xff\xd8':
+        image_format = "jpeg"
+    elif image_bytes[:4] == b'\x89PNG':
+        image_format = "png"
+    elif image_bytes[:4] == b'GIF8':
+        image_format = "gif"
+    elif image_bytes[:4] == b'RIFF':
+        image_format = "webp"
+    
+    payload = {
+        "model": "deepseek-ai/DeepSeek-OCR",
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/{image_format};base64,{base64_image}"
+                        }
+                    }
+                ]
+            }
+        ],
+        "temperature": 0.1,
+        "max_tokens": 4000
+    }
+    
+    async def post() -> str:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    return f"DeepSeek OCR失败 {response.status}: {error_text[:200]}"
+                
+                data = await response.json()
+                return clean_ocr_text(data['choices'][0]['message']['content'])
+    
+    # 批次已取消时不再发请求，进行中的请求立即中止
+    try:
+        return await run_cancellable(post(), current_token())
+    except Cancelled as e:
+        return f"DeepSeek OCR已取消: {e}"
+    except Exception as e:
+        return f"DeepSeek OCR异常: {str(e)}"
+
+
+def deepseek_ocr_image_sync(image_bytes: bytes, api_key: str, prompt: str = "请识别图片中的所有文字内容，保持原有格式和排版。") -> str:
+    """同步版本的DeepSeek OCR"""
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return clean_ocr_text(loop.run_until_complete(deepseek_ocr_image(image_bytes, api_key, prompt)))
+
+
+# ============================
+# 文件解析函数
+# ============================
+def _extract_text_from_pdf(file_bytes: bytes, use_ocr: bool = True, api_key: str = None) -> str:
+    """从PDF提取文本，支持OCR"""
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            text = ""
+            image_count = 0
+            for page in doc:
+                page_text = page.get_text()
+                text += page_text + "\n"
+                # 检测页面中是否有图片
+                image_list = page.get_images()
+                if image_list:
+                    image_count += len(image_list)
+            
+            # 如果启用了OCR且文本太短/检测到图片，尝试OCR
+            should_ocr = use_ocr and api_key and (len(text.strip()) < 100 or image_count > 0)
+            if should_ocr:
+                try:
+                    loop = asyncio.get_event_loop()
+                except RuntimeError:
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                ocr_text = loop.run_until_complete(ocr_pdf_async(file_bytes, api_key))
+                if not ocr_text.startswith("OCR失败") and not ocr_text.startswith("OCR未识别") and not ocr_text.startswith("OCR不可用"):
+                    text += "\n\n[PDF OCR内容]\n" + ocr_text
+                else:
+                    text += "\n\n[PDF OCR结果: " + ocr_text + "]"
+            
+            # 针对混合PDF（文字层完整但顶部姓名/标题为图片）进行顶部OCR补充
+            if use_ocr and api_key and len(text.strip()) > 100:
+                top_ocr_text = ocr_pdf_top_region(file_bytes, api_key)
+                if top_ocr_text and not top_ocr_text.startswith("顶部OCR失败") and len(top_ocr_text.strip()) > 10:
+                    text = "[PDF顶部补充OCR]\n" + top_ocr_text + "\n\n[PDF正文提取]\n" + text
+            
+            return text
+    except Exception as e:
+        return f"PDF解析失败: {str(e)}"
+
+def ocr_pdf(file_bytes: bytes, api_key: str = None) -> str:
+    """对PDF进行OCR识别 - 支持DeepSeek OCR和Tesseract"""
+    text = ""
+    
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            for page_num, page in enumerate(doc):
+                # 将页面渲染为高清图片
+                pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
+                img_bytes = pix.tobytes("png")
+                
+                page_text = ""
+                # 优先使用DeepSeek OCR API
+                if api_key and OCR_ENGINE == "deepseek":
+                    page_text = deepseek_ocr_image_sync(
+                        img_bytes, 
+                        api_key, 
+                        prompt="请识别这张简历图片中的所有文字内容，包括姓名、联系方式、教育背景、工作经历等，保持原有格式。"
+                    )
+                    # 如果DeepSeek失败，尝试tesseract
+                    if page_text.startswith("DeepSeek OCR") and TESSERACT_SUPPORT:
+                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                        page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
+                elif TESSERACT_SUPPORT:
+                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                    page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
+                else:
+                    return "OCR不可用: 未配置API Key或安装Tesseract"
+                
+                if page_text.strip() and len(page_text.strip()) > 10:
+                    text += f"\n--- 第{page_num+1}页 ---\n" + page_text
+        
+        return text if text.strip() else "OCR未识别到文字"
+    except Exception as e:
+        return f"OCR失败: {str(e)}"
+
+
+def ocr_pdf_top_region(file_bytes: bytes, api_key: str = None) -> str:
+    """对PDF每页顶部区域进行OCR补充，用于捕获混合PDF中的图片型标题/姓名"""
+    text = ""
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            for page_num, page in enumerate(doc):
+                rect = page.rect
+                top_rect = fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * 0.30)
+                pix = page.get_pixmap(matrix=fitz.Matrix(3, 3), clip=top_rect)
+                img_bytes = pix.tobytes("png")
+                page_text = deepseek_ocr_image_sync(
+                    img_bytes,
+                    api_key,
+                    prompt="请识别这张简历图片顶部的文字内容，包括姓名、联系方式、标题等，保持原有格式。"
+                )
+                if page_text and not page_text.startswith("DeepSeek OCR") and not page_text.startswith("OCR") and len(page_text.strip()) > 5:
+                    text += f"\n--- 第{page_num+1}页顶部 ---\n" + page_text
+        return text
+    except Exception as e:
+        return f"顶部OCR失败: {str(e)}"
+
+
+async def ocr_pdf_async(file_bytes: bytes, api_key: str = None) -> str:
+    """对PDF进行异步并发OCR识别 - 优化多页图片PDF处理速度"""
+    text = ""
+    
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            semaphore = asyncio.Semaphore(5)  # 单PDF最多5页并发OCR
+            
+            async def ocr_one_page(page_num: int, page):
+                async with semaphore:
+                    pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
+                    img_bytes = pix.tobytes("png")
+                    
+                    page_text = ""
+                    if api_key and OCR_ENGINE == "deepseek":
+                        page_text = await deepseek_ocr_image(
+                            img_bytes,
+                            api_key,
+                            prompt="请识别这张简历图片中的所有文字内容，包括姓名、联系方式、教育背景、工作经历等，保持原有格式。"
+                        )
+                        if page_text.startswith("DeepSeek OCR") and TESSERACT_SUPPORT:
+                            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                            page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
+                    elif TESSERACT_SUPPORT:
+                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                        page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
+                    else:
+                        return page_num, "OCR不可用"
+                    
+                    return page_num, page_text
+            
+            tasks = [ocr_one_page(i, page) for i, page in enumerate(doc)]
+            page_results = await asyncio.gather(*tasks)
+            page_results.sort(key=lambda x: x[0])
+            
+            for page_num, page_text in page_results:
+                if page_text != "OCR不可用" and page_text.strip() and len(page_text.strip()) > 10:
+                    text += f"\n--- 第{page_num+1}页 ---\n" + page_text
+        
+        return text if text.strip() else "OCR未识别到文字"
+    except Exception as e:
+        return f"OCR失败: {str(e)}"
+
+
+def extract_images_from_docx(file_bytes: bytes) -> List[bytes]:
+    """从DOCX文件中提取图片"""
+    images = []
+    try:
+        import zipfile
+        from io import BytesIO
+        
+        # DOCX实际上是zip文件
+        with zipfile.ZipFile(BytesIO(file_bytes), 'r') as zf:
+            for name in zf.namelist():
+                if name.startswith('word/media/'):
+                    images.append(zf.read(name))
+    except Exception:
+        pass
+    return images
+
+
+def ocr_docx_images(file_bytes: bytes, api_key: str = None) -> str:
+    """对DOCX中的图片进行OCR识别"""
+    if not api_key:
+        return ""
+    
+    images = extract_images_from_docx(file_bytes)
+    if not images:
+        return ""
+    
+    ocr_texts = []
+    for i, img_bytes in enumerate(images[:10]):  # 最多处理10张图片
+        try:
+            text = deepseek_ocr_image_sync(
+                img_bytes,
+                api_key,
+                prompt="请识别这张图片中的所有文字内容，如果是简历内容请完整提取。"
+            )
+            if not text.startswith("DeepSeek OCR"):
+                ocr_texts.append(f"[图片{i+1}]\n{text}")
+        except Exception:
+            continue
+    
+    return "\n\n".join(ocr_texts)
+
+def extract_text_from_pdf(file_bytes: bytes, use_ocr: bool = True, api_key: str = None, content_hash: str = None,
+                          enable_cache: bool = True) -> str:
+    """优先从缓存获取PDF解析结果"""
+    cached = cache.get(file_bytes, content_hash, enable_cache)
+    if cached and 'pdf_text' in cached:
+        return cached['pdf_text']
+    
+    result = _extract_text_from_pdf(file_bytes, use_ocr, api_key)
+    # 批次取消后部分页面的 OCR 结果是"已取消"占位文字，不写缓存，下次重新识别
+    token = current_token()
+    if token is None or not token.cancelled:
+        cache.set(file_bytes, {'pdf_text': result}, content_hash, enable_cache)
+    return result
+
+
+# ==========================================
+# 文本去重工具函数
+# ==========================================
+def deduplicate_text(text: str) -> str:
+    """
+    去除文本中的连续重复段落。
+    某些简历DOCX文件中内容会被重复多次（如文本框+正文同时存在），
+    此函数用于去除这些重复，保留第一次出现的内容。
+    """
+    if not text or len(text) < 50:
+        return text
+    
+    lines = text.split('\n')
+    seen_paragraphs = set()
+    result_lines = []
+    
+    def normalize(s: str) -> str:
+        """归一化字符串用于比较"""
+        # 去除所有空白字符和常见标点
+        return re.sub(r'[\s\/\.\,\:\;\、\，。\(\)（）@\-]', '', s)
+    
+    def is_similar(s1: str, s2: str) -> bool:
+        """检查两个字符串是否相似（用于检测重复内容）"""
+        if not s1 or not s2:
+            return False
+        n1, n2 = normalize(s1), normalize(s2)
+        # 如果归一化后完全相同，则是重复
+        if n1 == n2:
+            return True
+        # 如果一个是另一个的子串且长度超过80%，也认为是重复
+        if len(n1) > 50 and len(n2) > 50:
+            if n1 in n2 or n2 in n1:
+                return True
+            # 计算相似度（共同子串长度比例）
+            shorter, longer = (n1, n2) if len(n1) < len(n2) else (n2, n1)
+            if len(longer) > 0 and len(shorter) / len(longer) > 0.8:
+                # 检查shorter是否是longer的前缀或后缀
+                if longer.startswith(shorter) or longer.endswith(shorter):
+                    return True
+        return False
+    
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            result_lines.append(line)
+            continue
+        
+        # 对短行（少于20字符）使用精确匹配
+        if len(stripped) < 20:
+            key = stripped
+            if key not in seen_paragraphs:
+                seen_paragraphs.add(key)
+                result_lines.append(line)
+        else:
+            # 对长行使用相似度匹配
+            # 首先检查归一化后是否已存在
+            norm_key = normalize(stripped)
+            if norm_key in seen_paragraphs:
+                continue  # 跳过重复
+            
+            # 检查是否与已见过的长行相似
+            is_dup = False
+            for seen in list(seen_paragraphs):
+                if len(seen) > 50 and is_similar(stripped, seen):
+                    is_dup = True
+                    break
+            
+            if not is_dup:
+                seen_paragraphs.add(norm_key)
+                result_lines.append(line)
+    
+    return '\n'.join(result_lines)
+
+
+# ==========================================
+# 终极融合版：DOCX/DOC 解析
+# 结合了 OLE2底层穿透 与 原有的降级回退机制
+# ==========================================
+def extract_text_from_docx(file_bytes: bytes, file_name: str = "", use_ocr: bool = True, api_key: str = None) -> str:
+    """终极增强版 DOCX/DOC 解析：多路并发降级机制处理"""
+    text = ""
+    
+    # 【路口1】处理现代 .docx 格式 (高精度保持段落与表格的顺序)
+    # 增强版：提取文本框内容，处理简历模板中常见的文本框结构
+    if DOCX_SUPPORT and file_name.lower().endswith('.docx'):
+        try:
+            from docx.oxml.table import CT_Tbl
+            from docx.oxml.text.paragraph import CT_P
+            from docx.table import Table
+            from docx.text.paragraph import Paragraph
+            
+            doc = docx.Document(io.BytesIO(file_bytes))
+            
+            # 方法1: 标准遍历（段落+表格）
+            lines = []
+            for child in doc.element.body.iterchildren():
+                if isinstance(child, CT_P):
+                    p = Paragraph(child, doc)
+                    if p.text.strip():
+                        lines.append(p.text.strip())
+                elif isinstance(child, CT_Tbl):
+                    table = Table(child, doc)
+                    lines.append("")
+                    for i, row in enumerate(table.rows):
+                        row_data = [cell.text.replace('\n', ' ').replace('\r', '').replace('|', '｜').strip() for cell in row.cells]
+                        lines.append("| " + " | ".join(row_data) + " |")
+                        if i == 0:
+                            lines.append("|" + "|".join(["---"] * len(row.cells)) + "|")
+                    lines.append("")
+            
+            text = "\n".join(lines)
+            
+            # 方法2: 如果标准方法提取内容太少，尝试提取文本框
+            if len(text.strip()) < 100:
+                # 使用底层XML提取文本框内容
+                try:
+                    import xml.etree.ElementTree as ET
+                    root = ET.fromstring(doc.element.xml)
+                    ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+                    
+                    txbx_lines = []
+                    # 查找所有文本框内容
+                    for txbx in root.findall('.//w:txbxContent', ns):
+                        txbx_texts = []
+                        for t in txbx.findall('.//w:t', ns):
+                            if t.text:
+                                txbx_texts.append(t.text)
+                        if txbx_texts:
+                            txbx_lines.append(''.join(txbx_texts))
+                    
+                    # 也查找所有段落（包括文本框外的）
+                    for p in root.findall('.//w:p', ns):
+                        p_texts = []
+                        for t in p.findall('.//w:t', ns):
+                            if t.text:
+                                p_texts.append(t.text)
+                        if p_texts:
+                            line = ''.join(p_texts).strip()
+                            if line and line not in txbx_lines:  # 避免重复
+                                txbx_lines.append(line)
+                    
+                    if len('\n'.join(txbx_lines).strip()) > 50:
+                        text = '\n'.join(txbx_lines)
+                except Exception:
+                    pass
+            
+            if len(text.strip()) > 50: 
+                return deduplicate_text(text)
+        except Exception: pass
+    
+    # 【路口1.5】图片背景 DOCX 的 OCR 处理（将 DOCX 渲染为图片后识别）
+    if use_ocr and api_key and len(text.strip()) < 100 and file_name.lower().endswith('.docx') and PDF_SUPPORT:
+        try:
+            ocr_text = ""
+            with fitz.open(stream=file_bytes, filetype="docx") as doc:
+                for page_num, page in enumerate(doc):
+                    pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
+                    img_bytes = pix.tobytes("png")
+                    page_text = deepseek_ocr_image_sync(
+                        img_bytes,
+                        api_key,
+                        prompt="请识别这张简历图片中的所有文字内容，包括姓名、联系方式、教育背景、工作经历等，保持原有格式。"
+                    )
+                    if page_text.startswith("DeepSeek OCR") and TESSERACT_SUPPORT:
+                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                        page_text = pytesseract.image_to_string(img, lang='chi_sim+eng')
+                    if page_text and not page_text.startswith("DeepSeek OCR") and not page_text.startswith("OCR") and len(page_text.strip()) > 10:
+                        ocr_text += f"\n--- 第{page_num+1}页 ---\n" + page_text
+            if ocr_text.strip():
+                return deduplicate_text(ocr_text.strip())
+        except Exception as e:
+            text += f"\n[DOCX OCR尝试失败: {str(e)}]"
+
+    # 【路口2】核心增强：利用 olefile 定向解剖原生 .doc (OLE2格式)
+    if file_name.lower().endswith('.doc') and OLEFILE_SUPPORT:
+        bio = io.BytesIO(file_bytes)
+        try:
+            if olefile.isOleFile(bio):
+                with olefile.OleFileIO(bio) as ole:
+                    meta_lines = []
+                    # A. 提取隐藏元数据 (背调辅助)
+                    try:
+                        meta = ole.get_metadata()
+                        if meta.author: meta_lines.append(f"作者: {meta.author.decode('utf-8','ignore') if isinstance(meta.author, bytes) else meta.author}")
+                        if meta.creating_application: meta_lines.append(f"应用: {meta.creating_application.decode('utf-8','ignore') if isinstance(meta.creating_application, bytes) else meta.creating_application}")
+                        if meta.last_printed: meta_lines.append(f"最后打印日期: {meta.last_printed}")
+                    except: pass
+                    
+                    header = "【文档元数据】\n" + "\n".join(meta_lines) + "\n\n【正文提取】\n" if meta_lines else ""
+                    
+                    # B. 定向提取 WordDocument 数据流（绕过图片、对象池）
+                    if ole.exists('WordDocument'):
+                        stream = ole.openstream('WordDocument')
+                        raw_data = stream.read()
+                        
+                        # 解析 FIB (File Information Block) 指针实现物理级穿透
+                        if len(raw_data) > 0x20:
+                            wIdent = struct.unpack('<H', raw_data[0:2])[0]
+                            if wIdent == 0xA5EC: # 合法DOC特征码
+                                fcMin = struct.unpack('<I', raw_data[0x18:0x1C])[0]
+                                mac = struct.unpack('<I', raw_data[0x1C:0x20])[0]
+                                
+                                if fcMin < len(raw_data) and mac <= len(raw_data) and fcMin < mac:
+                                    text_data = raw_data[fcMin:mac]
+                                    # 智能解码：UTF-16LE 对应 Word 的 Unicode 存储，GB18030 对应旧版 ANSI
+                                    try:
+                                        decoded = text_data.decode('utf-16le', errors='ignore')
+                                    except:
+                                        decoded = text_data.decode('gb18030', errors='ignore')
+                                    
+                                    # 表格结构重建：Word 内部 \x07 为单元格界限
+                                    decoded = decoded.replace('\x07\x07', ' |\n| ').replace('\x07', ' | ').replace('\r', '\n')
+                                    # 去噪：剥离不可见字符
+                                    decoded = re.sub(r'[\x00-\x06\x08\x0B\x0C\x0E-\x1F]', '', decoded)
+                                    
+                                    if len(decoded.strip()) > 50:
+                                        return deduplicate_text(header + decoded.strip())
+        except Exception: pass
+
+    # 【路口3】备用机制：处理服务器级别的旧版 .doc 格式 (借助 antiword)
+    if file_name.lower().endswith('.doc'):
+        import subprocess
+        import tempfile
+        try:
+            with tempfile.NamedTemporaryFile(suffix='.doc', delete=False) as tmp:
+                tmp.write(file_bytes)
+                tmp_path = tmp.name
+            result = subprocess.run(['antiword', tmp_path], capture_output=True, text=True, timeout=10)
+            os.unlink(tmp_path)
+            if result.returncode == 0 and len(result.stdout.strip()) > 50:
+                return deduplicate_text(result.stdout)
+        except Exception:
+            try:
+                if 'tmp_path' in locals() and os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+            except: pass
+
+    # 【路口4】终极降级特种部队：纯 Python 暴力穿透法
+    try:
+        best_text = ""
+        
+        # 4.1 尝试识别从招聘平台导出的“伪装 DOC” (实质为 MHT/HTML)
+        for enc in ['utf-8', 'gbk', 'gb18030']:
+            try:
+                decoded_text = file_bytes.decode(enc)
+                if '<html' in decoded_text.lower() or 'xmlns:w=' in decoded_text.lower():
+                    cleaned_html = re.sub(r'<style.*?>.*?</style>', '', decoded_text, flags=re.IGNORECASE|re.DOTALL)
+                    cleaned_html = re.sub(r'<script.*?>.*?</script>', '', cleaned_html, flags=re.IGNORECASE|re.DOTALL)
+                    cleaned_html = re.sub(r'<[^>]+>', ' | ', cleaned_html)
+                    cleaned_html = re.sub(r'(\s*\|\s*)+', ' | ', cleaned_html)
+                    if len(cleaned_html.strip()) > len(best_text):
+                        best_text = cleaned_html.strip()
+            except: pass
+
+        # 4.2 真正的 .doc 二进制流盲测暴力重组 (兜底方案)
+        for enc in ['utf-16le', 'gbk', 'gb18030', 'utf-8']:
+            try:
+                raw_text = file_bytes.decode(enc, errors='ignore')
+                cleaned = re.sub(r'[\x00-\x06\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', raw_text)
+                cleaned = cleaned.replace('\u0007', ' | ').replace('\r', '\n')
+                cleaned = re.sub(r' {2,}', ' ', cleaned)
+                cleaned = re.sub(r'\|\s*\|', '|', cleaned)
+                cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
+                
+                zh_count = len(re.findall(r'[\u4e00-\u9fa5]', cleaned))
+                best_zh_count = len(re.findall(r'[\u4e00-\u9fa5]', best_text))
+                
+                if zh_count > best_zh_count and len(cleaned.strip()) > 50:
+                    best_text = cleaned
+            except: continue
+        
+        if len(best_text.strip()) > 50:
+            return deduplicate_text(best_text)
+    except Exception: pass
+
+    # 【路口5】最后的退化方案：丢给 Fitz 盲算
+    if PDF_SUPPORT:
+        try:
+            filetype = "doc" if file_name.lower().endswith('.doc') else "docx"
+            with fitz.open(stream=file_bytes, filetype=filetype) as doc_fitz:
+                text_fitz = ""
+                for page in doc_fitz:
+                    text_fitz += page.get_text() + "\n"
+                if len(text_fitz.strip()) > 50:
+                    return deduplicate_text(text_fitz)
+        except Exception: pass
+
+    return deduplicate_text(text) if text.strip() else "Word文档解析失败或内容为空"
+
+# ============================
+# 批量文件解析 - 高效并发
+# ============================
+@dataclass
+class ParseResult:
+    """解析结果数据结构"""
+    filename: str
+    content: str
+    error: str = None
+    file_size: int = 0
+    parse_time: float = 0.0
+
+def parse_single_file(item: Dict, use_ocr: bool = True, api_key: str = None, enable_cache: bool = True) -> ParseResult:
+    """解析单个文件；enable_cache 为本批的缓存开关（缓存实例是进程级共享的，开关随调用传入）"""
+    start_time = time.time()
+    
+    try:
+        file_name = item.get('name', 'unknown')
+        # 队列条目可能只带暂存区句柄，此时按需从磁盘读取
+        content_bytes = read_item_bytes(item)
+        file_size = len(content_bytes)
+        # 上传时已算好的内容哈希，缓存查询直接复用
+        sha256 = item.get('sha256')
+        
+        cached = cache.get(content_bytes, sha256, enable_cache)
+        if cached and 'parsed_result' in cached:
+            result = cached['parsed_result']
+            # 缓存按内容命中，文件名以本次上传为准
+            result.filename = file_name
+            result.parse_time = time.time() - start_time
+            return result
+        
+        text = ""
+        error_msg = None
+        
+        if file_name.lower().endswith('.pdf'):
+            text = extract_text_from_pdf(content_bytes, use_ocr, api_key, sha256, enable_cache)
+        elif file_name.lower().endswith(('.docx', '.doc')):
+            text = extract_text_from_docx(content_bytes, file_name, use_ocr, api_key)
+            # 如果docx文本太短且启用了OCR，尝试提取嵌入图片OCR（作为补充）
+            if len(text.strip()) < 100 and use_ocr and api_key:
+                ocr_text = ocr_docx_images(content_bytes, api_key)
+                if ocr_text:
+                    text += "\n\n[图片OCR内容]\n" + ocr_text
+        else:
+            error_msg = "不支持的文件类型"
+        
+        if len(text) < 50 and not error_msg:
+            error_msg = "提取文本过短，可能解析失败"
+        
+        # 批次取消后 OCR 结果不完整，不写缓存
+        token = current_token()
+        if token is not None and token.cancelled:
+            return ParseResult(filename=file_name, content="", error=f"解析中止（{REASON_LABELS[token.reason]}）",
+                               file_size=file_size, parse_time=time.time() - start_time)
+        
+        result = ParseResult(
+            filename=file_name,
+            content=text,
+            error=error_msg,
+            file_size=file_size,
+            parse_time=time.time() - start_time
+        )
+        
+        cache.set(content_bytes, {'parsed_result': result}, sha256, enable_cache)
+        return result
+        
+    except Exception as e:
+        return ParseResult(
+            filename=item.get('name', 'unknown'),
+            content="",
+            error=str(e),
+            parse_time=time.time() - start_time
+        )
@@ -0,0 +1,185 @@
+"""
+压缩包文件名编码修复。
+
+ZIP 规范里没有 UTF-8 标志位(0x800)的文件名，Python 一律按 cp437 解码，中文必然乱码。
+同一个压缩包里的文件名几乎总是由同一台机器、同一种编码写入，
+因此先对整个压缩包抽样一次选出最佳编码，再单遍解码全部文件名，
+既避免了逐个文件名反复试探，也避免了同一压缩包内各文件名判断不一致。
+"""
+import zlib
+import struct
+import zipfile
+from typing import List, Tuple, Optional
+
+# 整包编码探测的候选编码，按先验优先级排列（得分相同时靠前者胜出）
+ARCHIVE_CODECS = ['utf-8', 'gb18030', 'big5', 'cp932', 'cp437']
+# 单个压缩包最多抽样的文件名数量
+ENCODING_SAMPLE_SIZE = 200
+# 低于该置信度时，对整包编码解不干净的文件名回退到逐条修复
+MIN_ENCODING_CONFIDENCE = 0.6
+
+# ZIP Info-ZIP Unicode Path Extra Field
+UNICODE_PATH_EXTRA_ID = 0x7075
+
+
+def _score_text(text: str) -> int:
+    """评估文件名的“健康度”：有效汉字越多越好，乱码符号（拉丁扩展、希腊字母、特殊绘图符）越少越好"""
+    chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fa5')
+    garbled_chars = sum(1 for c in text if
+                        ('\u0080' <= c <= '\u024F') or
+                        ('\u0370' <= c <= '\u03FF') or
+                        ('\u2000' <= c <= '\u206F') or
+                        ('\u2500' <= c <= '\u259F'))
+    return chinese_chars * 10 - garbled_chars * 5
+
+
+def fix_garbled_filename(name: str) -> str:
+    """
+    终极乱码修复算法：严格逆转错乱编码，完美还原回真实中文。
+    核心原理：被损坏的其实是解码过程。我们需要将乱码按它错误的编码“反转回字节流”，再按正确的规则重新解剖。
+    """
+    if not name or not isinstance(name, str):
+        return name
+        
+    # 定义高频错乱映射字典: (底层被强制读取的错误格式 -> 应该使用的真实格式)
+    repair_pairs = [
+        ('cp437', 'utf-8'),    # 典型：τ«ÇσÄå -> UTF-8 (Mac/Linux 在 Windows 下的无标识解压)
+        ('gbk', 'utf-8'),      # 典型：鏉ㄦ湞鏅 -> UTF-8 (纯正UTF-8字节流被误当GBK读取)
+        ('latin1', 'utf-8'),   # 常见通用单字节错误读取格式
+        ('cp437', 'gbk'),      # 早期 ZIP 默认 CP437，实际是 GBK 编码
+        ('latin1', 'gbk'),
+        ('mac_roman', 'utf-8'),# Mac 特有错误格式
+    ]
+
+    best_result = name
+    
+    best_score = _score_text(name)
+
+    # 前置风控：如果原本就是健康的纯英文拼音或纯中文，则拒绝执行转换以免破坏原数据
+    if best_score >= 0 and sum(1 for c in name if ('\u0080' <= c <= '\u024F' or '\u0370' <= c <= '\u03FF')) == 0:
+        return name
+
+    # 循环尝试严格流逆转
+    for encode_as, decode_as in repair_pairs:
+        try:
+            # 1. 严格双向流校验：反向抽取回原始错误字节流
+            raw_bytes = name.encode(encode_as)
+            # 2. 重新按正确的编码格式完美解剖
+            decoded = raw_bytes.decode(decode_as)
+            
+            current_score = _score_text(decoded)
+            
+            # 3. 找到更完美、更合理的中文解析结果
+            if current_score > best_score:
+                best_score = current_score
+                best_result = decoded
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            continue
+
+    return best_result
+
+
+def _raw_zip_name(info: zipfile.ZipInfo) -> bytes:
+    """还原 ZIP 中无 UTF-8 标志文件名的原始字节（Python 固定用 cp437 解码，cp437 覆盖全部 256 个字节，可无损逆转）"""
+    try:
+        return info.filename.encode('cp437')
+    except UnicodeEncodeError:
+        return info.filename.encode('utf-8', errors='replace')
+
+
+def _unicode_path_from_extra(info: zipfile.ZipInfo, raw_name: bytes) -> Optional[str]:
+    """
+    解析 Info-ZIP Unicode Path 扩展字段(0x7075)：
+    | Version(1) | NameCRC32(4) | UnicodeName(UTF-8) |
+    仅当 CRC 与当前头部文件名字节一致时才采用，防止文件名被后续工具改写后误用旧值。
+    """
+    extra = info.extra or b''
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, size = struct.unpack('<HH', extra[pos:pos + 4])
+        body = extra[pos + 4:pos + 4 + size]
+        pos += 4 + size
+        if header_id != UNICODE_PATH_EXTRA_ID or len(body) < 5:
+            continue
+        version = body[0]
+        name_crc = struct.unpack('<I', body[1:5])[0]
+        if version != 1 or name_crc != (zlib.crc32(raw_name) & 0xFFFFFFFF):
+            continue
+        try:
+            return body[5:].decode('utf-8')
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def detect_archive_encoding(raw_names: List[bytes], codecs: List[str] = None,
+                            sample_size: int = ENCODING_SAMPLE_SIZE) -> Tuple[str, float]:
+    """
+    对整个压缩包的文件名抽样一次，选出最佳编码。
+    返回 (编码, 置信度)，置信度 = 抽样中被该编码干净解出（无解码错误、无乱码符号）的比例。
+    纯 ASCII 文件名不携带编码信息，不参与抽样；没有可抽样的文件名时返回 ('utf-8', 1.0)。
+    """
+    codecs = codecs or ARCHIVE_CODECS
+    sample = [n for n in raw_names if any(b >= 0x80 for b in n)][:sample_size]
+    if not sample:
+        return 'utf-8', 1.0
+
+    # UTF-8 多字节序列自带强校验，GBK 等字节流几乎不可能恰好是合法 UTF-8；
+    # 反过来 gb18030 能“解开”几乎任何字节流，所以抽样全部合法时直接采用 UTF-8
+    if 'utf-8' in codecs:
+        try:
+            decoded_sample = [raw.decode('utf-8') for raw in sample]
+            clean = sum(1 for d in decoded_sample if _score_text(d) > 0)
+            return 'utf-8', clean / len(sample)
+        except UnicodeDecodeError:
+            codecs = [c for c in codecs if c != 'utf-8']
+
+    best_codec, best_score, best_clean = codecs[-1], None, 0
+    for codec in codecs:
+        total = 0
+        clean = 0
+        for raw in sample:
+            try:
+                decoded = raw.decode(codec)
+            except UnicodeDecodeError:
+                total -= 100
+                continue
+            s = _score_text(decoded)
+            total += s
+            if s > 0:
+                clean += 1
+        if best_score is None or total > best_score:
+            best_codec, best_score, best_clean = codec, total, clean
+
+    return best_codec, best_clean / len(sample)
+
+
+def decode_zip_filenames(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """
+    获取 ZIP 文件名映射 [(zipfile 内部名, 修复后的名字)]。
+    优先级：UTF-8 标志位 > Unicode Path 扩展字段 > 整包探测编码 > 逐条乱码修复（仅对整包编码解不开的条目）
+    """
+    infos = zf.infolist()
+    pending = []
+    for info in infos:
+        if info.flag_bits & 0x800:
+            continue
+        pending.append((info, _raw_zip_name(info)))
+
+    codec, confidence = detect_archive_encoding([raw for info, raw in pending])
+
+    fixed_names = {}
+    for info, raw in pending:
+        unicode_name = _unicode_path_from_extra(info, raw)
+        if unicode_name:
+            fixed_names[id(info)] = unicode_name
+            continue
+        try:
+            decoded = raw.decode(codec)
+            if confidence < MIN_ENCODING_CONFIDENCE and _score_text(decoded) < 0:
+                decoded = fix_garbled_filename(info.filename)
+        except UnicodeDecodeError:
+            decoded = fix_garbled_filename(info.filename)
+        fixed_names[id(info)] = decoded
+
+    return [(info.filename, fixed_names.get(id(info), info.filename)) for info in infos]
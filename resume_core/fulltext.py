@@ -0,0 +1,232 @@
+"""
+简历全文检索：对解析出的简历正文建倒排索引，按 BM25 排序，返回带高亮的片段。
+
+分词：中文字符二元组（bigram）+ jieba 长词。二元组保证召回，未登录词（校名、奖项名）也能检索到；
+jieba 切出的三字以上词语额外写入，完整出现该词的简历排序更靠前
+（如"华东师范大学"优先于分散出现"华东……北京师范大学"的简历）。英文、数字按单词切分并转小写。
+索引用 SQLite FTS5（与候选人库同一个数据库文件），分词结果以空格连接后写入，
+排序用 FTS5 内置的 bm25()；原文另存一份（NFKC 规范化后）用于生成片段。
+
+查询时每个空格分隔的检索词切成二元组后取 AND，多个检索词之间也取 AND；jieba 长词只参与打分不参与过滤。
+"""
+import os
+import re
+import time
+import itertools
+import sqlite3
+import unicodedata
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Callable, List, Sequence, Tuple
+
+from resume_core.store import DEFAULT_STORE_PATH
+
+# ============================
+# 可选依赖加载与状态监测
+# ============================
+try:
+    import jieba
+    jieba.setLogLevel(60)  # 首次加载词典的提示不输出
+    JIEBA_SUPPORT = True
+except ImportError:
+    JIEBA_SUPPORT = False
+
+
+def _fts5_available() -> bool:
+    try:
+        with closing(sqlite3.connect(':memory:')) as conn:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+FTS5_SUPPORT = _fts5_available()
+
+SNIPPET_WIDTH = 30       # 命中位置前后各取的字符数
+MAX_SNIPPETS = 3         # 每份简历最多返回的片段数
+MAX_HITS = 200           # 选片段时最多考虑的命中位置数
+
+_CJK_RUN_RE = re.compile(r'[一-鿿]+')
+_WORD_RE = re.compile(r'[a-z0-9]+(?:[.+#][a-z0-9]+)*')
+_JIEBA_WORD_RE = re.compile(r'^[一-鿿]{2,}$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_texts (
+    id          INTEGER PRIMARY KEY,
+    sha256      TEXT UNIQUE NOT NULL,
+    filename    TEXT NOT NULL,
+    content     TEXT NOT NULL,
+    indexed_at  REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(tokens, content='');
+"""
+
+
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def tokenize(text: str, use_jieba: bool = True) -> List[str]:
+    """规范化后切分为词元：中文 jieba 词语 + 二元组（单字连续段保留单字），英文数字按单词"""
+    text = normalize_text(text)
+    tokens = []
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        if use_jieba and JIEBA_SUPPORT and len(run) > 2:
+            # 二字词与二元组重复，只补充更长的词
+            tokens.extend(w for w in jieba.cut(run, HMM=False) if len(w) > 2 and _JIEBA_WORD_RE.match(w))
+    tokens.extend(_WORD_RE.findall(text))
+    return tokens
+
+
+def _quote(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+
+def build_match(query: str) -> str:
+    """检索词 -> FTS5 查询表达式；无有效词元时返回空字符串"""
+    groups = []
+    for term in query.split():
+        tokens = list(dict.fromkeys(tokenize(term, use_jieba=False)))
+        if not tokens:
+            continue
+        parts = []
+        for token in tokens:
+            quoted = _quote(token)
+            # 单个汉字只在孤立时作为词元，用前缀匹配覆盖以它开头的二元组
+            parts.append(f"({quoted} OR {quoted}*)" if len(token) == 1 and _CJK_RUN_RE.match(token) else quoted)
+        words = [w for w in dict.fromkeys(tokenize(term)) if w not in tokens]
+        if words:
+            # (长词 OR 第一个词元) 恒为真，不改变命中范围；bm25 会把长词计入打分
+            parts.append('(' + ' OR '.join([_quote(w) for w in words] + [parts[0]]) + ')')
+        groups.append(' AND '.join(parts))
+    return ' AND '.join(f"({g})" for g in groups)
+
+
+def _highlight_terms(query: str) -> List[str]:
+    """高亮用的词：完整检索词优先，其次是切出的词元（检索词在原文中不连续时）"""
+    terms = []
+    for term in query.split():
+        terms.append(normalize_text(term))
+        terms.extend(tokenize(term, use_jieba=False))
+    return sorted({t for t in terms if t}, key=len, reverse=True)
+
+
+def make_snippets(content: str, query: str, mark: Tuple[str, str] = ('【', '】'),
+                  escape: Callable[[str], str] = None, width: int = SNIPPET_WIDTH,
+                  max_snippets: int = MAX_SNIPPETS) -> List[str]:
+    """
+    在规范化后的原文中找检索词，截取命中位置前后各 width 个字符，命中部分用 mark 包裹；
+    片段按覆盖的检索词多少排序。
+    escape 用于转义片段中的普通文本（如页面上用 Markdown 显示时）
+    """
+    terms = _highlight_terms(query)
+    if not terms or not content:
+        return []
+    escape = escape or (lambda s: s)
+    pattern = re.compile('|'.join(re.escape(t) for t in terms))
+    hits = [(m.start(), m.group()) for m in itertools.islice(pattern.finditer(content), MAX_HITS)]
+    # 每个命中位置一个候选窗口，按窗口内不同命中词的总长度打分，优先选覆盖检索词最多的片段
+    windows = []
+    for start, _ in hits:
+        lo, hi = max(0, start - width), min(len(content), start + width)
+        weight = sum(len(t) for t in {t for s, t in hits if lo <= s < hi})
+        windows.append((weight, lo, hi))
+    chosen = []
+    for weight, lo, hi in sorted(windows, key=lambda w: (-w[0], w[1])):
+        if len(chosen) >= max_snippets:
+            break
+        if all(hi <= c_lo or lo >= c_hi for c_lo, c_hi in chosen):
+            chosen.append((lo, hi))
+    snippets = []
+    for lo, hi in chosen:
+        parts, pos = [], lo
+        for m in pattern.finditer(content, lo, hi):
+            parts.append(escape(content[pos:m.start()]))
+            parts.append(mark[0] + escape(m.group()) + mark[1])
+            pos = m.end()
+        parts.append(escape(content[pos:hi]))
+        text = ''.join(parts).replace('\n', ' ')
+        snippets.append(('…' if lo > 0 else '') + text + ('…' if hi < len(content) else ''))
+    return snippets
+
+
+@dataclass
+class SearchHit:
+    sha256: str
+    filename: str
+    score: float
+    snippets: List[str] = field(default_factory=list)
+
+
+class FullTextIndex:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        if not FTS5_SUPPORT:
+            raise RuntimeError("当前 SQLite 不支持 FTS5，无法建立全文索引")
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def add_documents(self, docs: Sequence[Tuple[str, str, str]]) -> int:
+        """
+        批量加入或更新文档 [(内容哈希, 文件名, 正文)]，一个事务内完成。
+        正文与已索引的相同时只更新文件名。返回重新分词的文档数
+        """
+        now = time.time()
+        indexed = 0
+        with closing(self._connect()) as conn, conn:
+            for sha256, filename, content in docs:
+                content = normalize_text(content)
+                old = conn.execute("SELECT id, content FROM resume_texts WHERE sha256 = ?", (sha256,)).fetchone()
+                if old and old[1] == content:
+                    conn.execute("UPDATE resume_texts SET filename = ? WHERE id = ?", (filename, old[0]))
+                    continue
+                if old:
+                    # contentless 表删除时需要提供原来写入的词元
+                    conn.execute("INSERT INTO resume_fts(resume_fts, rowid, tokens) VALUES('delete', ?, ?)",
+                                 (old[0], ' '.join(tokenize(old[1]))))
+                    conn.execute("UPDATE resume_texts SET filename = ?, content = ?, indexed_at = ? WHERE id = ?",
+                                 (filename, content, now, old[0]))
+                    doc_id = old[0]
+                else:
+                    doc_id = conn.execute(
+                        "INSERT INTO resume_texts (sha256, filename, content, indexed_at) VALUES (?, ?, ?, ?)",
+                        (sha256, filename, content, now)).lastrowid
+                conn.execute("INSERT INTO resume_fts(rowid, tokens) VALUES (?, ?)", (doc_id, ' '.join(tokenize(content))))
+                indexed += 1
+        return indexed
+
+    def search(self, query: str, limit: int = 20, escape: Callable[[str], str] = None,
+               mark: Tuple[str, str] = ('【', '】')) -> List[SearchHit]:
+        """按 BM25 排序返回命中的简历（score 越大越相关），附带高亮片段"""
+        match = build_match(query)
+        if not match:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT t.sha256, t.filename, t.content, bm25(resume_fts) AS rank"
+                " FROM resume_fts JOIN resume_texts t ON t.id = resume_fts.rowid"
+                " WHERE resume_fts MATCH ? ORDER BY rank LIMIT ?", (match, limit)).fetchall()
+        return [SearchHit(sha, filename, round(-rank, 3), make_snippets(content, query, mark, escape))
+                for sha, filename, content, rank in rows]
+
+    def count(self, query: str = None) -> int:
+        with closing(self._connect()) as conn:
+            if not query:
+                return conn.execute("SELECT COUNT(*) FROM resume_texts").fetchone()[0]
+            match = build_match(query)
+            if not match:
+                return 0
+            return conn.execute("SELECT COUNT(*) FROM resume_fts WHERE resume_fts MATCH ?", (match,)).fetchone()[0]
@@ -0,0 +1,205 @@
+"""
+对冲请求：一次请求的耗时超过近期同一模型请求耗时的 p95（可配置）仍未返回时，再发一份相同的请求，
+先成功返回的一份被采用，另一份取消。整批的额外请求数受预算限制（默认不超过已发请求数的 10%），
+样本不足 HEDGE_MIN_SAMPLES 时不对冲。对冲请求与原请求共用并发槽位（HedgePolicy.slots），
+没有空闲槽位时不对冲，在途请求数不超过用户设置的并发数。
+
+latency_report 汇总请求耗时分位数：实际耗时（对冲后），以及只看原请求的耗时（不对冲时的耗时）。
+原请求被取消的按取消时已等待的时间计，所以"不对冲"一栏是下限。
+"""
+import time
+import asyncio
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_HEDGE_BUDGET = 0.1       # 额外请求数 / 已发请求数
+HEDGE_MIN_SAMPLES = 10           # 少于这么多完成样本时不对冲
+LATENCY_WINDOW = 200             # 滚动窗口：只看最近这么多次请求
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近秩法分位数，values 为空时返回 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(-(-q * len(ordered) // 100))))
+    return ordered[rank - 1]
+
+
+class LatencyTracker:
+    """最近 LATENCY_WINDOW 次完成请求的耗时"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+
+    def record(self, latency: float):
+        self._samples.append(latency)
+
+    def threshold(self, q: float) -> Optional[float]:
+        if len(self._samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(list(self._samples), q)
+
+
+class HedgeBudget:
+    """全局对冲预算：对冲次数不超过 ratio × 已发出的原请求数"""
+
+    def __init__(self, ratio: float = DEFAULT_HEDGE_BUDGET):
+        self.ratio = ratio
+        self.requests = 0
+        self.hedges = 0
+
+    def on_request(self):
+        self.requests += 1
+
+    def try_acquire(self) -> bool:
+        if self.hedges + 1 > self.ratio * self.requests:
+            return False
+        self.hedges += 1
+        return True
+
+
+@dataclass
+class HedgePolicy:
+    percentile: float = DEFAULT_HEDGE_PERCENTILE
+    budget: HedgeBudget = field(default_factory=HedgeBudget)
+    trackers: Dict[str, LatencyTracker] = field(default_factory=lambda: defaultdict(LatencyTracker))
+    slots: Optional[asyncio.Semaphore] = None    # 限制在途请求数的信号量，对冲请求同样占一个槽位
+
+
+async def _acquire_hedge(policy: HedgePolicy) -> bool:
+    """对冲前先看有没有空闲槽位，再扣预算；没有空闲槽位时不排队等待、也不消耗预算"""
+    if policy.slots is not None and policy.slots.locked():
+        return False
+    if not policy.budget.try_acquire():
+        return False
+    if policy.slots is not None:
+        await policy.slots.acquire()
+    return True
+
+
+async def _cancel(tasks: Iterable[asyncio.Future]):
+    tasks = [t for t in tasks if not t.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def hedged_call(call: Callable[[bool], Awaitable[Dict]], key: str, policy: Optional[HedgePolicy],
+                      ok: Callable[[Dict], bool]) -> Tuple[Dict, Dict]:
+    """
+    call(is_hedge) 发出一次请求；key 区分耗时分布（按模型）；ok 判断结果是否成功。
+    返回 (结果, 对冲信息)。未对冲时对冲信息为空字典；对冲时包含
+    hedged、hedge_delay（发出对冲时已等待的秒数）、hedge_winner（primary / hedge）、
+    primary_latency（原请求耗时，被取消时为取消前已等待的时间）、primary_cancelled
+    """
+    if policy is None:
+        return await call(False), {}
+    tracker = policy.trackers[key]
+    policy.budget.on_request()
+    threshold = tracker.threshold(policy.percentile)
+    start = time.monotonic()
+    primary = asyncio.ensure_future(call(False))
+    tasks = [primary]
+    try:
+        if threshold is not None:
+            await asyncio.wait([primary], timeout=threshold)
+        if primary.done() or threshold is None or not await _acquire_hedge(policy):
+            result = await primary
+            # 失败的请求（限流、报错立即返回）不计入耗时分布，以免拉低对冲阈值
+            if ok(result):
+                tracker.record(time.monotonic() - start)
+            return result, {}
+
+        async def call_hedge():
+            try:
+                return await call(True)
+            finally:
+                if policy.slots is not None:
+                    policy.slots.release()
+
+        hedge_start = time.monotonic()
+        backup = asyncio.ensure_future(call_hedge())
+        tasks.append(backup)
+        finished_at = {}
+        winner, result, error = None, None, None
+        pending = set(tasks)
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            now = time.monotonic()
+            # 同时完成时优先原请求
+            for task in sorted(done, key=lambda t: t is not primary):
+                finished_at[task] = now
+                if task.exception() is not None:
+                    error = error or task.exception()
+                    continue
+                if ok(task.result()):
+                    winner, result = task, task.result()
+                    break
+                if result is None:
+                    result = task.result()
+        await _cancel(pending)
+        if result is None:
+            raise error
+        now = time.monotonic()
+        if winner is not None:
+            tracker.record(now - (hedge_start if winner is backup else start))
+        return result, {
+            'hedged': True,
+            'hedge_delay': round(threshold, 3),
+            'hedge_winner': 'hedge' if winner is backup else 'primary',
+            'primary_latency': round(finished_at.get(primary, now) - start, 3),
+            'primary_cancelled': primary not in finished_at,
+        }
+    finally:
+        await _cancel(tasks)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    return {
+        'p50': round(percentile(values, 50), 3),
+        'p90': round(percentile(values, 90), 3),
+        'p95': round(percentile(values, 95), 3),
+        'p99': round(percentile(values, 99), 3),
+        'max': round(max(values), 3) if values else 0.0,
+    }
+
+
+def latency_report(records: Iterable[Dict]) -> Dict:
+    """
+    按结果中的 attempts 汇总请求耗时分位数。
+    with_hedging 为实际耗时；without_hedging 只看原请求（被取消的按取消时已等待的时间，是下限）
+    """
+    observed, unhedged = [], []
+    hedged = wins = 0
+    for record in records:
+        for attempt in (record or {}).get('attempts') or []:
+            latency = attempt.get('latency', 0.0)
+            observed.append(latency)
+            if attempt.get('hedged'):
+                hedged += 1
+                wins += attempt.get('hedge_winner') == 'hedge'
+                unhedged.append(max(latency, attempt.get('primary_latency', latency)))
+            else:
+                unhedged.append(latency)
+    return {
+        'requests': len(observed),
+        'hedged': hedged,
+        'hedge_wins': wins,
+        'with_hedging': _percentiles(observed),
+        'without_hedging': _percentiles(unhedged),
+    }
+
+
+def format_latency_report(report: Dict) -> List[str]:
+    if not report['requests']:
+        return []
+    p = report['with_hedging']
+    lines = [f"⏱️ 请求耗时 p50 {p['p50']:.1f}s / p95 {p['p95']:.1f}s / p99 {p['p99']:.1f}s / 最慢 {p['max']:.1f}s"]
+    if report['hedged']:
+        q = report['without_hedging']
+        lines.append(f"🛡️ 对冲请求 {report['hedged']} 次（对冲先返回 {report['hedge_wins']} 次）；"
+                     f"不对冲时 p95 ≥ {q['p95']:.1f}s / p99 ≥ {q['p99']:.1f}s / 最慢 ≥ {q['max']:.1f}s")
+    return lines
@@ -0,0 +1,73 @@
+"""
+内容身份层：按文件内容（而不是文件名）识别同一份简历。
+
+同一份简历经常以不同文件名出现，或者同时出现在两个压缩包里。
+每个上传文件只流式计算一次 SHA-256，之后的缓存查询、队列去重都复用这个哈希，
+重复文件在解析和调用大模型之前就被合并掉。
+"""
+import hashlib
+from typing import Dict, List, Union, BinaryIO
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(source: Union[bytes, bytearray, memoryview, BinaryIO], chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """流式计算内容 SHA-256；传入文件对象时分块读取并在结束后把读指针复位到开头"""
+    hasher = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            hasher.update(view[start:start + chunk_size])
+        return hasher.hexdigest()
+
+    try:
+        source.seek(0)
+    except Exception:
+        pass
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+    try:
+        source.seek(0)
+    except Exception:
+        pass
+    return hasher.hexdigest()
+
+
+class ContentIndex:
+    """
+    上传队列的内容索引：sha256 -> 队列条目。
+    重复内容不再进入队列，其文件名挂到首个条目的 duplicate_names 上，
+    最终只产生一行结果，并统计因此省下的 API 调用次数。
+    """
+    def __init__(self):
+        self.by_hash: Dict[str, Dict] = {}
+        self.names = set()
+        self.collapsed = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def add(self, item: Dict) -> bool:
+        """登记一个队列条目（需含 name/bytes，可选 sha256）；返回 True 表示是新内容、应进入队列"""
+        if not item.get('sha256'):
+            item['sha256'] = content_hash(item['bytes'])
+        self.names.add(item['name'])
+
+        existing = self.by_hash.get(item['sha256'])
+        if existing is None:
+            item.setdefault('duplicate_names', [])
+            self.by_hash[item['sha256']] = item
+            return True
+
+        if item['name'] != existing['name'] and item['name'] not in existing['duplicate_names']:
+            existing['duplicate_names'].append(item['name'])
+        self.collapsed += 1
+        return False
+
+    def duplicates_by_name(self) -> Dict[str, List[str]]:
+        """{代表文件名: [重复文件名...]}，仅包含确实有重复的条目"""
+        return {item['name']: list(item['duplicate_names'])
+                for item in self.by_hash.values() if item.get('duplicate_names')}
@@ -0,0 +1,186 @@
+"""
+后台任务管理器：批处理在服务端线程池中运行，与某一次 Streamlit 脚本执行、某个浏览器会话解耦。
+
+页面只负责提交任务和轮询状态：
+- 提交后立即返回任务 ID，页面照常响应，切换到其它栏目或刷新页面都不会中断任务
+- 轮询接口返回进度、日志、已完成的部分结果；可随时请求取消
+- 管理器是进程级单例（模块只导入一次），所有会话看到的是同一组任务
+
+任务函数签名为 fn(job, *args, **kwargs)，通过 job.set_progress / job.log / job.add_partial 汇报，
+在阶段之间检查 job.cancelled，返回值即任务结果。
+"""
+import time
+import uuid
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_JOB_WORKERS = 2      # 同时运行的批处理任务数
+MAX_FINISHED_JOBS = 20       # 保留的已结束任务数（更早的结果从内存中丢弃）
+MAX_LOG_LINES = 500
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """任务函数在检查点发现取消请求时抛出"""
+
+
+class Job:
+    def __init__(self, job_id: str, name: str = ''):
+        self.job_id = job_id
+        self.name = name
+        self.status = STATUS_PENDING
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.stage = ''
+        self.current = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self._logs = deque(maxlen=MAX_LOG_LINES)
+        self._partial: List[Dict] = []
+        self._live: Dict[str, Dict] = {}   # 正在提取的简历 -> 已解析出的字段
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    # ---------- 任务函数侧 ----------
+    def set_progress(self, stage: str, current: int, total: int):
+        with self._lock:
+            self.stage, self.current, self.total = stage, current, total
+
+    def log(self, message: str):
+        with self._lock:
+            self._logs.append(message)
+
+    def add_partial(self, row: Dict):
+        with self._lock:
+            self._partial.append(row)
+
+    def set_live(self, key: str, fields: Optional[Dict]):
+        """正在进行中的条目的实时字段，fields 为 None 表示该条目已完成"""
+        with self._lock:
+            if fields is None:
+                self._live.pop(key, None)
+            else:
+                self._live[key] = fields
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    # ---------- 观察侧 ----------
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def finished_ok(self) -> bool:
+        return self.status == STATUS_DONE
+
+    @property
+    def is_active(self) -> bool:
+        return self.status not in FINISHED_STATUSES
+
+    def snapshot(self, partial_since: Optional[int] = 0, log_tail: int = 50) -> Dict:
+        """轮询用的状态快照；partial_since 用于增量获取部分结果，为 None 时不返回部分结果"""
+        with self._lock:
+            return {
+                'job_id': self.job_id,
+                'name': self.name,
+                'status': self.status,
+                'stage': self.stage,
+                'current': self.current,
+                'total': self.total,
+                'progress': self.current / self.total if self.total else 0.0,
+                'elapsed': (self.finished or time.time()) - (self.started or self.created),
+                'logs': list(self._logs)[-log_tail:] if log_tail else [],
+                'partial_count': len(self._partial),
+                'partial': self._partial[partial_since:] if partial_since is not None else [],
+                'live': {key: dict(fields) for key, fields in self._live.items()},
+                'error': self.error,
+                'cancel_requested': self._cancel.is_set(),
+            }
+
+
+class JobManager:
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, name: str = '', job_id: str = None, **kwargs) -> str:
+        job = Job(job_id or uuid.uuid4().hex[:12], name)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.job_id
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        if job.cancelled:
+            job.status = STATUS_CANCELLED
+            job.finished = time.time()
+            return
+        job.status = STATUS_RUNNING
+        job.started = time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = STATUS_CANCELLED if job.cancelled else STATUS_DONE
+        except JobCancelled:
+            job.status = STATUS_CANCELLED
+        except Exception as e:
+            job.error = f"{e}\n{traceback.format_exc()}"
+            job.status = STATUS_FAILED
+        finally:
+            job.finished = time.time()
+
+    def _prune(self):
+        finished = sorted((j for j in self._jobs.values() if not j.is_active), key=lambda j: j.finished or 0)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def poll(self, job_id: str, partial_since: int = 0) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        return job.snapshot(partial_since) if job else None
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or not job.is_active:
+            return False
+        job.cancel()
+        return True
+
+    def jobs(self, active_only: bool = False) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if active_only:
+            jobs = [j for j in jobs if j.is_active]
+        return sorted(jobs, key=lambda j: j.created, reverse=True)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """进程级单例"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,190 @@
+"""
+批处理任务日志（checkpoint journal）：每完成一个文件的一个阶段就追加一行到磁盘。
+
+浏览器刷新或会话中断后，已完成的解析和大模型调用都不会丢失：
+新会话用同一个任务 ID 打开日志，重放已完成的阶段，只处理剩下的文件，不重复消耗 API 额度。
+
+目录结构（每个任务一个目录）：
+    <root>/<job_id>/manifest.json   任务清单：文件名、内容哈希、大小、重复文件名、状态
+    <root>/<job_id>/inputs/<sha256> 输入文件副本（任务完成后删除）
+    <root>/<job_id>/journal.jsonl   阶段结果，一行一条：{"stage", "key", "data", "ts"}
+
+阶段：
+    parsed        解析成功（含 OCR，OCR 在解析过程中完成）
+    parse_failed  解析失败
+    extracted     大模型结构化提取完成
+    scored        评分后的结果行
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Optional
+
+from resume_core.spool import read_item_bytes
+
+JOBS_ROOT = ".resume_jobs"
+
+STAGE_PARSED = 'parsed'
+STAGE_PARSE_FAILED = 'parse_failed'
+STAGE_EXTRACTED = 'extracted'
+STAGE_SCORED = 'scored'
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+
+
+def new_job_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+class JobJournal:
+    def __init__(self, job_id: str, root: str = JOBS_ROOT):
+        self.job_id = job_id
+        self.root = root
+        self.dir = os.path.join(root, job_id)
+        self.inputs_dir = os.path.join(self.dir, "inputs")
+        self.manifest_path = os.path.join(self.dir, "manifest.json")
+        self.journal_path = os.path.join(self.dir, "journal.jsonl")
+        self._lock = threading.Lock()
+        self._fh = None
+
+    # ---------- 创建 / 打开 ----------
+    @classmethod
+    def create(cls, items: List[Dict], config: Dict = None, job_id: str = None, root: str = JOBS_ROOT) -> 'JobJournal':
+        """新建任务：保存输入文件副本和任务清单"""
+        journal = cls(job_id or new_job_id(), root)
+        os.makedirs(journal.inputs_dir, exist_ok=True)
+
+        entries = []
+        for item in items:
+            sha256 = item['sha256']
+            dest = os.path.join(journal.inputs_dir, sha256)
+            if not os.path.exists(dest):
+                journal._store_input(item, dest)
+            entries.append({
+                'name': item['name'],
+                'sha256': sha256,
+                'size': item.get('size', 0),
+                'duplicate_names': list(item.get('duplicate_names', [])),
+            })
+
+        journal._write_manifest({
+            'job_id': journal.job_id,
+            'created': time.time(),
+            'status': STATUS_RUNNING,
+            'config': {k: v for k, v in (config or {}).items() if isinstance(v, (str, int, float, bool))},
+            'items': entries,
+        })
+        return journal
+
+    @classmethod
+    def open(cls, job_id: str, root: str = JOBS_ROOT) -> Optional['JobJournal']:
+        journal = cls(job_id, root)
+        return journal if os.path.exists(journal.manifest_path) else None
+
+    def _store_input(self, item: Dict, dest: str):
+        # 暂存区文件优先硬链接（同一文件系统时不占额外空间），否则复制
+        blob = item.get('blob')
+        if blob and os.path.exists(blob):
+            try:
+                os.link(blob, dest)
+                return
+            except OSError:
+                shutil.copyfile(blob, dest)
+                return
+        with open(dest, 'wb') as f:
+            f.write(read_item_bytes(item))
+
+    # ---------- 清单 ----------
+    def manifest(self) -> Dict:
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def load_items(self) -> List[Dict]:
+        """恢复任务时的队列条目（指向任务目录中的输入副本）"""
+        items = []
+        for entry in self.manifest()['items']:
+            item = dict(entry)
+            item['blob'] = os.path.join(self.inputs_dir, entry['sha256'])
+            items.append(item)
+        return items
+
+    # ---------- 日志 ----------
+    def append(self, stage: str, key: str, data):
+        """追加一条阶段结果并立即落盘"""
+        if is_dataclass(data):
+            data = asdict(data)
+        line = json.dumps({'stage': stage, 'key': key, 'data': data, 'ts': time.time()},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.journal_path, 'a', encoding='utf-8')
+                # 上次中断可能留下不完整的最后一行，先补换行，避免新记录与其粘连
+                if self._fh.tell() > 0 and not self._ends_with_newline():
+                    self._fh.write("\n")
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def replay(self) -> Dict[str, Dict[str, object]]:
+        """读取日志：{stage: {key: data}}，同一 key 以最后一条为准；进程中断导致的半行直接忽略"""
+        stages: Dict[str, Dict[str, object]] = {}
+        if not os.path.exists(self.journal_path):
+            return stages
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                stages.setdefault(record['stage'], {})[record['key']] = record['data']
+        return stages
+
+    def mark_done(self):
+        """任务完成：更新状态并删除输入副本，结果仍保留在日志中"""
+        self.close()
+        manifest = self.manifest()
+        manifest['status'] = STATUS_DONE
+        manifest['finished'] = time.time()
+        self._write_manifest(manifest)
+        shutil.rmtree(self.inputs_dir, ignore_errors=True)
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+def list_jobs(root: str = JOBS_ROOT) -> List[Dict]:
+    """列出全部任务清单（最新的在前）"""
+    jobs = []
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return jobs
+    for name in names:
+        journal = JobJournal.open(name, root)
+        if journal is None:
+            continue
+        try:
+            jobs.append(journal.manifest())
+        except (OSError, json.JSONDecodeError):
+            continue
+    jobs.sort(key=lambda m: m.get('created', 0), reverse=True)
+    return jobs
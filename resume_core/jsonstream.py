@@ -0,0 +1,116 @@
+"""
+增量 JSON 解析：流式响应逐块喂入，每个标量值解析完成时立即产出 (路径, 值)。
+
+不等整段 JSON 收完，就能把 basic_info.name、basic_info.subject 这类字段提前显示在页面上。
+只做事件提取，不做完整性校验；最终结果仍以完整文本 json.loads 为准。
+第一个 '{' 或 '[' 之前的内容（如 Markdown 代码块标记）直接跳过。
+"""
+from typing import Any, List, Tuple
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_LITERALS = {'true': True, 'false': False, 'null': None}
+_TOKEN_CHARS = set('0123456789+-.eEtrufalsn')
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        # 每层容器: [是否对象, 当前键或下标, 对象中是否在等待键]
+        self._stack: List[list] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._unicode = None          # \uXXXX 收集中的十六进制字符
+        self._buf: List[str] = []
+        self._token: List[str] = []   # 数字 / true / false / null
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def _path(self) -> Tuple:
+        return tuple(frame[1] for frame in self._stack)
+
+    def _emit_token(self, events: List):
+        text = ''.join(self._token)
+        self._token = []
+        if text in _LITERALS:
+            value = _LITERALS[text]
+        else:
+            try:
+                value = float(text) if any(c in text for c in '.eE') else int(text)
+            except ValueError:
+                return
+        events.append((self._path(), value))
+
+    def feed(self, chunk: str) -> List[Tuple[Tuple, Any]]:
+        events = []
+        for c in chunk:
+            if self._done:
+                break
+            if self._in_string:
+                self._feed_string(c, events)
+                continue
+            if self._token:
+                if c in _TOKEN_CHARS:
+                    self._token.append(c)
+                    continue
+                self._emit_token(events)
+            if not self._started:
+                if c in '{[':
+                    self._started = True
+                    self._stack.append([c == '{', None if c == '{' else 0, c == '{'])
+                continue
+            if c in ' \t\r\n:':
+                continue
+            if c in '{[':
+                self._stack.append([c == '{', None if c == '{' else 0, c == '{'])
+            elif c in '}]':
+                self._stack.pop()
+                if not self._stack:
+                    self._done = True
+            elif c == ',':
+                top = self._stack[-1]
+                if top[0]:
+                    top[2] = True
+                else:
+                    top[1] += 1
+            elif c == '"':
+                top = self._stack[-1]
+                self._in_string = True
+                self._string_is_key = top[0] and top[2]
+                self._buf = []
+            elif c in _TOKEN_CHARS:
+                self._token.append(c)
+        return events
+
+    def _feed_string(self, c: str, events: List):
+        if self._unicode is not None:
+            self._unicode.append(c)
+            if len(self._unicode) == 4:
+                try:
+                    self._buf.append(chr(int(''.join(self._unicode), 16)))
+                except ValueError:
+                    pass
+                self._unicode = None
+            return
+        if self._escape:
+            self._escape = False
+            if c == 'u':
+                self._unicode = []
+            else:
+                self._buf.append(_ESCAPES.get(c, c))
+            return
+        if c == '\\':
+            self._escape = True
+        elif c == '"':
+            self._in_string = False
+            value = ''.join(self._buf)
+            top = self._stack[-1]
+            if self._string_is_key:
+                top[1], top[2] = value, False
+            else:
+                events.append((self._path(), value))
+        else:
+            self._buf.append(c)
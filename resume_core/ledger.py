@@ -0,0 +1,63 @@
+"""
+上传登记簿：记录本会话已经接收、已经处理过的文件，跨 Streamlit rerun 保持。
+
+st.file_uploader 里的文件在每次 rerun 时都还挂着，如果每次都 read() 一遍，
+点击“开始批量解析”清空队列后，下一次交互就会把同一批文件重新读取、重新解压、重新入队。
+登记簿按两把钥匙去重：
+- 上传控件的文件 id：同一个上传对象只接收一次，连读都不再读
+- 内容哈希：压缩包同一会话内只解压一次；已处理过的简历再次上传时直接跳过
+"""
+import os
+from typing import Dict, Iterable, List, Optional
+
+
+def upload_key(uploaded_file) -> str:
+    """上传对象的稳定标识：优先使用 Streamlit 分配的 file_id，旧版本回退到 文件名+大小"""
+    file_id = getattr(uploaded_file, 'file_id', None) or getattr(uploaded_file, 'id', None)
+    if file_id:
+        return str(file_id)
+    return f"{uploaded_file.name}:{getattr(uploaded_file, 'size', 0)}"
+
+
+class IngestionLedger:
+    def __init__(self):
+        # 上传对象标识 -> {'name', 'sha256'}
+        self.uploads: Dict[str, Dict] = {}
+        # 压缩包内容哈希 -> 解压出的条目列表（句柄，不含字节）
+        self.archives: Dict[str, List[Dict]] = {}
+        # 已完成处理的文件内容哈希
+        self.processed = set()
+
+    def seen_upload(self, key: str) -> bool:
+        return key in self.uploads
+
+    def record_upload(self, key: str, name: str, sha256: Optional[str] = None):
+        self.uploads[key] = {'name': name, 'sha256': sha256}
+
+    def archive_members(self, sha256: str) -> Optional[List[Dict]]:
+        """
+        同一压缩包（按内容）此前已解压过时返回当时的条目列表。
+        若其中有尚未处理、暂存文件却已被删除（例如清空过队列）的条目，返回 None，需要重新解压。
+        """
+        members = self.archives.get(sha256)
+        if members is None:
+            return None
+        for m in members:
+            if not self.is_processed(m['sha256']) and not (m.get('blob') and os.path.exists(m['blob'])):
+                return None
+        return [dict(m) for m in members]
+
+    def record_archive(self, sha256: str, members: List[Dict]):
+        self.archives[sha256] = [{k: v for k, v in m.items() if k != 'bytes'} for m in members]
+
+    def is_processed(self, sha256: str) -> bool:
+        return sha256 in self.processed
+
+    def mark_processed(self, sha256s: Iterable[str]):
+        self.processed.update(s for s in sha256s if s)
+
+    def reset(self):
+        """允许重新处理：清空全部记录"""
+        self.uploads.clear()
+        self.archives.clear()
+        self.processed.clear()
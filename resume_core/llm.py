@@ -0,0 +1,527 @@
+"""
+大模型结构化提取：并发调用 DeepSeek（硅基流动）接口，把简历文本转成结构化 JSON。
+本模块不依赖 Streamlit，并发数、超时、目标城市由 PipelineConfig 显式传入，
+提示词、模型、采样参数由分析方案（resume_core.profiles.AnalysisProfile）提供。
+"""
+import json
+import time
+import asyncio
+import aiohttp
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Dict, Tuple
+
+from resume_core.cancel import Cancelled, CancelToken, run_cancellable
+from resume_core.cascade import TIER_FAST, TIER_FULL, check_extraction
+from resume_core.hedge import HedgeBudget, HedgePolicy, hedged_call
+from resume_core.compact import compact_resume_text, estimate_tokens
+from resume_core.config import PipelineConfig
+from resume_core.extract import ParseResult
+from resume_core.jsonstream import IncrementalJSONParser
+from resume_core.packing import pack_bins
+from resume_core.preextract import pre_extract
+from resume_core.schedule import shortest_first
+
+API_URL = "https://api.siliconflow.cn/v1/chat/completions"
+DEFAULT_MODEL = "deepseek-ai/DeepSeek-V3"
+MAX_OUTPUT_TOKENS = 8192   # 接口单次请求 max_tokens 上限，超过时请求被拒绝或输出被截断
+RESULT_SECTIONS = ['basic_info', 'education', 'work_experience', 'achievements', 'ai_assessment']
+
+# 流式输出中提前展示的字段：JSON 路径 -> 显示名
+LIVE_FIELDS = {
+    ('basic_info', 'name'): '姓名',
+    ('basic_info', 'gender'): '性别',
+    ('basic_info', 'subject'): '学科',
+    ('education', 'bachelor_school'): '本科学校',
+    ('work_experience', 'current_company'): '现单位',
+}
+
+
+# 提示词版本：固定指令块有任何改动都要升级，任务日志和缓存按 AnalysisProfile.prompt_key 区分
+PROMPT_VERSION = "0410.3"
+
+# 系统提示词是逐字节固定的指令块，不含任何按文件、按日期变化的内容，
+# 服务端前缀缓存（KV cache）才能跨请求命中；日期、目标城市、文件名放在用户消息开头的【上下文】里
+SYSTEM_PROMPT = """你是一个专业的HR简历分析助手。请从简历文本中提取结构化信息。
+
+【上下文】用户消息开头的【上下文】给出今天的日期、当前年份、目标城市（可能为空）和简历文件名。
+
+【重要提示】计算年龄时必须使用【上下文】中的当前年份减去出生年份。
+
+【年龄估算规则】如果简历中没有直接写出年龄或出生年份，请根据以下信息估算：
+- 本科毕业年份：正常人18岁上大学，22岁本科毕业，年龄约为 当前年份 - 本科毕业年份 + 22
+- 硕士毕业年份：正常人22岁本科毕业，25岁硕士毕业
+- 工作经验：如"3年工作经验"，假设开始工作年龄为22岁，则当前年龄约为22+3=25岁
+- 教育背景中的入学年份也可用于推算
+
+【学校层次】tier 字段只能填：C9/985/211/海外名校/双一流/重点师范/普通一本/二本/专科/无法判断。
+
+请提取以下信息并返回JSON格式：
+{
+    "basic_info": {
+        "name": "姓名",
+        "gender": "性别(男/女)",
+        "age": "年龄(数字，根据【上下文】中的当前年份计算或估算)",
+        "subject": "任教学科(只填学科名称，如数学、语文、英语，不要带高中/初中/小学等前缀)",
+        "marital_status": "婚育状况(已婚已育/已婚未育/未婚/未提及)",
+        "residence": "现居住城市",
+        "partner_location": "配偶/伴侣工作地城市",
+        "parents_background": "父母职业或单位背景摘要"
+    },
+    "education": {
+        "high_school_tier": "高中层次（只能填：重点/县中/普通/无法判断）",
+        "bachelor_school": "本科学校（只填学校名称，不要专业）",
+        "bachelor_tier": "本科层次（见【学校层次】）",
+        "master_school": "硕士学校（只填学校名称，不要专业）",
+        "master_tier": "硕士层次（见【学校层次】）",
+        "study_abroad_years": "海外留学时长(年，数字，无则为0)",
+        "exchange_experience": "是否有交换经历(是/否)"
+    },
+    "work_experience": {
+        "current_company": "现工作单位",
+        "school_tier": "现单位档次(市重点/知名民办/普通/机构/其他)",
+        "non_teaching_gap": "非教行业空窗期(年，数字，无则为0)",
+        "overseas_work_years": "海外工作时长(年，数字，无则为0)",
+        "management_role": "曾任管理岗(中层/年级组长/教研组长/无)",
+        "head_teacher_years": "班主任年限(数字)",
+        "teaching_years": "教龄(预估数字)"
+    },
+    "achievements": {
+        "honor_titles": ["荣誉称号列表(如学科带头人, 骨干教师, 优青, 特级)"],
+        "teaching_competition": ["赛课获奖列表(如优质课一等奖)"],
+        "academic_results": ["课题或论文成果摘要"]
+    },
+    "ai_assessment": {
+        "summary": "一句话亮点摘要(50字以内)",
+        "risk_warning": "风险提示(如有)",
+        "potential_score": "AI潜质评分(1-5分，根据简历质量、职业轨迹综合评估)"
+    }
+}"""
+
+
+def build_context(filename: str = "", target_city: str = "") -> str:
+    """按文件、按日期变化的内容，放在用户消息开头"""
+    today = datetime.now()
+    lines = [
+        "【上下文】",
+        f"今天是{today.strftime('%Y年%m月%d日')}，当前年份是{today.year}年。例如：2005年出生的人，年龄应该是{today.year - 2005}岁。",
+        f"目标城市：{target_city or '未指定'}",
+    ]
+    if filename:
+        lines.append(f"简历文件名：{filename}")
+    return "\n".join(lines)
+
+
+def build_user_prompt(text: str) -> str:
+    return f"请分析以下简历：\n\n{text}"
+
+
+PACK_INSTRUCTION = """
+
+【多份简历】本次消息包含多份简历，每份以"【简历 id=编号 文件名：...】"开头。
+请对每份简历分别按上述格式提取，返回：
+{"results": [{"id": 编号, "basic_info": {...}, "education": {...}, "work_experience": {...}, "achievements": {...}, "ai_assessment": {...}}, ...]}
+每份简历必须有且只有一条结果，id 与简历编号一致，不同简历的信息不要混用。"""
+
+
+def build_messages(profile, text: str, filename: str = "", target_city: str = "") -> Tuple[str, str]:
+    """返回 (系统提示词, 用户消息)：系统提示词固定不变，上下文和简历正文都在用户消息里"""
+    if profile.max_input_chars and len(text) > profile.max_input_chars:
+        text = text[:profile.max_input_chars]
+    return profile.system_prompt, profile.context(filename, target_city) + "\n\n" + profile.user_prompt(text)
+
+
+def build_packed_user_prompt(entries: List[Tuple[str, str]]) -> str:
+    """entries: [(文件名, 简历文本)]，编号即下标"""
+    parts = [f"【简历 id={i} 文件名：{filename}】\n{text}" for i, (filename, text) in enumerate(entries)]
+    return f"请分析以下 {len(entries)} 份简历：\n\n" + "\n\n".join(parts)
+
+
+class StallError(Exception):
+    """流式响应首字超时或中途停滞"""
+
+
+@dataclass
+class StreamOptions:
+    """流式请求参数：首字超时、相邻片段间隔超时、停滞后重试次数，以及增量字段回调"""
+    ttft_timeout: float = 20.0
+    stall_timeout: float = 15.0
+    retries: int = 2
+    on_value: Callable[[Tuple, object], None] = None   # (JSON 路径, 值)，每个字段解析完成时回调
+
+
+async def _read_stream(response: aiohttp.ClientResponse, stream: StreamOptions) -> Tuple[str, Dict]:
+    """读取 SSE 流并拼接内容，返回 (内容, token 用量)；首个片段或相邻片段等待超时时抛出 StallError"""
+    parser = IncrementalJSONParser() if stream.on_value else None
+    parts = []
+    usage = {}
+    last_progress = time.monotonic()
+    while True:
+        limit = stream.stall_timeout if parts else stream.ttft_timeout
+        remaining = last_progress + limit - time.monotonic()
+        try:
+            raw = await asyncio.wait_for(response.content.readline(), max(remaining, 0.001))
+        except asyncio.TimeoutError:
+            raise StallError(f"输出停滞超过 {stream.stall_timeout:.0f}s" if parts else f"首字超时 {stream.ttft_timeout:.0f}s")
+        if not raw:
+            break
+        line = raw.decode('utf-8', errors='ignore').strip()
+        if not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            break
+        chunk = json.loads(data)
+        # 请求带 stream_options.include_usage 时，最后一个片段附带整次请求的用量
+        usage = chunk.get('usage') or usage
+        choices = chunk.get('choices') or [{}]
+        delta = choices[0].get('delta') or {}
+        if delta.get('reasoning_content'):
+            # 思考过程不计入结果，但说明请求仍在推进
+            last_progress = time.monotonic()
+        content = delta.get('content')
+        if content:
+            parts.append(content)
+            last_progress = time.monotonic()
+            if parser:
+                for path, value in parser.feed(content):
+                    stream.on_value(path, value)
+    return ''.join(parts), usage
+
+
+async def _post_chat(session: aiohttp.ClientSession, payload: Dict, api_key: str,
+                     stream: StreamOptions = None) -> Tuple[str, str, Dict]:
+    """
+    发送一次对话请求，返回 (去掉代码块包装的回复内容, 错误信息, 接口返回的 token 用量)
+    传入 stream 时使用流式响应，停滞时抛出 StallError 由调用方重试
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}", 
+        "Content-Type": "application/json"
+    }
+    if stream:
+        payload = dict(payload, stream=True, stream_options={"include_usage": True})
+    try:
+        async with session.post(API_URL, headers=headers, json=payload) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                return "", f"API错误 {response.status}: {error_text[:200]}", {}
+            
+            if stream:
+                content, usage = await _read_stream(response, stream)
+            else:
+                data = await response.json()
+                if not data.get('choices'):
+                    return "", "API返回格式异常", {}
+                content = data['choices'][0]['message']['content']
+                usage = data.get('usage') or {}
+            # 个别模型即使要求 JSON 输出也会包一层 Markdown 代码块
+            return content.replace("```json", "").replace("```", "").strip(), "", usage
+    except StallError:
+        raise
+    except asyncio.TimeoutError:
+        return "", "API请求超时", {}
+    except Exception as e:
+        return "", f"请求异常: {str(e)}", {}
+
+
+async def _post_with_retry(session: aiohttp.ClientSession, payload: Dict, api_key: str,
+                           stream: StreamOptions = None) -> Tuple[str, str, int, Dict]:
+    """停滞的流式请求提前中止并重试，返回 (内容, 错误信息, 停滞次数, token 用量)"""
+    stalls = 0
+    while True:
+        try:
+            content, error, usage = await _post_chat(session, payload, api_key, stream)
+            return content, error, stalls, _usage(payload, content, usage)
+        except StallError as e:
+            stalls += 1
+            if stalls > stream.retries:
+                return "", str(e), stalls, _usage(payload, "", {})
+
+
+def _usage(payload: Dict, content: str, usage: Dict) -> Dict:
+    """接口返回的 token 用量；接口没有返回时按文本长度估算"""
+    if usage.get('prompt_tokens') is not None:
+        return {'prompt_tokens': usage.get('prompt_tokens', 0), 'completion_tokens': usage.get('completion_tokens', 0)}
+    prompt = sum(estimate_tokens(m['content']) for m in payload['messages'])
+    return {'prompt_tokens': prompt, 'completion_tokens': estimate_tokens(content), 'estimated': True}
+
+
+def _build_payload(profile, model: str, system_prompt: str, user_prompt: str, max_tokens: int) -> Dict:
+    return {
+        "model": model or profile.model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": profile.temperature,
+        "max_tokens": max_tokens,
+        "response_format": {"type": "json_object"},
+        **profile.extra_payload
+    }
+
+
+def _fill_sections(parsed: Dict, system_prompt: str, content: str) -> Dict:
+    for key in RESULT_SECTIONS:
+        if key not in parsed:
+            parsed[key] = {}
+    # 注入 debug 信息供排查
+    parsed['_debug_prompt'] = system_prompt
+    parsed['_debug_raw_response'] = content
+    return parsed
+
+
+async def call_deepseek_api_async(
+    session: aiohttp.ClientSession, 
+    text: str, 
+    api_key: str,
+    filename: str = "",
+    target_city: str = "",
+    profile=None,
+    model: str = "",
+    stream: StreamOptions = None
+) -> Dict:
+    """
+    异步调用DeepSeek API - 单次调用，不带信号量（由调用方控制）
+    profile: 分析方案，决定提示词、模型与采样参数；model 非空时覆盖方案的默认模型
+    stream: 使用流式响应（停滞检测 + 增量字段回调），为 None 时等待完整响应
+    结果中的 _stalls 为停滞重试次数，_usage 为本次请求的 token 用量
+    """
+    system_prompt, user_prompt = build_messages(profile, text, filename, target_city)
+    payload = _build_payload(profile, model, system_prompt, user_prompt, profile.max_tokens)
+    debug_prompt = system_prompt + "\n\n" + profile.context(filename, target_city)
+    
+    content, error, stalls, usage = await _post_with_retry(session, payload, api_key, stream)
+    if error:
+        return {"error": error, "_stalls": stalls, "_usage": usage}
+    try:
+        parsed = _fill_sections(json.loads(content), debug_prompt, content)
+        parsed['_stalls'] = stalls
+        parsed['_usage'] = usage
+        return parsed
+    except json.JSONDecodeError as e:
+        return {"error": f"JSON解析失败: {str(e)}", "raw_content": content[:500], "_debug_prompt": debug_prompt, "_debug_raw_response": content,
+                "_stalls": stalls, "_usage": usage}
+
+
+async def call_deepseek_api_packed(
+    session: aiohttp.ClientSession,
+    entries: List[Tuple[str, str]],
+    api_key: str,
+    target_city: str = "",
+    profile=None,
+    model: str = "",
+    stream: StreamOptions = None
+) -> Tuple[Dict[int, Dict], str]:
+    """
+    多份简历合并为一次请求。entries: [(文件名, 简历文本)]
+    返回 ({下标: 提取结果}, 错误信息)；缺失或格式不对的条目不在结果中，由调用方回退为单份请求。
+    合并请求的 token 用量按份数平均记入每条结果的 _usage
+    """
+    # 合并说明同样是固定内容，接在系统提示词之后不影响单份请求的前缀缓存
+    system_prompt = profile.system_prompt + PACK_INSTRUCTION
+    if profile.max_input_chars:
+        entries = [(filename, text[:profile.max_input_chars]) for filename, text in entries]
+    context = profile.context("", target_city)
+    payload = _build_payload(profile, model, system_prompt, context + "\n\n" + build_packed_user_prompt(entries),
+                             min(profile.max_tokens * len(entries), MAX_OUTPUT_TOKENS))
+    
+    content, error, _, usage = await _post_with_retry(session, payload, api_key, stream)
+    if error:
+        return {}, error
+    share = dict(usage, prompt_tokens=round(usage['prompt_tokens'] / len(entries)),
+                 completion_tokens=round(usage['completion_tokens'] / len(entries)))
+    try:
+        items = json.loads(content).get('results')
+    except (json.JSONDecodeError, AttributeError) as e:
+        return {}, f"JSON解析失败: {str(e)}"
+    if not isinstance(items, list):
+        return {}, "合并请求返回格式异常"
+    
+    results = {}
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('basic_info'), dict):
+            continue
+        try:
+            idx = int(item.pop('id'))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < len(entries) and idx not in results:
+            results[idx] = _fill_sections(item, system_prompt + "\n\n" + context, json.dumps(item, ensure_ascii=False))
+            results[idx]['_usage'] = share
+    return results, ""
+
+
+async def process_batch_async_fast(parsed_results: List[ParseResult], api_key: str, progress_callback=None,
+                                   on_result=None, config: PipelineConfig = None, token: CancelToken = None,
+                                   profile=None, on_partial=None) -> List[Dict]:
+    """
+    异步批量处理简历 - 极速版
+    真正的同时并发，而不是顺序await
+    on_result: 每份简历完成后以结果字典回调，用于写任务日志
+    token: 批次取消令牌，取消后尚未发出的请求不再发出，进行中的请求立即中止（连接关闭、并发槽位释放），
+    只返回已完成的结果
+    profile: 分析方案，默认取 config.profile
+    开启 config.pack_requests 时，短简历按 token 数装箱合并请求；合并请求失败或缺条目的简历自动回退为单份请求
+    开启 config.stream_responses 时使用流式响应：首字或中途停滞超时提前中止重试，
+    on_partial(文件名, {显示名: 值}) 在姓名、学科等字段解析出来时回调，该份完成时以 None 回调
+    开启 config.cascade 时单份请求先用 config.fast_model，结果校验不通过（见 resume_core.cascade）再用大模型；
+    每条结果的 attempts 记录各层请求的模型、耗时、token 用量和不通过原因
+    开启 config.hedge_requests 时单份请求超过同模型近期耗时的 config.hedge_percentile 分位数仍未返回，
+    在预算内且有空闲并发槽位时再发一份，先成功的采用、另一份取消（见 resume_core.hedge），attempt 中记录对冲信息
+    开启 config.shortest_first 时单份请求按送入模型的 token 数从少到多发出
+    """
+    results = [None] * len(parsed_results)  # 预分配结果列表
+    config = config or PipelineConfig()
+    if profile is None:
+        from resume_core.profiles import get_profile  # profiles 依赖本模块，延迟导入
+        profile = get_profile(config.profile)
+    timeout = aiohttp.ClientTimeout(total=config.api_timeout)
+    
+    semaphore = asyncio.Semaphore(config.max_concurrent_api)
+    # 按 token 预算压缩后再发送；评分和 debug 仍使用完整文本
+    compacted = [compact_resume_text(pr.content, config.token_budget) for pr in parsed_results]
+    # 手机号、邮箱、出生年份、名单内院校层次等在本地确定，合并结果时优先于大模型的值
+    local_fields = [pre_extract(pr.content, pr.filename).to_dict() for pr in parsed_results]
+    
+    def stream_options(filename: str = None) -> StreamOptions:
+        if not config.stream_responses:
+            return None
+        if not (filename and on_partial):
+            return StreamOptions(config.ttft_timeout, config.stall_timeout, config.api_retry)
+        live = {}
+        
+        def on_value(path, value):
+            label = LIVE_FIELDS.get(path)
+            if label and value not in (None, '', 'null'):
+                live[label] = value
+                on_partial(filename, dict(live))
+        return StreamOptions(config.ttft_timeout, config.stall_timeout, config.api_retry, on_value)
+    
+    # 分级提取：先用小模型，校验不通过再用大模型；未开启时只有大模型一层
+    full_model = config.model or profile.model
+    tiers = [(TIER_FULL, full_model)]
+    if config.cascade and config.fast_model and config.fast_model != full_model:
+        tiers.insert(0, (TIER_FAST, config.fast_model))
+    # 对冲请求：耗时分布按模型分别统计，预算整批共用，与单份请求共用并发槽位；合并请求不对冲
+    hedge = (HedgePolicy(config.hedge_percentile, HedgeBudget(config.hedge_budget), slots=semaphore)
+             if config.hedge_requests else None)
+    
+    def make_attempt(idx: int, tier: str, model: str, api_result: Dict, start_time: float, last: bool,
+                     **hedge_info) -> Dict:
+        """一次请求的记录；不是最后一层时校验不通过（reasons 非空）即升级"""
+        usage = api_result.pop('_usage', {})
+        reasons = check_extraction(api_result, RESULT_SECTIONS, parsed_results[idx].content,
+                                   parsed_results[idx].filename, local_fields[idx])
+        return {
+            'tier': tier,
+            'model': model,
+            'latency': round(time.time() - start_time, 3),
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0),
+            'stalls': api_result.pop('_stalls', 0),
+            'accepted': not reasons or (last and 'error' not in api_result),
+            'reasons': reasons,
+            **hedge_info
+        }
+    
+    def make_record(idx: int, api_result: Dict, start_time: float, attempts: List[Dict], **extra) -> Dict:
+        parse_result = parsed_results[idx]
+        return {
+            'filename': parse_result.filename,
+            'parsed_content': parse_result.content[:200] + "..." if len(parse_result.content) > 200 else parse_result.content,
+            'full_content': parse_result.content,
+            'api_result': api_result,
+            'pre_extracted': local_fields[idx],
+            'parse_time': parse_result.parse_time,
+            'api_time': time.time() - start_time,
+            'input_tokens': compacted[idx].tokens,
+            'tokens_saved': compacted[idx].saved_tokens,
+            'dropped_sections': compacted[idx].dropped_sections,
+            'prompt_key': profile.prompt_key,
+            'stall_retries': sum(a['stalls'] for a in attempts),
+            'model': attempts[-1]['model'] if attempts else full_model,
+            'model_tier': attempts[-1]['tier'] if attempts else TIER_FULL,
+            'attempts': attempts,
+            **extra
+        }
+    
+    def finish(idx: int, record: Dict):
+        results[idx] = record
+        if on_partial:
+            on_partial(record['filename'], None)
+        if on_result:
+            on_result(record)
+        if progress_callback:
+            progress_callback(sum(1 for r in results if r is not None), len(parsed_results))
+    
+    async def process_one(idx: int, **extra):
+        """处理单个简历"""
+        async with semaphore:
+            if token is not None and token.cancelled:
+                return
+            start_time = time.time()
+            filename = parsed_results[idx].filename
+            attempts = []
+            try:
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    for level, (tier, model) in enumerate(tiers):
+                        tier_start = time.time()
+                        # 对冲的那份不回调实时字段，避免两份流式结果交替刷新
+                        api_result, hedge_info = await hedged_call(
+                            lambda is_hedge: call_deepseek_api_async(session, compacted[idx].text, api_key, filename,
+                                                                     config.target_city, profile, model,
+                                                                     stream_options(None if is_hedge else filename)),
+                            model, hedge, lambda r: 'error' not in r)
+                        attempts.append(make_attempt(idx, tier, model, api_result, tier_start, level == len(tiers) - 1,
+                                                     **hedge_info))
+                        if attempts[-1]['accepted']:
+                            break
+            except Exception as e:
+                api_result = {"error": str(e)}
+        finish(idx, make_record(idx, api_result, start_time, attempts, **extra))
+    
+    async def process_pack(pack_id: int, idxs: List[int]):
+        """处理一组合并的短简历，未拿到结果的逐份回退"""
+        async with semaphore:
+            if token is not None and token.cancelled:
+                return
+            start_time = time.time()
+            entries = [(parsed_results[i].filename, compacted[i].text) for i in idxs]
+            try:
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    packed, _ = await call_deepseek_api_packed(session, entries, api_key, config.target_city,
+                                                               profile, full_model, stream_options())
+            except Exception:
+                packed = {}
+        for pos, idx in enumerate(idxs):
+            if pos in packed:
+                # 合并请求只用大模型
+                attempt = make_attempt(idx, TIER_FULL, full_model, packed[pos], start_time, True)
+                finish(idx, make_record(idx, packed[pos], start_time, [attempt], pack_id=pack_id, pack_size=len(idxs)))
+        await asyncio.gather(*[process_one(idx, pack_id=pack_id, pack_size=len(idxs), pack_fallback=True)
+                               for pos, idx in enumerate(idxs) if pos not in packed])
+    
+    # 创建所有任务并同时运行
+    tasks = []
+    singles = list(range(len(parsed_results)))
+    # 每份输出按 profile.max_tokens 预留，一次请求的份数还受接口输出上限限制，否则合并请求的输出会被截断
+    pack_max_items = min(config.pack_max_items, MAX_OUTPUT_TOKENS // max(1, profile.max_tokens))
+    if config.pack_requests and pack_max_items > 1:
+        short = [i for i in singles if compacted[i].tokens <= config.pack_item_tokens]
+        bins = pack_bins([compacted[i].tokens for i in short], config.pack_budget_tokens, pack_max_items)
+        packs = [[short[j] for j in b] for b in bins if len(b) > 1]
+        packed_idxs = {i for pack in packs for i in pack}
+        singles = [i for i in singles if i not in packed_idxs]
+        tasks += [process_pack(pack_id, pack) for pack_id, pack in enumerate(packs)]
+    if config.shortest_first:
+        # 请求按创建顺序获得并发槽位：token 少的先发，先出结果
+        singles = shortest_first(singles, [c.tokens for c in compacted])
+    tasks += [process_one(i) for i in singles]
+    try:
+        await run_cancellable(asyncio.gather(*tasks), token)
+    except Cancelled:
+        pass
+    
+    # 取消后未发出的请求没有结果
+    return [r for r in results if r is not None]
@@ -0,0 +1,192 @@
+"""
+近似重复简历检测（解析之后、调用大模型之前）。
+
+候选人经常同时投递同一份简历的 PDF 和 DOCX 版本，或者稍作修改后再投一次，
+字节哈希不同，但文本几乎一样。这里对归一化后的文本做字符 shingle + MinHash 签名，
+用 LSH 分桶找候选对，再结合手机号、文件名中的姓名作为辅助证据判定是否同一候选人。
+每组只选一个代表送去大模型，结果再分发给组内其它文件。
+"""
+import re
+import copy
+import zlib
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from resume_core.preextract import pre_extract
+
+NUM_PERM = 64            # MinHash 签名长度
+LSH_BANDS = 16           # LSH 分桶数（每桶 NUM_PERM // LSH_BANDS 行）
+SHINGLE_SIZE = 5         # 字符 shingle 长度
+DEFAULT_THRESHOLD = 0.85  # 仅凭文本判定为重复的相似度阈值
+PHONE_THRESHOLD = 0.5    # 手机号相同时的相似度阈值
+NAME_THRESHOLD = 0.6     # 文件名姓名相同时的相似度阈值
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20250410)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+
+_PHONE_RE = re.compile(r'(?<!\d)(1[3-9]\d{9})(?!\d)')
+# 解析阶段插入的标记行，不属于简历本身
+_MARKER_RE = re.compile(r'\[PDF[^\]]*\]|\[图片OCR内容\]|\[图片\d+\]|---\s*第\d+页[^-]*---|【文档元数据】|【正文提取】')
+_NOISE_RE = re.compile(r'[^\u4e00-\u9fa5a-z0-9]')
+_FILENAME_NAME_RE = re.compile(r'[\u4e00-\u9fa5]{2,4}')
+_FILENAME_STOPWORDS = {'简历', '个人简历', '高中', '初中', '小学', '教师', '应聘', '求职'}
+
+
+def normalize_text(text: str) -> str:
+    """全角转半角、去掉解析标记、空白与标点，只保留汉字/字母/数字"""
+    text = _MARKER_RE.sub('', unicodedata.normalize('NFKC', text or ''))
+    return _NOISE_RE.sub('', text.lower())
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """对归一化文本计算 MinHash 签名；文本过短时返回 None"""
+    norm = normalize_text(text)
+    if len(norm) < SHINGLE_SIZE * 4:
+        return None
+    shingles = {norm[i:i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a * h + b) mod p，a、b < 2^31，h < 2^32，乘积不会溢出 uint64
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.mean(sig_a == sig_b))
+
+
+def extract_phones(text: str) -> set:
+    return set(_PHONE_RE.findall(unicodedata.normalize('NFKC', text or '')))
+
+
+def filename_name_key(filename: str) -> str:
+    """文件名中的候选人姓名（取扩展名前第一个非通用词的 2-4 字中文片段）"""
+    stem = re.sub(r'\.(pdf|docx|doc)$', '', filename or '', flags=re.IGNORECASE)
+    stem = re.sub(r'(高中|初中|小学)', ' ', stem)
+    for token in _FILENAME_NAME_RE.findall(stem):
+        if token not in _FILENAME_STOPWORDS:
+            return token
+    return ''
+
+
+@dataclass
+class NearDupGroup:
+    """一组近似重复的简历：representative 送去大模型，members 复用其结果"""
+    representative: str
+    members: List[str] = field(default_factory=list)
+    similarity: float = 0.0
+    reason: str = ''
+
+
+def find_near_duplicates(parsed_results: List, threshold: float = DEFAULT_THRESHOLD) -> List[NearDupGroup]:
+    """
+    在一批 ParseResult 中查找近似重复组。
+    判定规则（满足其一即同组）：
+    - 文本 MinHash 相似度 >= threshold
+    - 手机号相同 且 相似度 >= PHONE_THRESHOLD
+    - 文件名姓名相同 且 相似度 >= NAME_THRESHOLD
+    """
+    n = len(parsed_results)
+    if n < 2:
+        return []
+
+    signatures = [minhash_signature(pr.content) for pr in parsed_results]
+    phones = [extract_phones(pr.content) for pr in parsed_results]
+    names = [filename_name_key(pr.filename) for pr in parsed_results]
+
+    # LSH 分桶：任一桶完全相同即成为候选对；手机号相同的也直接成为候选对
+    candidates = set()
+    rows = NUM_PERM // LSH_BANDS
+    buckets: Dict[tuple, List[int]] = {}
+    for idx, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        for band in range(LSH_BANDS):
+            key = (band, sig[band * rows:(band + 1) * rows].tobytes())
+            buckets.setdefault(key, []).append(idx)
+    phone_index: Dict[str, List[int]] = {}
+    for idx, ph in enumerate(phones):
+        for p in ph:
+            phone_index.setdefault(p, []).append(idx)
+    for members in list(buckets.values()) + list(phone_index.values()):
+        if len(members) < 2:
+            continue
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                candidates.add((members[i], members[j]))
+
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    pair_info = {}
+    for i, j in candidates:
+        if signatures[i] is None or signatures[j] is None:
+            continue
+        sim = estimate_similarity(signatures[i], signatures[j])
+        reason = ''
+        if sim >= threshold:
+            reason = '文本相似'
+        elif phones[i] & phones[j] and sim >= PHONE_THRESHOLD:
+            reason = '手机号相同'
+        elif names[i] and names[i] == names[j] and sim >= NAME_THRESHOLD:
+            reason = '姓名相同'
+        if reason:
+            parent[find(i)] = find(j)
+            pair_info[(i, j)] = (sim, reason)
+
+    grouped: Dict[int, List[int]] = {}
+    for idx in range(n):
+        grouped.setdefault(find(idx), []).append(idx)
+
+    groups = []
+    for members in grouped.values():
+        if len(members) < 2:
+            continue
+        # 文本最长的一份信息最全，作为代表
+        rep = max(members, key=lambda k: len(parsed_results[k].content))
+        infos = [v for (i, j), v in pair_info.items() if i in members and j in members]
+        reasons = sorted({r for _, r in infos})
+        groups.append(NearDupGroup(
+            representative=parsed_results[rep].filename,
+            members=[parsed_results[k].filename for k in members if k != rep],
+            similarity=min(s for s, _ in infos) if infos else 0.0,
+            reason='/'.join(reasons)
+        ))
+    return groups
+
+
+def fan_out_group_results(api_results: List[Dict], parsed_results: List, groups: List[NearDupGroup]) -> List[Dict]:
+    """把代表简历的大模型结果复制给组内其它文件（各自保留自己的文件名和解析文本）"""
+    if not groups:
+        return api_results
+    by_name = {r['filename']: r for r in api_results if r}
+    parsed_by_name = {pr.filename: pr for pr in parsed_results}
+
+    expanded = list(api_results)
+    for group in groups:
+        rep_result = by_name.get(group.representative)
+        if rep_result is None:
+            continue
+        for member in group.members:
+            pr = parsed_by_name.get(member)
+            if pr is None:
+                continue
+            copied = copy.deepcopy(rep_result)
+            copied['filename'] = member
+            copied['full_content'] = pr.content
+            copied['parsed_content'] = pr.content[:200] + "..." if len(pr.content) > 200 else pr.content
+            copied['pre_extracted'] = pre_extract(pr.content, member).to_dict()
+            copied['parse_time'] = pr.parse_time
+            copied['api_time'] = 0
+            copied['near_dup_of'] = group.representative
+            expanded.append(copied)
+    return expanded
@@ -0,0 +1,32 @@
+"""
+短简历合并请求：多份短简历装进同一次 API 请求，共用一份系统提示词和一次往返。
+
+按压缩后的 token 数做装箱（首次适应递减）：只有不超过 pack_item_tokens 的简历参与合并，
+每箱总 token 不超过 pack_budget_tokens、份数不超过 pack_max_items；只装进一份的箱子按单份请求处理。
+份数同时受输出预算限制：每份按分析方案的 max_tokens 预留输出，合计不超过接口上限（llm.MAX_OUTPUT_TOKENS）。
+"""
+from typing import List
+
+DEFAULT_PACK_MAX_ITEMS = 5        # 每次请求最多合并的简历份数
+DEFAULT_PACK_ITEM_TOKENS = 1200   # 参与合并的单份简历 token 上限（约 2000 个汉字）
+DEFAULT_PACK_BUDGET_TOKENS = 6000  # 合并请求的简历正文 token 总上限
+
+
+def pack_bins(sizes: List[int], capacity: int, max_items: int) -> List[List[int]]:
+    """
+    首次适应递减装箱：返回下标分组，每组 size 之和不超过 capacity、份数不超过 max_items。
+    单个 size 超过 capacity 的也会单独成组。
+    """
+    bins: List[List[int]] = []
+    loads: List[int] = []
+    for idx in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+        for b, load in enumerate(loads):
+            if len(bins[b]) < max_items and load + sizes[idx] <= capacity:
+                bins[b].append(idx)
+                loads[b] += sizes[idx]
+                break
+        else:
+            bins.append([idx])
+            loads.append(sizes[idx])
+    # 组内按原顺序排列，结果与输入顺序对应
+    return [sorted(b) for b in bins]
@@ -0,0 +1,462 @@
+"""
+简历批处理流程：解析 -> 近似重复合并 -> 大模型提取 -> 评分。
+本模块不依赖 Streamlit，页面（后台任务）、命令行、基准脚本共用同一套流程：
+配置通过 PipelineConfig 显式传入，进度、日志、逐行结果通过 PipelineCallbacks 回调汇报，
+因此可以在任意线程 / 进程 / 事件循环中运行。
+"""
+import time
+import asyncio
+import threading
+from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Dict, Tuple
+
+from resume_core.cancel import POLL_INTERVAL, REASON_LABELS, CancelToken, use_token
+from resume_core.cascade import cascade_stats, format_cascade_stats, total_cost
+from resume_core.hedge import latency_report, format_latency_report
+from resume_core.config import PipelineConfig
+from resume_core.extract import ParseResult, parse_single_file
+from resume_core.jobs import Job
+from resume_core.journal import JobJournal, new_job_id, STAGE_PARSED, STAGE_PARSE_FAILED, STAGE_EXTRACTED, STAGE_SCORED
+from resume_core.llm import process_batch_async_fast
+from resume_core.neardup import find_near_duplicates, fan_out_group_results
+from resume_core.profiles import get_profile
+from resume_core.schedule import order_by_parse_cost
+from resume_core.sandbox import SandboxPool
+from resume_core.spool import item_size
+from resume_core.store import CandidateStore, STATUS_UNFINISHED, file_key
+from resume_core.fulltext import FullTextIndex, FTS5_SUPPORT
+
+# 页面 session_state 中保存的默认配置（字典形式，便于控件直接读写）
+DEFAULT_CONFIG = PipelineConfig().to_dict()
+
+
+def _ignore(*args):
+    pass
+
+
+@dataclass
+class PipelineCallbacks:
+    """
+    流程回调，均可省略：log(消息)、progress(阶段, 当前, 总数)、row(结果行)、should_stop() -> 是否停止、
+    live(文件名, 字段) 流式提取中已解析出的字段，该份完成时字段为 None
+    """
+    log: Callable[[str], None] = _ignore
+    progress: Callable[[str, int, int], None] = _ignore
+    row: Callable[[Dict], None] = _ignore
+    should_stop: Callable[[], bool] = lambda: False
+    live: Callable[[str, Dict], None] = _ignore
+
+    @classmethod
+    def for_job(cls, job: Job) -> 'PipelineCallbacks':
+        """后台任务：回调转发到 job 的进度、日志和部分结果"""
+        return cls(log=job.log, progress=job.set_progress, row=job.add_partial, should_stop=lambda: job.cancelled,
+                   live=job.set_live)
+
+
+# ============================
+# 批量文件解析 - 高效并发
+# ============================
+def _parse_with_token(token: CancelToken, item: Dict, use_ocr: bool, api_key: str, enable_cache: bool) -> ParseResult:
+    """线程池 worker：绑定批次令牌后解析，令牌取消时 OCR 请求立即中止"""
+    with use_token(token):
+        return parse_single_file(item, use_ocr, api_key, enable_cache)
+
+
+def parse_files_batch(uploaded_items: List[Dict], progress_callback=None, use_ocr: bool = True, api_key: str = None,
+                      on_result=None, config: PipelineConfig = None, log=None, token: CancelToken = None) -> Tuple[List[ParseResult], List[Dict]]:
+    """
+    批量文件解析，默认使用线程池并发处理；开启隔离模式时改用子进程池（可强制超时终止）
+    on_result: 每个文件解析结束（成功或失败）后以 ParseResult 回调，用于写任务日志
+    log: 逐文件进度信息回调，默认忽略
+    token: 批次取消令牌，取消后不再解析剩余文件、中止进行中的 OCR 请求（隔离模式下 kill 子进程），
+           中止的文件不回调 on_result，继续任务时重新解析
+    开启 config.shortest_first 时按预估解析耗时从短到长提交（见 resume_core.schedule），扫描件排在最后
+    """
+    parsed_data = []
+    failed_files = []
+    config = PipelineConfig.from_dict(config)
+    log = log or _ignore
+    max_workers = config.max_workers
+    
+    def failed_record(item: Dict, error: str, size: int, content: str = '') -> Dict:
+        # 附带暂存区句柄和原始文件名，页面可据此打包下载解析失败的文件
+        return {
+            'name': item.get('name', 'unknown'),
+            'error': error,
+            'size': size,
+            'content': content,
+            'blob': item.get('blob'),
+            'original_name': item.get('original_name', item.get('name', 'unknown')),
+        }
+    
+    def record(item: Dict, result: ParseResult):
+        if on_result:
+            on_result(result)
+        if result.error:
+            failed_files.append(failed_record(item, result.error, result.file_size, result.content))
+            log(f"❌ 解析失败: {result.filename} - {result.error}")
+        else:
+            parsed_data.append(result)
+            log(f"✓ 解析成功: {result.filename} ({len(result.content)} 字符)")
+    
+    if config.shortest_first and len(uploaded_items) > 1:
+        # 只按元数据（扩展名、字节数、是否命中缓存）预估，不在父进程里打开文件
+        uploaded_items, costs = order_by_parse_cost(uploaded_items, use_ocr, api_key, config.enable_cache, token)
+        log(f"🧮 按预估耗时排序（短的先解析）: 命中缓存 {sum(c.cached for c in costs)} 个，"
+            f"最长预估 {max((c.cost for c in costs), default=0):.0f}s")
+    
+    if config.isolated_parse:
+        pool = SandboxPool(
+            max_workers=max_workers,
+            timeout=config.parse_timeout,
+            memory_limit_mb=config.parse_memory_mb
+        )
+        log(f"🛡️ 启动隔离解析: {len(uploaded_items)} 个文件, {pool.max_workers} 个子进程, 单文件超时 {pool.timeout}s")
+        
+        for i, (item, result) in enumerate(pool.imap_unordered(uploaded_items, use_ocr, api_key, config.enable_cache,
+                                                               token)):
+            if token is not None and token.cancelled:
+                break
+            record(item, result)
+            if progress_callback:
+                progress_callback(i + 1, len(uploaded_items))
+        if token is not None and token.cancelled:
+            log(f"⏹️ 解析中止（{REASON_LABELS[token.reason]}）")
+        
+        if pool.stats['timeouts'] or pool.stats['crashes']:
+            log(f"⏱️ 隔离解析: 超时终止 {pool.stats['timeouts']} 个, 进程崩溃 {pool.stats['crashes']} 个")
+        log(f"📊 解析完成: 成功 {len(parsed_data)}, 失败 {len(failed_files)}")
+        return parsed_data, failed_files
+    
+    log(f"🔧 启动解析: {len(uploaded_items)} 个文件, {max_workers} 个并发 worker")
+    
+    token = token or CancelToken()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    future_to_item = {
+        executor.submit(_parse_with_token, token, item, use_ocr, api_key, config.enable_cache): item 
+        for item in uploaded_items
+    }
+    pending = set(future_to_item)
+    finished = 0
+    try:
+        # 按间隔轮询令牌，所有线程都卡在 OCR 上时也能及时停止
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if token.cancelled:
+                log(f"⏹️ 解析中止（{REASON_LABELS[token.reason]}），{len(done) + len(pending)} 个文件未完成")
+                break
+            for future in done:
+                item = future_to_item[future]
+                try:
+                    record(item, future.result())
+                except Exception as e:
+                    if on_result:
+                        on_result(ParseResult(filename=item.get('name', 'unknown'), content='', error=str(e), file_size=item_size(item)))
+                    failed_files.append(failed_record(item, str(e), item_size(item)))
+                    log(f"❌ 解析异常: {item.get('name', 'unknown')} - {str(e)}")
+                
+                finished += 1
+                if progress_callback:
+                    progress_callback(finished, len(uploaded_items))
+    finally:
+        # 未开始的文件直接丢弃；进行中的线程随令牌中止 OCR 后自行退出，不在这里等待
+        executor.shutdown(wait=not token.cancelled, cancel_futures=token.cancelled)
+    
+    log(f"📊 解析完成: 成功 {len(parsed_data)}, 失败 {len(failed_files)}")
+    return parsed_data, failed_files
+
+# ============================
+# 完整流程
+# ============================
+def _index_texts(path: str, docs: List[Tuple[str, str, str]], log: Callable[[str], None]):
+    start = time.time()
+    try:
+        indexed = FullTextIndex(path).add_documents(docs)
+        if indexed:
+            log(f"🔎 全文索引已更新: {indexed} 份，耗时{time.time() - start:.1f}s")
+    except Exception as e:
+        log(f"⚠️ 全文索引更新失败: {str(e)}")
+
+
+def run_pipeline(uploaded_items: List[Dict], api_key: str, config: PipelineConfig = None,
+                 callbacks: PipelineCallbacks = None, journal: JobJournal = None) -> Dict:
+    """
+    处理所有文件的完整流程 - 极速版，与运行环境无关（页面后台任务、命令行、基准脚本共用）
+    进度、日志、逐行结果通过 callbacks 汇报。callbacks.should_stop 和 config.batch_deadline 合成批次取消令牌，
+    传到解析线程、OCR 请求和大模型请求：解析阶段停止时不再调用大模型，AI 分析阶段停止时进行中的请求立即中止；
+    两种情况下已完成的简历（含从任务日志恢复的）照常评分返回，解析失败的和未完成的文件各占一行。
+    停止时置 results['cancelled']，results['cancel_reason'] 为 cancelled / deadline。
+    传入 journal 时每个文件的每个阶段完成后都写入任务日志；日志中已有的阶段结果直接复用，
+    中断的任务用同一个 journal 再提交一次即可从断点继续
+    """
+    config = PipelineConfig.from_dict(config)
+    cb = callbacks or PipelineCallbacks()
+    profile = get_profile(config.profile)
+    debug_mode, target_city = config.debug_mode, config.target_city
+    total_files = len(uploaded_items)
+    results = {
+        'parsed_results': [],
+        'failed_parse': [],
+        'api_results': [],
+        'final_results': [],
+        'need_review': [],
+        'parse_time': 0,
+        'ai_time': 0,
+        'saved_api_calls': 0,
+        'input_tokens': 0,
+        'tokens_saved': 0,
+        'api_requests': 0,
+        'cancelled': False,
+        'cancel_reason': '',
+    }
+    token = CancelToken(config.batch_deadline, cb.should_stop)
+    
+    def stopped() -> bool:
+        results['cancelled'] = token.cancelled
+        results['cancel_reason'] = token.reason
+        return results['cancelled']
+    
+    # 队列阶段已按内容哈希合并的重复文件：{代表文件名: [重复文件名...]}
+    duplicates = {item['name']: item['duplicate_names'] for item in uploaded_items if item.get('duplicate_names')}
+    results['saved_api_calls'] = sum(len(names) for names in duplicates.values())
+    items_by_name = {item['name']: item for item in uploaded_items}
+    
+    # 从任务日志恢复已完成的阶段
+    checkpoint = journal.replay() if journal else {}
+    done_parsed = checkpoint.get(STAGE_PARSED, {})
+    done_failed = checkpoint.get(STAGE_PARSE_FAILED, {})
+    # 提示词版本变了的提取结果作废重做（更早的日志没有记录版本，照常复用）
+    done_extracted = {name: r for name, r in checkpoint.get(STAGE_EXTRACTED, {}).items()
+                      if r.get('prompt_key', profile.prompt_key) == profile.prompt_key}
+    stale_extracted = len(checkpoint.get(STAGE_EXTRACTED, {})) - len(done_extracted)
+    
+    def emit_rows(api_results: List[Dict]):
+        rows, _ = profile.build_results([dict(r) for r in api_results], debug_mode, target_city)
+        for row in rows:
+            cb.row(row)
+    
+    def on_parsed(result: ParseResult):
+        if journal:
+            journal.append(STAGE_PARSE_FAILED if result.error else STAGE_PARSED, result.filename, result)
+    
+    def on_extracted(result: Dict):
+        # 调用失败的不记录，恢复时重新请求
+        if journal and 'error' not in result.get('api_result', {}):
+            journal.append(STAGE_EXTRACTED, result['filename'], result)
+        if result.get('tokens_saved'):
+            dropped = f"，删除: {'/'.join(result['dropped_sections'])}" if result.get('dropped_sections') else ""
+            cb.log(f"✂️ 文本压缩: {result['filename']} {result['input_tokens'] + result['tokens_saved']} → "
+                   f"{result['input_tokens']} tokens{dropped}")
+        emit_rows([result])
+    
+    def unfinished_rows(stage: str, names: List[str], finished: set) -> List[Dict]:
+        """停止时还没完成 stage 的文件，每个一行，不评分、不写入候选人库"""
+        return [{'文件名': name, '处理状态': STATUS_UNFINISHED, '错误信息': f"{stage}未完成（{REASON_LABELS[token.reason]}）"}
+                for name in names if name not in finished]
+    
+    def build_report(api_results: List[Dict], near_dup_groups: List, unfinished: List[Dict]) -> Dict:
+        # 阶段3: 结果处理
+        cb.progress('📊 生成报告', 0, 1)
+        final_results, need_review = profile.build_results(api_results, debug_mode, target_city)
+        # 将解析失败的文件也纳入最终结果，确保用户能看到
+        for fail in failed_parse:
+            fail_row = {
+                '文件名': fail['name'],
+                '处理状态': '失败',
+                '错误信息': fail['error'],
+            }
+            if debug_mode:
+                fail_row['_debug_extracted_text'] = fail.get('content', '')
+            final_results.append(fail_row)
+        final_results.extend(unfinished)
+        # 重复文件名挂到同一行结果上
+        near_dup_labels = {}
+        for g in near_dup_groups:
+            near_dup_labels[g.representative] = f"代表 ({len(g.members) + 1} 份)"
+            for m in g.members:
+                near_dup_labels[m] = f"同 {g.representative}"
+        for row in final_results:
+            if row['文件名'] in duplicates:
+                row['重复文件'] = ', '.join(duplicates[row['文件名']])
+            if row['文件名'] in near_dup_labels:
+                row['近似重复'] = near_dup_labels[row['文件名']]
+        results['final_results'] = final_results
+        results['need_review'] = need_review
+    
+        if journal:
+            for row in final_results:
+                if row['处理状态'] != STATUS_UNFINISHED:
+                    journal.append(STAGE_SCORED, row['文件名'], row)
+            # 停止的任务不标记完成，之后可从任务日志继续
+            if not results['cancelled']:
+                journal.mark_done()
+        if index_thread:
+            index_thread.join()
+        stored_rows = [row for row in final_results if row['处理状态'] != STATUS_UNFINISHED]
+        if config.candidate_store and stored_rows:
+            # 写入候选人库失败不影响本批结果
+            try:
+                stored = CandidateStore(config.candidate_store).upsert_results(
+                    stored_rows, uploaded_items, journal.job_id if journal else new_job_id(), profile.name, target_city,
+                    {'prompt_key': profile.prompt_key, 'model': config.model or profile.model, 'config': config.to_dict()}
+                )
+                cb.log(f"🗄️ 已写入候选人库: {stored} 条")
+            except Exception as e:
+                cb.log(f"⚠️ 写入候选人库失败: {str(e)}")
+        cb.progress('📊 生成报告', 1, 1)
+    
+        total_time = time.time() - overall_start
+        if results['cancelled']:
+            cb.log(f"⏹️ {REASON_LABELS[token.reason]}，总耗时 {total_time:.1f}s | 返回已完成的 {len(stored_rows)} 份结果，"
+                   f"未完成 {len(unfinished)} 份")
+            return results
+        cb.log(f"🎉 全部完成！总耗时 {total_time:.1f}s | 成功: {len([r for r in final_results if r['处理状态'] != '失败'])}, 需复核: {len(need_review)}")
+        if results['saved_api_calls']:
+            cb.log(f"♻️ 重复简历已合并: {results['saved_api_calls']} 份，节省 API 调用 {results['saved_api_calls']} 次")
+        return results
+    
+    overall_start = time.time()
+    cb.log(f"📁 开始处理 {total_files} 个文件...")
+    
+    index_thread = None
+    
+    # 阶段1: 文件解析
+    pending_items = [item for item in uploaded_items
+                     if item['name'] not in done_parsed and item['name'] not in done_failed]
+    restored_parsed = [ParseResult(**done_parsed[item['name']]) for item in uploaded_items if item['name'] in done_parsed]
+    restored_failed = []
+    for name, d in done_failed.items():
+        item = items_by_name.get(name, {})
+        restored_failed.append({'name': name, 'error': d.get('error'), 'size': d.get('file_size', 0), 'content': d.get('content', ''),
+                                'blob': item.get('blob'), 'original_name': item.get('original_name', name)})
+    if restored_parsed or restored_failed:
+        cb.log(f"♻️ 从任务日志恢复解析结果 {len(restored_parsed) + len(restored_failed)} 个，剩余 {len(pending_items)} 个待解析")
+    
+    cb.progress('📖 解析', 0, len(pending_items))
+    start_time = time.time()
+    parsed_results, failed_parse = [], []
+    if pending_items:
+        parsed_results, failed_parse = parse_files_batch(
+            pending_items, 
+            lambda current, total: cb.progress('📖 解析', current, total),
+            config.use_ocr,
+            api_key,  # 传递api_key用于DeepSeek OCR
+            on_result=on_parsed,
+            config=config,
+            log=cb.log,
+            token=token
+        )
+    parsed_results = restored_parsed + parsed_results
+    failed_parse = restored_failed + failed_parse
+    results['parse_time'] = time.time() - start_time
+    results['parsed_results'] = parsed_results
+    results['failed_parse'] = failed_parse
+    if stopped():
+        # 解析阶段停止：不再调用大模型，已解析且任务日志里有提取结果的照常评分，其余的列为未完成
+        restored_api = [done_extracted[pr.filename] for pr in parsed_results if pr.filename in done_extracted]
+        cb.log(f"⏹️ 解析中止（{REASON_LABELS[token.reason]}）: 已解析 {len(parsed_results)} 份，"
+               f"失败 {len(failed_parse)} 份，共 {total_files} 份")
+        parsed_names = [pr.filename for pr in parsed_results]
+        unfinished = (unfinished_rows('解析', [item['name'] for item in pending_items],
+                                      set(parsed_names) | {fail['name'] for fail in failed_parse})
+                      + unfinished_rows('AI分析', parsed_names, {r['filename'] for r in restored_api}))
+        return build_report(restored_api, [], unfinished)
+    
+    if not parsed_results:
+        cb.log("❌ 没有成功解析的文件")
+        return results
+    
+    cb.log(f"✅ 解析完成: {len(parsed_results)} 成功, 耗时{results['parse_time']:.1f}s")
+    
+    # 全文索引在后台线程建立（分词较慢），与大模型调用重叠，结束前等待完成
+    if config.candidate_store and config.fulltext_index and FTS5_SUPPORT:
+        docs = [((items_by_name.get(pr.filename) or {}).get('sha256') or file_key(pr.filename), pr.filename, pr.content)
+                for pr in parsed_results]
+        index_thread = threading.Thread(target=_index_texts, args=(config.candidate_store, docs, cb.log),
+                                        name="fulltext-index", daemon=True)
+        index_thread.start()
+    
+    # 阶段1.5: 近似重复检测（同一简历的 PDF/DOCX 版本、微调后重投），每组只送代表去 AI 分析
+    llm_inputs = parsed_results
+    near_dup_groups = []
+    if config.near_dup_detect:
+        near_dup_groups = find_near_duplicates(parsed_results, config.near_dup_threshold)
+        if near_dup_groups:
+            grouped_members = {m for g in near_dup_groups for m in g.members}
+            llm_inputs = [pr for pr in parsed_results if pr.filename not in grouped_members]
+            results['saved_api_calls'] += len(grouped_members)
+            cb.log(f"🔁 发现 {len(near_dup_groups)} 组近似重复简历，{len(grouped_members)} 份将复用代表简历的分析结果")
+    results['near_dup_groups'] = near_dup_groups
+    
+    # 阶段2: AI分析（真正并发版），日志中已提取过的简历不再调用
+    restored_api = [done_extracted[pr.filename] for pr in llm_inputs if pr.filename in done_extracted]
+    pending_inputs = [pr for pr in llm_inputs if pr.filename not in done_extracted]
+    if stale_extracted:
+        cb.log(f"🔄 提示词已更新（{profile.prompt_key}），{stale_extracted} 份旧的 AI 分析结果将重新提取")
+    if restored_api:
+        cb.log(f"♻️ 从任务日志恢复 AI 分析结果 {len(restored_api)} 份，剩余 {len(pending_inputs)} 份待分析")
+        emit_rows(restored_api)
+    
+    cb.log(f"🤖 AI分析中 ({len(pending_inputs)} 份简历，{profile.title}，真{config.max_concurrent_api}并发)...")
+    cb.progress('🤖 AI分析', 0, len(pending_inputs))
+    start_time = time.time()
+    api_results = []
+    if pending_inputs:
+        # 后台线程没有事件循环，每次运行使用独立的循环
+        loop = asyncio.new_event_loop()
+        try:
+            api_results = loop.run_until_complete(
+                process_batch_async_fast(pending_inputs, api_key,
+                                         lambda current, total: cb.progress('🤖 AI分析', current, total),
+                                         on_result=on_extracted, config=config,
+                                         token=token, profile=profile, on_partial=cb.live)
+            )
+        finally:
+            loop.close()
+    results['ai_time'] = time.time() - start_time
+    results['input_tokens'] = sum(r.get('input_tokens', 0) for r in api_results)
+    results['tokens_saved'] = sum(r.get('tokens_saved', 0) for r in api_results)
+    pack_ids = {r['pack_id'] for r in api_results if r.get('pack_id') is not None}
+    pack_fallbacks = sum(1 for r in api_results if r.get('pack_fallback'))
+    results['stall_retries'] = sum(r.get('stall_retries', 0) for r in api_results)
+    # 请求耗时分位数，开启对冲时另给出只看原请求的耗时（不对冲时的下限）
+    results['latency'] = latency_report(api_results)
+    # 实际请求数：单份请求（分级提取时每层各算一次）+ 合并请求 + 合并失败后的回退请求 + 对冲请求
+    results['api_requests'] = len(pack_ids) + sum(len(r.get('attempts') or [None]) for r in api_results
+                                                  if r.get('pack_id') is None or r.get('pack_fallback'))
+    results['api_requests'] += results['latency']['hedged']
+    # 各层模型的请求数、采用率、耗时、token 用量和费用（未开启分级提取时只有大模型一层）
+    results['model_tiers'] = cascade_stats(api_results)
+    results['model_cost'] = total_cost(results['model_tiers'])
+    new_api_count = len(api_results)
+    api_results = fan_out_group_results(restored_api + api_results, parsed_results, near_dup_groups)
+    results['api_results'] = api_results
+    # 全部完成后才到截止时间的不算中止
+    if new_api_count < len(pending_inputs) and stopped():
+        cb.log(f"⏹️ AI分析中止（{REASON_LABELS[token.reason]}）: 完成 {new_api_count} / {len(pending_inputs)} 份，"
+               f"进行中的请求已取消，已完成的部分照常生成结果")
+    else:
+        avg_api_time = sum(r.get('api_time', 0) for r in api_results[len(restored_api):] if r) / new_api_count if new_api_count else 0
+        cb.log(f"✅ AI分析完成: {len(api_results)} 个, 总耗时{results['ai_time']:.1f}s, 平均每个{avg_api_time:.1f}s")
+    if results['stall_retries']:
+        cb.log(f"🐢 流式响应停滞后中止重试 {results['stall_retries']} 次")
+    for line in format_cascade_stats(results['model_tiers']) + format_latency_report(results['latency']):
+        cb.log(line)
+    if pack_ids:
+        cb.log(f"📦 合并请求: {len(api_results)} 份简历共 {results['api_requests']} 次请求"
+               f"（{len(pack_ids)} 次合并请求，回退单份 {pack_fallbacks} 份）")
+    if results['tokens_saved']:
+        cb.log(f"✂️ 文本压缩: 输入 {results['input_tokens']} tokens，节省 {results['tokens_saved']} tokens"
+               f"（{results['tokens_saved'] / (results['input_tokens'] + results['tokens_saved']):.0%}）")
+    
+    return build_report(api_results, near_dup_groups,
+                        unfinished_rows('AI分析', [pr.filename for pr in parsed_results],
+                                        {r['filename'] for r in api_results if r}) if results['cancelled'] else [])
+
+
+def run_resume_job(job: Job, uploaded_items: List[Dict], api_key: str, config: Dict = None,
+                   journal: JobJournal = None) -> Dict:
+    """后台任务入口（JobManager.submit 调用）：进度、日志、部分结果转发到 job；停止时同样返回已完成的部分"""
+    return run_pipeline(uploaded_items, api_key, PipelineConfig.from_dict(config),
+                        PipelineCallbacks.for_job(job), journal)
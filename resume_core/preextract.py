@@ -0,0 +1,174 @@
+"""
+本地预提取：在调用大模型之前用正则和院校名单直接取出格式固定的字段。
+
+- 手机号、邮箱、姓名、性别、出生年份：预编译正则
+- 本科/硕士学校、层次、毕业年份：逐行找名单内校名（resume_core.schools），按同一行的学历字样归类
+- 文件名中的姓名、学科、手机号：作为正文缺失时的备用
+
+这些字段结果确定、不需要推理，提示词中不再要求大模型提取手机号。合并结果时手机号、年龄、
+名单内院校的层次以本地值为准；姓名、性别、学科、学校名称以大模型为准，大模型没给出时用本地值。
+提示词仍要求大模型给出学校层次：名单只覆盖 C9 / 985 / 211 / 双一流 / 重点师范，
+名单外院校（海外名校、普通一本、二本、专科）的层次只能靠大模型判断。
+"""
+import re
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from resume_core.schools import find_schools
+
+_PHONE_RE = re.compile(r'(?<!\d)(?:\+?86[-\s]?)?(1[3-9]\d)[-\s]?(\d{4})[-\s]?(\d{4})(?!\d)')
+_FILENAME_PHONE_RE = re.compile(r'1[3-9]\d{9}')
+_EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}')
+_NAME_RE = re.compile(r'姓\s*名\s*[:：]?\s*([一-龥·]{2,5}?)(?=性别|年龄|出生|民族|籍贯|电话|手机|联系|[^一-龥·]|$)')
+_GENDER_RE = re.compile(r'性\s*别\s*[:：]?\s*([男女])')
+_BIRTH_RES = [
+    re.compile(r'出\s*生\s*(?:年\s*月|日\s*期|年\s*份)?\s*[:：]?\s*((?:19|20)\d{2})'),
+    re.compile(r'((?:19|20)\d{2})\s*(?:年\s*\d{1,2}\s*月|[.\-/]\s*\d{1,2})(?:\s*(?:[.\-/]\s*)?\d{1,2}\s*日?)?\s*(?:出\s*生|生(?![物态活源产命理涯]))'),
+]
+_AGE_RE = re.compile(r'年\s*龄\s*[:：]?\s*(\d{2})\s*岁?')
+_YEAR_RE = re.compile(r'(?<!\d)((?:19|20)\d{2})(?!\d)')
+_EXT_RE = re.compile(r'\.(pdf|docx|doc)$', re.IGNORECASE)
+_STAGE_PREFIX_RE = re.compile(r'^(高中|初中|小学)')
+# 文件名格式：学科-姓名、姓名-学科、只有姓名（如'高中数学-张三-13812345678.pdf'）
+_FILENAME_SUBJECT_NAME_RE = re.compile(r'(?:高中|初中|小学)?([一-龥]{2,})[-_\s]+([一-龥]{2,4})')
+_FILENAME_NAME_SUBJECT_RE = re.compile(r'([一-龥]{2,4})[-_\s]+(?:高中|初中|小学)?([一-龥]{2,})')
+_FILENAME_NAME_RE = re.compile(r'([一-龥]{2,4})')
+
+# 学历字样，按从高到低检查（"博士后"也归为博士，不会被当成本科）
+_DEGREE_KEYWORDS = [
+    ('博士', re.compile(r'博士|ph\.?d', re.IGNORECASE)),
+    ('硕士', re.compile(r'硕士|研究生|master', re.IGNORECASE)),
+    ('本科', re.compile(r'本科|学士|bachelor', re.IGNORECASE)),
+]
+MIN_AGE = 16
+
+
+def strip_stage(subject: str) -> str:
+    """学科名称去掉"高中"、"初中"、"小学"前缀"""
+    return _STAGE_PREFIX_RE.sub('', subject or '').strip()
+
+
+def parse_filename(filename: str) -> Tuple[str, str, str]:
+    """从文件名提取 (姓名, 学科, 手机号)，如'高中数学-张三-13812345678.pdf' -> (张三, 数学, 13812345678)"""
+    name_part = _EXT_RE.sub('', filename or '')
+    phone_match = _FILENAME_PHONE_RE.search(name_part)
+    phone = phone_match.group() if phone_match else ""
+    name_part = _FILENAME_PHONE_RE.sub('', name_part)
+    match = _FILENAME_SUBJECT_NAME_RE.search(name_part)
+    if match:
+        subject, name = match.groups()
+        return name, strip_stage(subject), phone
+    match = _FILENAME_NAME_SUBJECT_RE.search(name_part)
+    if match:
+        name, subject = match.groups()
+        return name, strip_stage(subject), phone
+    match = _FILENAME_NAME_RE.search(name_part)
+    if match:
+        return match.group(1), "", phone
+    return "", "", phone
+
+
+def find_phone(text: str) -> str:
+    """正文中第一个手机号，去掉 +86 和分隔符"""
+    match = _PHONE_RE.search(text or '')
+    return ''.join(match.groups()) if match else ""
+
+
+def find_email(text: str) -> str:
+    match = _EMAIL_RE.search(text or '')
+    return match.group() if match else ""
+
+
+def find_birth_year(text: str, current_year: int) -> Optional[int]:
+    for pattern in _BIRTH_RES:
+        for match in pattern.finditer(text or ''):
+            year = int(match.group(1))
+            if 1940 <= year <= current_year - MIN_AGE:
+                return year
+    return None
+
+
+def _degree(line: str) -> str:
+    for degree, pattern in _DEGREE_KEYWORDS:
+        if pattern.search(line):
+            return degree
+    return ''
+
+
+@dataclass
+class PreExtracted:
+    """本地预提取的字段，找不到的为空字符串 / None"""
+    name: str = ''
+    phone: str = ''
+    email: str = ''
+    gender: str = ''
+    birth_year: Optional[int] = None
+    age: Optional[int] = None              # 有出生年份时按当前年份计算，否则取正文中写明的年龄
+    subject: str = ''                      # 仅来自文件名，正文中的任教学科交给大模型判断
+    bachelor_school: str = ''
+    bachelor_tier: str = ''
+    bachelor_year: Optional[int] = None    # 毕业年份
+    master_school: str = ''
+    master_tier: str = ''
+    master_year: Optional[int] = None
+    schools: List[str] = field(default_factory=list)   # 正文中出现的全部名单内院校（按出现顺序去重）
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PreExtracted':
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in known})
+
+
+def _education(text: str, result: PreExtracted):
+    """逐行找名单内校名：同一行（或紧接的下一行）写了学历的按学历归类，毕业年份取该行最大的年份"""
+    lines = text.splitlines()
+    unlabeled = []
+    for i, line in enumerate(lines):
+        matches = find_schools(line)
+        if not matches:
+            continue
+        for m in matches:
+            if m.name not in result.schools:
+                result.schools.append(m.name)
+        degree = _degree(line)
+        if not degree and i + 1 < len(lines) and not find_schools(lines[i + 1]):
+            degree = _degree(lines[i + 1])
+        years = [int(y) for y in _YEAR_RE.findall(line)]
+        entry = (matches[0].name, matches[0].tier, max(years) if years else None)
+        if degree == '本科' and not result.bachelor_school:
+            result.bachelor_school, result.bachelor_tier, result.bachelor_year = entry
+        elif degree == '硕士' and not result.master_school:
+            result.master_school, result.master_tier, result.master_year = entry
+        elif not degree:
+            unlabeled.append(entry)
+    # 没有学历字样、全文只出现一所名单内院校时，视为本科学校（教师简历最常见的情况）
+    if not result.bachelor_school and not result.master_school and len(result.schools) == 1 and unlabeled:
+        result.bachelor_school, result.bachelor_tier, result.bachelor_year = unlabeled[0]
+
+
+def pre_extract(text: str, filename: str = '', current_year: int = None) -> PreExtracted:
+    """正文和文件名中格式固定的字段；正文优先，文件名作备用"""
+    text = text or ''
+    current_year = current_year or datetime.now().year
+    name_from_file, subject_from_file, phone_from_file = parse_filename(filename)
+    result = PreExtracted(subject=subject_from_file)
+
+    match = _NAME_RE.search(text)
+    result.name = match.group(1) if match else name_from_file
+    result.phone = find_phone(text) or phone_from_file
+    result.email = find_email(text)
+    match = _GENDER_RE.search(text)
+    result.gender = match.group(1) if match else ''
+    result.birth_year = find_birth_year(text, current_year)
+    if result.birth_year:
+        result.age = current_year - result.birth_year
+    else:
+        match = _AGE_RE.search(text)
+        if match and MIN_AGE <= int(match.group(1)) <= 80:
+            result.age = int(match.group(1))
+    _education(text, result)
+    return result
@@ -0,0 +1,313 @@
+"""
+0319 分析方案：基于 2025-03-19 版评分规则（通用化，移除地域限定）的提示词、JSON Schema 与评分。
+原为 resume_optimized.py 页面内置逻辑，移入核心库后两个页面共用同一条处理流程。
+"""
+from typing import List, Dict, Tuple
+
+from resume_core.schools import SchoolResolver
+
+MODEL = "Pro/deepseek-ai/DeepSeek-V3.2"
+MAX_INPUT_CHARS = 12000  # 截断长文本
+
+# ============================
+# JSON Schema - 简历结构化标准
+# ============================
+JSON_SCHEMA = """
+{
+    "basic_info": {
+        "name": "姓名",
+        "gender": "性别(男/女)",
+        "age": "年龄(数字)",
+        "phone": "电话",
+        "subject": "任教学科",
+        "marital_status": "婚姻状况(未婚/已婚/离异)",
+        "residence": "现居地",
+        "partner_location": "配偶/伴侣所在地",
+        "parents_background": "父母职业背景"
+    },
+    "education": {
+        "high_school": "高中学校",
+        "high_school_tier": "高中层次(如省重点/市重点)",
+        "bachelor_school": "本科学校",
+        "bachelor_tier": "本科层次(如C9/985/211/双一流/普通一本/海外名校)",
+        "bachelor_major": "本科专业",
+        "master_school": "硕士学校",
+        "master_tier": "硕士层次(如C9/985/211/双一流/普通一本/海外名校)",
+        "master_major": "硕士专业",
+        "study_abroad_years": "留学年限(年)",
+        "exchange_experience": "是否有交换经历(是/否)"
+    },
+    "work_experience": {
+        "current_company": "现工作单位",
+        "school_tier": "学校层次(如市重点/国际学校/知名学校等)",
+        "non_teaching_gap": "非教学空窗期(年)",
+        "gap_explanation_valid": "空窗期解释是否合理(是/否/待定)",
+        "overseas_work_years": "海外工作年限(年)",
+        "management_role": "管理职务(如年级组长/教研组长/中层/主任/副校长等)",
+        "head_teacher_years": "班主任年限(年)",
+        "teaching_years": "教龄(年)"
+    },
+    "achievements": {
+        "honor_titles": ["荣誉称号列表，如特级教师/学科带头人/骨干教师/优青等"],
+        "teaching_competition": ["教学竞赛获奖列表"],
+        "academic_results": ["学术成果列表，如论文/课题等"]
+    },
+    "ai_assessment": {
+        "summary": "综合评语",
+        "teaching_philosophy": "教学理念",
+        "resume_quality_score": "简历质量评分(1-5分)",
+        "career_trajectory": "职业发展轨迹(上升/平稳/波动)",
+        "potential_score": "AI潜力评分(1-5分)",
+        "risk_warning": "风险提示(如有)"
+    }
+}
+"""
+
+
+# 提示词版本：固定指令块有任何改动都要升级
+PROMPT_VERSION = "0319.2"
+
+# 逐字节固定的系统提示词，目标城市放在用户消息的【上下文】里，保证请求前缀一致可命中服务端缓存
+SYSTEM_PROMPT = f"""你是一个专业的HR简历分析助手。请从简历文本中提取结构化信息。
+用户消息开头的【上下文】给出目标城市（可能为空）。
+
+要求：
+1. 严格按照JSON Schema提取字段
+2. 学校层次识别：C9 > 985/海外名校 > 211/双一流 > 重点师范/普通一本
+3. 评分使用1-5分制
+4. 输出必须是合法JSON，不要Markdown格式
+
+JSON Schema:
+{JSON_SCHEMA}
+
+缺失字段设为null。"""
+
+
+def build_context(filename: str = "", target_city: str = "") -> str:
+    return f"【上下文】\n目标城市：{target_city or '未指定'}"
+
+
+def build_user_prompt(text: str) -> str:
+    return f"请分析以下简历，提取JSON结构化数据:\n\n{text}"
+
+
+# ============================
+# 评分算法 - 基于老版本（3月19日）
+# ============================
+def calculate_score(data: Dict, target_city: str = "") -> Tuple[int, str]:
+    """
+    简历评分算法
+    基于2025-03-19版本，通用化设计（移除香港限定）
+    """
+    score = 0
+    logs = []
+    
+    basic = data.get('basic_info', {})
+    edu = data.get('education', {})
+    work = data.get('work_experience', {})
+    achieve = data.get('achievements', {})
+    ai = data.get('ai_assessment', {})
+    
+    def get_num(val):
+        try:
+            return float(val)
+        except (ValueError, TypeError):
+            return 0.0
+    
+    target_city = target_city or ""
+    
+    # 1. 专业匹配 - 教学竞赛
+    comp_str = str(achieve.get('teaching_competition', [])) + str(achieve.get('honor_titles', []))
+    if "省" in comp_str and ("一等奖" in comp_str or "前三" in comp_str):
+        score += 5
+        logs.append("专业: 省级奖项 +5")
+    
+    # 2. 学习经历
+    hs_tier = str(edu.get('high_school_tier', ''))
+    if "重点" in hs_tier or "县中" in hs_tier:
+        score += 3
+        logs.append(f"高中: {hs_tier} +3")
+    
+    b_tier = str(edu.get('bachelor_tier', ''))
+    if "C9" in b_tier:
+        score += 5
+        logs.append("本科: C9 +5")
+    elif "985" in b_tier or "海外名校" in b_tier:
+        score += 3
+        logs.append(f"本科: {b_tier} +3")
+    elif "211" in b_tier or "重点师范" in b_tier:
+        score += 1
+        logs.append(f"本科: {b_tier} +1")
+    
+    m_tier = str(edu.get('master_tier', ''))
+    if "C9" in m_tier:
+        score += 5
+        logs.append("硕士: C9 +5")
+    elif "985" in m_tier or "海外名校" in m_tier:
+        score += 3
+        logs.append(f"硕士: {m_tier} +3")
+    elif "211" in m_tier or "重点师范" in m_tier:
+        score += 1
+        logs.append(f"硕士: {m_tier} +1")
+    
+    abroad = get_num(edu.get('study_abroad_years'))
+    if abroad >= 2:
+        score += 2
+        logs.append("留学: 2年以上 +2")
+    if str(edu.get('exchange_experience', '否')) == '是':
+        score += 1
+        logs.append("留学: 交换经历 +1")
+    
+    # 3. 个人特质 - 基于老版本（男+3，女性已婚已育+1）
+    gender = str(basic.get('gender', ''))
+    if gender == '男':
+        score += 3
+        logs.append("性别: 男性 +3")
+    if gender == '女' and '已育' in str(basic.get('marital_status', '')):
+        score += 1
+        logs.append("性别: 已婚已育 +1")
+    
+    # 家庭背景
+    parents = str(basic.get('parents_background', ''))
+    if any(k in parents for k in ['教师', '学校', '机关', '研发', '公务员']):
+        score += 1
+        logs.append("家庭: 父母书香/机关 +1")
+    
+    # 地域匹配（如果配置了目标城市）
+    if target_city:
+        if target_city in str(basic.get('residence', '')):
+            score += 1
+            logs.append(f"地域: 现居{target_city} +1")
+        if target_city in str(basic.get('partner_location', '')):
+            score += 1
+            logs.append(f"地域: 配偶在{target_city} +1")
+    
+    # 4. 工作经历
+    work_tier = str(work.get('school_tier', ''))
+    if "重点" in work_tier or "知名" in work_tier or "国际" in work_tier:
+        score += 3
+        logs.append(f"工作: {work_tier} +3")
+    
+    if get_num(work.get('non_teaching_gap')) > 2:
+        score -= 3
+        logs.append("工作: 非教空窗期 -3")
+    if get_num(work.get('overseas_work_years')) >= 1:
+        score += 3
+        logs.append("工作: 海外工作 +3")
+    
+    # 5. 教学科研
+    titles = str(achieve.get('honor_titles', []))
+    if any(k in titles for k in ['特级', '学科带头人', '骨干', '优青']):
+        score += 5
+        logs.append("科研: 核心头衔 +5")
+    
+    contest = str(achieve.get('teaching_competition', []))
+    if "一等奖" in contest and ("区" in contest or "市" in contest or "省" in contest):
+        score += 3
+        logs.append("科研: 赛课一等奖 +3")
+    
+    academic = str(achieve.get('academic_results', []))
+    if "课题" in academic or "论文" in academic:
+        score += 1
+        logs.append("科研: 学术成果 +1")
+    
+    # 6. 管理能力
+    mgmt = str(work.get('management_role', ''))
+    if mgmt and mgmt not in ['无', '未提及', 'None', 'null']:
+        if "年级组长" in mgmt or "教研" in mgmt or "中层" in mgmt or "主任" in mgmt or "校长" in mgmt:
+            score += 3
+            logs.append(f"管理: {mgmt} +3")
+    
+    ht_years = get_num(work.get('head_teacher_years'))
+    if ht_years >= 5:
+        score += 3
+        logs.append("管理: 班主任5年+ +3")
+    elif ht_years > 0:
+        score += 1
+        logs.append("管理: 有班主任经历 +1")
+    
+    # 7. 潜质
+    potential = get_num(ai.get('potential_score'))
+    if potential > 0:
+        score += potential
+        logs.append(f"潜质: +{potential}")
+    
+    return score, "; ".join(logs)
+
+
+# ============================
+# 结果处理与导出
+# ============================
+def process_results(api_results: List[Dict], debug_mode: bool = False, target_city: str = "") -> Tuple[List[Dict], List[Dict]]:
+    """处理API返回结果，计算评分，生成最终数据（本方案不输出 debug 列）"""
+    final_results = []
+    need_review = []
+    schools = SchoolResolver()
+    
+    for result in api_results:
+        filename = result['filename']
+        api_data = result.get('api_result', {})
+        
+        if 'error' in api_data:
+            final_results.append({
+                '文件名': filename,
+                '处理状态': '失败',
+                '错误信息': api_data['error'],
+                '综合评分': 0,
+                '评分详情': ''
+            })
+            continue
+        
+        # 学校名称解析为规范名称，名单内院校的层次以名单为准，同一所学校每次评分一致
+        schools.normalize_education(api_data.setdefault('education', {}))
+        # 计算评分
+        total_score, score_logs = calculate_score(api_data, target_city)
+        
+        # 提取基本信息
+        basic = api_data.get('basic_info', {})
+        edu = api_data.get('education', {})
+        work = api_data.get('work_experience', {})
+        achieve = api_data.get('achievements', {})
+        ai_eval = api_data.get('ai_assessment', {})
+        
+        # 检查是否需要人工复核
+        needs_review = False
+        review_fields = []
+        for field_name, key in [('姓名', 'name'), ('性别', 'gender'), ('学科', 'subject')]:
+            val = basic.get(key, '')
+            if not val or val in ['null', 'None', '']:
+                needs_review = True
+                review_fields.append(field_name)
+        
+        row = {
+            '文件名': filename,
+            '处理状态': '需复核' if needs_review else '成功',
+            '姓名': basic.get('name', ''),
+            '性别': basic.get('gender', ''),
+            '年龄': basic.get('age', ''),
+            '任教学科': basic.get('subject', ''),
+            '婚姻状况': basic.get('marital_status', ''),
+            '现居地': basic.get('residence', ''),
+            '本科学校': edu.get('bachelor_school', ''),
+            '本科层次': edu.get('bachelor_tier', ''),
+            '硕士学校': edu.get('master_school', ''),
+            '硕士层次': edu.get('master_tier', ''),
+            '现工作单位': work.get('current_company', ''),
+            '学校层次': work.get('school_tier', ''),
+            '教龄': work.get('teaching_years', ''),
+            '班主任年限': work.get('head_teacher_years', ''),
+            '管理职务': work.get('management_role', ''),
+            '荣誉称号': ', '.join(achieve.get('honor_titles', [])) if isinstance(achieve.get('honor_titles'), list) else str(achieve.get('honor_titles', '')),
+            '教学竞赛': ', '.join(achieve.get('teaching_competition', [])) if isinstance(achieve.get('teaching_competition'), list) else str(achieve.get('teaching_competition', '')),
+            '综合评分': total_score,
+            '评分详情': score_logs,
+            'AI评语': ai_eval.get('summary', ''),
+            '风险提示': ai_eval.get('risk_warning', ''),
+            '需复核字段': ','.join(review_fields) if needs_review else ''
+        }
+        
+        final_results.append(row)
+        if needs_review:
+            need_review.append(row)
+    
+    return final_results, need_review
@@ -0,0 +1,76 @@
+"""
+分析方案（profile）：一套提示词 + 模型/采样参数 + 评分与结果表规则。
+
+流程本身（解析、去重、并发调用、任务日志）与方案无关，页面只需选择方案名：
+- 0410：resume.py 使用的合并版评分（默认）
+- 0319：resume_optimized.py 使用的 3 月 19 日版评分
+"""
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict
+
+from resume_core import llm, scoring, profile_0319
+
+
+@dataclass
+class AnalysisProfile:
+    name: str
+    title: str
+    model: str
+    prompt_version: str
+    system_prompt: str                         # 逐字节固定的指令块（所有请求共用同一前缀）
+    context: Callable[[str, str], str]         # (文件名, 目标城市) -> 用户消息开头的上下文
+    user_prompt: Callable[[str], str]          # 简历文本 -> 用户消息正文
+    build_results: Callable                    # (api_results, debug_mode, target_city) -> (结果行, 需复核行)
+    temperature: float = 0.3
+    max_tokens: int = 2000
+    max_input_chars: int = 0                   # 0 表示不截断
+    extra_payload: Dict = field(default_factory=dict)
+
+    @property
+    def prompt_key(self) -> str:
+        """提示词版本 + 固定指令块摘要；提取结果按它区分，换了提示词的旧结果不会被复用"""
+        digest = hashlib.sha256(self.system_prompt.encode('utf-8')).hexdigest()[:8]
+        return f"{self.name}:{self.prompt_version}:{digest}"
+
+
+PROFILES: Dict[str, AnalysisProfile] = {}
+
+
+def register_profile(profile: AnalysisProfile) -> AnalysisProfile:
+    PROFILES[profile.name] = profile
+    return profile
+
+
+def get_profile(name: str) -> AnalysisProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"未知的分析方案: {name}（可选: {', '.join(PROFILES)}）")
+
+
+register_profile(AnalysisProfile(
+    name="0410",
+    title="0410 合并版",
+    model=llm.DEFAULT_MODEL,
+    prompt_version=llm.PROMPT_VERSION,
+    system_prompt=llm.SYSTEM_PROMPT,
+    context=llm.build_context,
+    user_prompt=llm.build_user_prompt,
+    build_results=scoring.process_results,
+))
+
+register_profile(AnalysisProfile(
+    name="0319",
+    title="0319 通用版",
+    model=profile_0319.MODEL,
+    prompt_version=profile_0319.PROMPT_VERSION,
+    system_prompt=profile_0319.SYSTEM_PROMPT,
+    context=profile_0319.build_context,
+    user_prompt=profile_0319.build_user_prompt,
+    build_results=profile_0319.process_results,
+    temperature=0.1,
+    max_tokens=2500,
+    max_input_chars=profile_0319.MAX_INPUT_CHARS,
+    extra_payload={"enable_thinking": False},
+))
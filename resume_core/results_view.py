@@ -0,0 +1,170 @@
+"""
+候选人结果表的分页查询：页面每次重绘只取当前一页。
+
+结果行在构建 ResultTable 时整理一次：统计数字、筛选用的状态/学科编码、评分数值列都预先算好，
+各排序列的顺序在首次使用时计算并缓存。查询只做布尔掩码 + 取页，
+长文本列（评分详情、AI评语等）在列表中只显示截断预览，点选某一行时再取完整内容。
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PAGE_SIZE = 50
+PREVIEW_CHARS = 40            # 长文本列在列表中显示的字符数
+
+LIST_COLUMNS = [
+    '文件名', '处理状态', '姓名', '手机号', '性别', '年龄', '任教学科',
+    '本科学校', '本科层次', '硕士学校', '硕士层次',
+    '现工作单位', '单位档次', '教龄', '班主任年限', '管理职务',
+    '荣誉称号', '教学竞赛',
+    '综合评分', '评分详情', 'AI评语', '风险提示', '重复文件', '近似重复'
+]
+LONG_TEXT_COLUMNS = ['评分详情', 'AI评语', '风险提示', '荣誉称号', '教学竞赛', '错误信息']
+SEARCH_COLUMNS = ['文件名', '姓名']
+SCORE_COLUMN = '综合评分'
+STATUS_COLUMN = '处理状态'
+SUBJECT_COLUMN = '任教学科'
+
+
+@dataclass
+class ResultQuery:
+    statuses: Tuple[str, ...] = ()      # 为空表示不限
+    subjects: Tuple[str, ...] = ()
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    keyword: str = ''                   # 文件名 / 姓名 包含
+    sort_by: str = SCORE_COLUMN
+    descending: bool = True
+    page: int = 1                       # 从 1 开始
+    page_size: int = DEFAULT_PAGE_SIZE
+
+
+@dataclass
+class ResultPage:
+    rows: pd.DataFrame                  # 当前页（长文本已截断）
+    total: int                          # 满足筛选条件的总行数
+    page: int
+    pages: int
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _preview(value, limit: int):
+    if _is_missing(value):
+        return value
+    text = str(value)
+    return text if len(text) <= limit else text[:limit] + '…'
+
+
+def _codes(series: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """文本列编码为整数，筛选时按编码比较；空值编码为 -1"""
+    values = series.map(lambda v: None if _is_missing(v) or v == '' else str(v))
+    categorical = pd.Categorical(values)
+    return np.asarray(categorical.codes), [str(c) for c in categorical.categories]
+
+
+class ResultTable:
+    def __init__(self, rows: Sequence[Dict], columns: Sequence[str] = LIST_COLUMNS,
+                 preview_chars: int = PREVIEW_CHARS):
+        self.df = pd.DataFrame(list(rows))
+        self.columns = [c for c in columns if c in self.df.columns]
+        self.preview_chars = preview_chars
+        n = len(self.df)
+        self._score = (pd.to_numeric(self.df[SCORE_COLUMN], errors='coerce').to_numpy(dtype=float)
+                       if SCORE_COLUMN in self.df.columns else np.full(n, np.nan))
+        empty = pd.Series([None] * n, dtype=object)
+        self._status, self.statuses = _codes(self.df.get(STATUS_COLUMN, empty))
+        self._subject, self.subjects = _codes(self.df.get(SUBJECT_COLUMN, empty))
+        search = [self.df[c].fillna('').astype(str) for c in SEARCH_COLUMNS if c in self.df.columns]
+        self._search = (search[0].str.cat(search[1:], sep='\n') if search else pd.Series([''] * n)).str.lower().to_numpy()
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self.stats = self._compute_stats()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _compute_stats(self) -> Dict:
+        scores = self._score[~np.isnan(self._score)]
+        return {
+            'total': len(self.df),
+            'success': self.count_status('成功'),
+            'review': self.count_status('需复核'),
+            'avg_score': float(scores.mean()) if len(scores) else 0.0,
+            'min_score': float(scores.min()) if len(scores) else 0.0,
+            'max_score': float(scores.max()) if len(scores) else 0.0,
+        }
+
+    def count_status(self, status: str) -> int:
+        if status not in self.statuses:
+            return 0
+        return int((self._status == self.statuses.index(status)).sum())
+
+    def _order(self, column: str, descending: bool) -> np.ndarray:
+        """按某列排序后的行下标（稳定排序，空值在最后），按 (列, 方向) 缓存"""
+        cache_key = (column, descending)
+        if cache_key not in self._orders:
+            if column == SCORE_COLUMN:
+                key = pd.Series(self._score)
+            else:
+                series = self.df[column]
+                numeric = pd.to_numeric(series, errors='coerce')
+                # 数字列按数值排，文本或混合列按字符串排
+                if numeric.notna().sum() == series.notna().sum():
+                    key = numeric
+                else:
+                    key = series.map(lambda v: None if _is_missing(v) else str(v))
+            ordered = key.reset_index(drop=True).sort_values(ascending=not descending, kind='stable', na_position='last')
+            self._orders[cache_key] = ordered.index.to_numpy()
+        return self._orders[cache_key]
+
+    def _mask(self, q: ResultQuery) -> np.ndarray:
+        mask = np.ones(len(self.df), dtype=bool)
+        if q.statuses:
+            mask &= np.isin(self._status, [self.statuses.index(s) for s in q.statuses if s in self.statuses])
+        if q.subjects:
+            mask &= np.isin(self._subject, [self.subjects.index(s) for s in q.subjects if s in self.subjects])
+        if q.min_score is not None:
+            mask &= self._score >= q.min_score
+        if q.max_score is not None:
+            mask &= self._score <= q.max_score
+        if q.keyword.strip():
+            keyword = q.keyword.strip().lower()
+            mask &= np.fromiter((keyword in s for s in self._search), dtype=bool, count=len(self._search))
+        return mask
+
+    def query(self, q: ResultQuery) -> ResultPage:
+        mask = self._mask(q)
+        if q.sort_by in self.df.columns:
+            order = self._order(q.sort_by, q.descending)
+            order = order[mask[order]]
+        else:
+            order = np.flatnonzero(mask)
+        total = len(order)
+        page_size = max(1, q.page_size)
+        pages = max(1, math.ceil(total / page_size))
+        page = min(max(1, q.page), pages)
+        picked = order[(page - 1) * page_size: page * page_size]
+        rows = self.df.iloc[picked][self.columns].copy()
+        for col in LONG_TEXT_COLUMNS:
+            if col in rows.columns:
+                rows[col] = rows[col].map(lambda v: _preview(v, self.preview_chars))
+        if SCORE_COLUMN in rows.columns:
+            # 失败行没有评分，整列会变成浮点；显示时还原为整数
+            scores = pd.to_numeric(rows[SCORE_COLUMN], errors='coerce')
+            if (scores.dropna() % 1 == 0).all():
+                rows[SCORE_COLUMN] = scores.astype('Int64')
+        return ResultPage(rows, total, page, pages)
+
+    def row(self, filename: str) -> Optional[Dict]:
+        """按文件名取一行的完整内容"""
+        if '文件名' not in self.df.columns:
+            return None
+        hits = np.flatnonzero(self.df['文件名'].to_numpy() == filename)
+        if not len(hits):
+            return None
+        return {k: None if _is_missing(v) else v for k, v in self.df.iloc[hits[0]].items()}
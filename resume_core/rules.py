@@ -0,0 +1,246 @@
+"""
+规则表评分引擎：评分规则写成声明式的表（维度、字段、匹配条件、分值），
+编译成对整列 DataFrame 的向量化运算，一次给整批候选人打分。
+
+改权重、改目标城市后只需对已保存的结果行重新打分（不重新调用大模型），
+5 万行在一秒量级内完成。规则与 0410 版 calculate_score 的手写逻辑一一对应，
+综合评分和评分详情（文本、顺序）保持一致。
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+NO_MATCH_DETAIL = "未匹配评分条件"
+
+# 条件类型
+OP_CONTAINS = 'contains'          # arg: 词组元组，命中任意一个即成立
+OP_EQUALS = 'equals'              # arg: 值，字符串完全相等
+OP_GE = 'ge'                      # arg: 阈值，数值 >=
+OP_GT = 'gt'                      # arg: 阈值，数值 >
+OP_CONTAINS_PARAM = 'contains_param'  # arg: 参数名（如 target_city），字段包含该参数值
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    op: str
+    arg: Any = None
+
+
+@dataclass(frozen=True)
+class ScoreRule:
+    dimension: str                    # 评分维度，便于按维度管理和调整
+    label: str                        # 评分详情文本，可引用 {特征列}、{参数名}、{points}
+    points: int
+    when: Tuple[Condition, ...]       # 条件之间为“且”
+    group: str = ''                   # 同组规则互斥，按顺序取第一条命中（对应 if/elif）
+    points_field: str = ''            # 非空时按该数值特征取整计分（如 AI 潜质分）
+    requires: str = ''                # 参数为空时整条规则不生效（如未设置目标城市）
+
+
+def _contains(field: str, *terms: str) -> Condition:
+    return Condition(field, OP_CONTAINS, terms)
+
+
+# ============================
+# 特征：结果行列名 -> 评分特征（文本特征与 calculate_score 中的 str(...) 一致，数值特征同 get_num）
+# ============================
+TEXT_FEATURES = {
+    'hs_tier': ('高中层次',),
+    'b_tier': ('本科层次',),
+    'm_tier': ('硕士层次',),
+    'exchange': ('交换经历',),
+    'gender': ('性别',),
+    'marital': ('婚姻状况',),
+    'parents': ('父母背景',),
+    'residence': ('现居地',),
+    'partner': ('配偶工作地',),
+    'work_tier': ('单位档次',),
+    'titles': ('荣誉称号',),
+    'contest': ('教学竞赛',),
+    'academic': ('学术成果',),
+    'mgmt': ('管理职务',),
+    'comp_str': ('教学竞赛', '荣誉称号'),
+}
+NUMERIC_FEATURES = {
+    'abroad': '海外留学',
+    'gap': '非教空窗',
+    'overseas': '海外工作',
+    'ht_years': '班主任年限',
+    'potential': 'AI潜质分',
+}
+
+# ============================
+# 0410 合并版规则表（顺序即评分详情中的顺序）
+# ============================
+RULES_0410: List[ScoreRule] = [
+    # 1. 专业匹配
+    ScoreRule('专业匹配', "专业: 省级奖项 +5", 5, (_contains('comp_str', '省'), _contains('comp_str', '一等奖', '前三'))),
+    # 2. 学习经历
+    ScoreRule('学习经历', "高中: {hs_tier} +3", 3, (_contains('hs_tier', '重点', '县中'),)),
+    ScoreRule('学习经历', "本科: C9 +5", 5, (_contains('b_tier', 'C9'),), group='本科'),
+    ScoreRule('学习经历', "本科: {b_tier} +3", 3, (_contains('b_tier', '985', '海外名校'),), group='本科'),
+    ScoreRule('学习经历', "本科: {b_tier} +1", 1, (_contains('b_tier', '211', '重点师范'),), group='本科'),
+    ScoreRule('学习经历', "硕士: C9 +5", 5, (_contains('m_tier', 'C9'),), group='硕士'),
+    ScoreRule('学习经历', "硕士: {m_tier} +3", 3, (_contains('m_tier', '985', '海外名校'),), group='硕士'),
+    ScoreRule('学习经历', "硕士: {m_tier} +1", 1, (_contains('m_tier', '211', '重点师范'),), group='硕士'),
+    ScoreRule('学习经历', "留学: 2年以上 +2", 2, (Condition('abroad', OP_GE, 2),)),
+    ScoreRule('学习经历', "留学: 交换经历 +1", 1, (Condition('exchange', OP_EQUALS, '是'),)),
+    # 3. 家庭背景
+    ScoreRule('家庭背景', "背景: 男性 +3", 3, (Condition('gender', OP_EQUALS, '男'),)),
+    ScoreRule('家庭背景', "背景: 已婚已育 +1", 1, (Condition('gender', OP_EQUALS, '女'), _contains('marital', '已育'))),
+    ScoreRule('家庭背景', "背景: 书香/机关家庭 +1", 1, (_contains('parents', '教师', '学校', '机关', '研发', '公务员'),)),
+    ScoreRule('家庭背景', "居住: 住{target_city} +1", 1, (Condition('residence', OP_CONTAINS_PARAM, 'target_city'),),
+              requires='target_city'),
+    ScoreRule('家庭背景', "家庭: 配偶在{target_city} +1", 1, (Condition('partner', OP_CONTAINS_PARAM, 'target_city'),),
+              requires='target_city'),
+    # 4. 工作经历
+    ScoreRule('工作经历', "工作: {work_tier} +3", 3, (_contains('work_tier', '重点', '知名'),)),
+    ScoreRule('工作经历', "工作: 非教空窗期>2年 -3", -3, (Condition('gap', OP_GT, 2),)),
+    ScoreRule('工作经历', "工作: 海外工作 +3", 3, (Condition('overseas', OP_GE, 1),)),
+    # 5. 教学科研
+    ScoreRule('教学科研', "科研: 核心称号 +5", 5, (_contains('titles', '特级', '学科带头人', '骨干', '优青'),)),
+    ScoreRule('教学科研', "教学: 赛课一等奖 +3", 3, (_contains('contest', '一等奖'), _contains('contest', '区', '市', '省'))),
+    ScoreRule('教学科研', "学术: 课题/论文 +1", 1, (_contains('academic', '课题', '论文'),)),
+    # 6. 管理能力
+    ScoreRule('管理能力', "管理: 组长/中层 +3", 3, (_contains('mgmt', '年级组长', '教研', '中层'),)),
+    ScoreRule('管理能力', "管理: 班主任5年+ +3", 3, (Condition('ht_years', OP_GE, 5),), group='班主任'),
+    ScoreRule('管理能力', "管理: 班主任经验 +1", 1, (Condition('ht_years', OP_GT, 0),), group='班主任'),
+    # 7. AI 潜质
+    ScoreRule('AI潜质', "潜质: AI评分 +{points}", 0, (Condition('potential', OP_GT, 0),), points_field='potential'),
+]
+
+
+def _as_text(value) -> str:
+    """与 str(...) 一致；DataFrame 中缺失值（NaN）按 None 处理"""
+    if isinstance(value, float) and np.isnan(value):
+        return 'None'
+    if isinstance(value, list):
+        return ', '.join(str(v) for v in value)
+    return str(value)
+
+
+def _as_num(value) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def build_features(rows) -> pd.DataFrame:
+    """
+    从结果行（字典列表或 DataFrame）构造评分特征表。
+    只做一次逐元素转换；之后改规则、改参数重新打分都只在特征表上做向量运算
+    """
+    if isinstance(rows, pd.DataFrame):
+        columns = {col: rows[col].tolist() if col in rows.columns else [''] * len(rows) for col in
+                   {c for cols in TEXT_FEATURES.values() for c in cols} | set(NUMERIC_FEATURES.values())}
+    else:
+        columns = {}
+        for col in {c for cols in TEXT_FEATURES.values() for c in cols} | set(NUMERIC_FEATURES.values()):
+            columns[col] = [row.get(col, '') for row in rows]
+    n = len(rows)
+    features = {}
+    for name, cols in TEXT_FEATURES.items():
+        parts = [[_as_text(v) for v in columns[col]] for col in cols]
+        features[name] = pd.Series([''.join(p) for p in zip(*parts)] if parts else [''] * n, dtype=object)
+    for name, col in NUMERIC_FEATURES.items():
+        features[name] = pd.Series([_as_num(v) for v in columns[col]], dtype=float)
+    return pd.DataFrame(features)
+
+
+def _condition_mask(features: pd.DataFrame, cond: Condition, params: Dict) -> np.ndarray:
+    col = features[cond.field]
+    if cond.op == OP_CONTAINS:
+        pattern = '|'.join(re.escape(t) for t in cond.arg)
+        return col.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+    if cond.op == OP_CONTAINS_PARAM:
+        return col.str.contains(str(params.get(cond.arg, '')), regex=False).to_numpy(dtype=bool)
+    if cond.op == OP_EQUALS:
+        return (col == cond.arg).to_numpy(dtype=bool)
+    if cond.op == OP_GE:
+        return (col >= cond.arg).to_numpy(dtype=bool)
+    if cond.op == OP_GT:
+        return (col > cond.arg).to_numpy(dtype=bool)
+    raise ValueError(f"未知的条件类型: {cond.op}")
+
+
+_PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+
+def _render_label(rule: ScoreRule, features: pd.DataFrame, points: np.ndarray, params: Dict) -> np.ndarray:
+    """评分详情文本：字面量直接广播，引用特征列的按行拼接"""
+    n = len(features)
+    pieces = _PLACEHOLDER_RE.split(rule.label)   # 偶数位为字面量，奇数位为占位符名
+    text = np.full(n, pieces[0], dtype=object)
+    for i in range(1, len(pieces), 2):
+        name, literal = pieces[i], pieces[i + 1]
+        if name == 'points':
+            value = points.astype(str).astype(object)
+        elif name in features.columns:
+            value = features[name].to_numpy(dtype=object)
+        else:
+            value = str(params.get(name, ''))
+        text = text + value + literal
+    return text
+
+
+def score_features(features: pd.DataFrame, rules: Sequence[ScoreRule] = RULES_0410,
+                   params: Dict = None) -> Tuple[np.ndarray, np.ndarray]:
+    """按规则表给整张特征表打分，返回 (综合评分数组, 评分详情数组)"""
+    params = params or {}
+    n = len(features)
+    scores = np.zeros(n, dtype=np.int64)
+    details = np.full(n, '', dtype=object)
+    taken: Dict[str, np.ndarray] = {}
+    for rule in rules:
+        if rule.requires and not params.get(rule.requires):
+            continue
+        mask = np.ones(n, dtype=bool)
+        for cond in rule.when:
+            mask &= _condition_mask(features, cond, params)
+        if rule.group:
+            group_taken = taken.setdefault(rule.group, np.zeros(n, dtype=bool))
+            mask &= ~group_taken
+            group_taken |= mask
+        if not mask.any():
+            continue
+        if rule.points_field:
+            values = features[rule.points_field].to_numpy(dtype=float)
+            mask &= np.isfinite(values)
+            points = np.trunc(np.where(mask, values, 0)).astype(np.int64)
+        else:
+            points = np.full(n, rule.points, dtype=np.int64)
+        scores += np.where(mask, points, 0)
+        label = _render_label(rule, features, points, params)
+        details = np.where(mask, details + '; ' + label, details)
+    details = np.array([d[2:] if d else NO_MATCH_DETAIL for d in details], dtype=object)
+    return scores, details
+
+
+def score_rows(rows, target_city: str = "", rules: Sequence[ScoreRule] = RULES_0410) -> Tuple[np.ndarray, np.ndarray]:
+    """结果行（字典列表或 DataFrame）-> (综合评分, 评分详情)"""
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object)
+    return score_features(build_features(rows), rules, {'target_city': target_city or ""})
+
+
+def rescore_frame(df: pd.DataFrame, target_city: str = "", rules: Sequence[ScoreRule] = RULES_0410) -> pd.DataFrame:
+    """对已有结果表按当前规则、目标城市重新打分（失败、未完成的行不参与），返回新的 DataFrame"""
+    df = df.copy()
+    if '处理状态' in df.columns:
+        ok = (~df['处理状态'].isin(['失败', '未完成'])).to_numpy()
+    else:
+        ok = np.ones(len(df), dtype=bool)
+    if ok.any():
+        scores, details = score_rows(df[ok], target_city, rules)
+        if '综合评分' not in df.columns:
+            df['综合评分'] = None
+            df['评分详情'] = ''
+        df['综合评分'] = df['综合评分'].astype(object)
+        df.loc[ok, '综合评分'] = scores
+        df.loc[ok, '评分详情'] = details
+    return df
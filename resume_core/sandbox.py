@@ -0,0 +1,260 @@
+"""
+隔离解析模式：每个解析任务在可回收的子进程中执行。
+
+线程无法被强制终止，一个畸形 PDF（损坏的 xref、超大内嵌图片）或 DOCX 里的
+zip 炸弹就能让 ThreadPoolExecutor 的 worker 永久卡死或内存暴涨。
+这里为每个并发槽位维护一个子进程：
+- 子进程启动时通过 rlimit 限制地址空间（仅 Unix）
+- 父进程按墙钟时间等待结果，超时直接 kill 并重新拉起
+- 子进程异常退出（段错误、OOM）同样记为失败并自动重生
+- 每个子进程处理固定数量任务后主动回收，防止内存碎片累积
+- 批次取消（见 resume_core.cancel）时正在解析的子进程直接 kill，未开始的文件丢弃
+"""
+import os
+import time
+import queue
+import threading
+import multiprocessing as mp
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from resume_core.cache import cache
+from resume_core.cancel import POLL_INTERVAL, REASON_LABELS, CancelToken
+from resume_core.extract import ParseResult, parse_single_file
+from resume_core.spool import item_size
+
+try:
+    import resource
+    RLIMIT_SUPPORT = True
+except ImportError:
+    RLIMIT_SUPPORT = False
+
+DEFAULT_PARSE_TIMEOUT = 120       # 单文件解析墙钟超时(秒)
+DEFAULT_MEMORY_LIMIT_MB = 1536    # 单个子进程地址空间上限(MB)
+DEFAULT_TASKS_PER_WORKER = 50     # 子进程处理多少个文件后回收
+
+
+def _apply_memory_limit(memory_limit_mb: int):
+    """在子进程内设置地址空间上限，超限时分配失败抛出 MemoryError 而不是拖垮整机"""
+    if not RLIMIT_SUPPORT or not memory_limit_mb:
+        return
+    limit = int(memory_limit_mb) * 1024 * 1024
+    try:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _worker_main(conn, memory_limit_mb: int, cache_dir: str = None):
+    """子进程入口：循环接收任务，返回 ParseResult；收到 None 时退出"""
+    _apply_memory_limit(memory_limit_mb)
+    # spawn 出的子进程重新导入 cache 模块，缓存目录要与父进程（例如命令行 --cache-dir）一致
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache.cache_dir = cache_dir
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        item, use_ocr, api_key, enable_cache = task
+        try:
+            result = parse_single_file(item, use_ocr, api_key, enable_cache)
+        except MemoryError:
+            result = ParseResult(filename=item.get('name', 'unknown'), content="",
+                                 error=f"解析内存超限 (>{memory_limit_mb}MB)")
+        try:
+            conn.send(result)
+        except Exception:
+            break
+    conn.close()
+
+
+class _WorkerHandle:
+    """父进程侧的子进程句柄"""
+    def __init__(self, ctx, memory_limit_mb: int, cache_dir: str = None):
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, memory_limit_mb, cache_dir), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks_done = 0
+
+    def kill(self):
+        try:
+            self.process.kill()
+        except Exception:
+            pass
+        self.process.join(timeout=5)
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def shutdown(self):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+
+
+class SandboxPool:
+    """
+    子进程解析池。每个槽位由父进程内的一个调度线程负责：
+    取任务 -> 发给自己的子进程 -> 在超时时间内等待结果 -> 超时则 kill 并重生。
+    某个文件卡死只会占住一个槽位直到超时，其余槽位保持满速。
+    """
+    def __init__(self, max_workers: int = 4,
+                 timeout: float = DEFAULT_PARSE_TIMEOUT,
+                 memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+                 tasks_per_worker: int = DEFAULT_TASKS_PER_WORKER,
+                 cache_dir: str = None):
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.tasks_per_worker = tasks_per_worker
+        # 子进程使用的解析缓存目录，默认与父进程当前的 cache.cache_dir 相同
+        self.cache_dir = cache_dir or cache.cache_dir
+        # spawn：子进程只导入 resume_core，不会继承 Streamlit 服务端的线程与状态
+        self._ctx = mp.get_context("spawn")
+        self.stats = {'timeouts': 0, 'crashes': 0, 'respawns': 0}
+        self._stats_lock = threading.Lock()
+
+    def _bump(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _wait_result(self, worker: _WorkerHandle, token: Optional[CancelToken]) -> bool:
+        """在超时时间内等待子进程返回结果；令牌取消时提前返回 False"""
+        if token is None:
+            return worker.conn.poll(self.timeout)
+        deadline = time.monotonic() + self.timeout
+        while not token.cancelled:
+            if worker.conn.poll(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic()))):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+        return False
+
+    def _run_slot(self, tasks: "queue.Queue", results: "queue.Queue", use_ocr: bool, api_key: str, enable_cache: bool,
+                  token: Optional[CancelToken] = None):
+        worker = None
+        # 上一个子进程因超时被 kill 或异常退出，下次拉起新进程时计入 respawns
+        replace_killed = False
+        try:
+            while True:
+                try:
+                    item = tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                start_time = time.time()
+                name = item.get('name', 'unknown')
+                file_size = item_size(item)
+                try:
+                    if worker is None or not worker.process.is_alive() or worker.tasks_done >= self.tasks_per_worker:
+                        if worker is not None:
+                            worker.shutdown()
+                        if worker is not None or replace_killed:
+                            self._bump('respawns')
+                        replace_killed = False
+                        worker = _WorkerHandle(self._ctx, self.memory_limit_mb, self.cache_dir)
+
+                    worker.conn.send((item, use_ocr, api_key, enable_cache))
+                    if self._wait_result(worker, token):
+                        result = worker.conn.recv()
+                        worker.tasks_done += 1
+                    elif token is not None and token.cancelled:
+                        worker.kill()
+                        worker = None
+                        result = ParseResult(filename=name, content="",
+                                             error=f"解析中止（{REASON_LABELS[token.reason]}）",
+                                             file_size=file_size,
+                                             parse_time=time.time() - start_time)
+                    else:
+                        worker.kill()
+                        worker = None
+                        replace_killed = True
+                        self._bump('timeouts')
+                        result = ParseResult(filename=name, content="",
+                                             error=f"解析超时 (>{self.timeout:.0f}s)，已终止",
+                                             file_size=file_size,
+                                             parse_time=time.time() - start_time)
+                except (EOFError, OSError):
+                    exitcode = worker.process.exitcode if worker else None
+                    if worker is not None:
+                        worker.kill()
+                    worker = None
+                    replace_killed = True
+                    self._bump('crashes')
+                    result = ParseResult(filename=name, content="",
+                                         error=f"解析进程异常退出 (exitcode={exitcode})",
+                                         file_size=file_size,
+                                         parse_time=time.time() - start_time)
+                except Exception as e:
+                    if worker is not None:
+                        worker.kill()
+                        replace_killed = True
+                    worker = None
+                    result = ParseResult(filename=name, content="", error=f"隔离解析异常: {str(e)}",
+                                         file_size=file_size,
+                                         parse_time=time.time() - start_time)
+                results.put((item, result))
+        finally:
+            if worker is not None:
+                worker.shutdown()
+
+    def imap_unordered(self, items: List[Dict], use_ocr: bool = True, api_key: str = None,
+                       enable_cache: bool = True, token: CancelToken = None) -> Iterator[Tuple[Dict, ParseResult]]:
+        """
+        按完成顺序产出 (item, ParseResult)，超时/崩溃的文件以带 error 的结果返回。
+        条目只带暂存区句柄时，子进程自行从磁盘读取文件，文件字节不经过进程间管道。
+        token 取消后停止产出，正在解析的子进程被 kill
+        """
+        tasks = queue.Queue()
+        for item in items:
+            tasks.put(item)
+        results = queue.Queue()
+
+        n_slots = min(self.max_workers, len(items))
+        threads = [
+            threading.Thread(target=self._run_slot, args=(tasks, results, use_ocr, api_key, enable_cache, token),
+                             daemon=True)
+            for _ in range(n_slots)
+        ]
+        for t in threads:
+            t.start()
+
+        try:
+            for _ in range(len(items)):
+                while True:
+                    try:
+                        result = results.get(timeout=POLL_INTERVAL)
+                        break
+                    except queue.Empty:
+                        if token is not None and token.cancelled:
+                            return
+                yield result
+        finally:
+            # 调用方提前停止迭代（例如任务被取消）时丢弃未开始的文件，各槽位处理完手头的文件即退出
+            while True:
+                try:
+                    tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+        for t in threads:
+            t.join()
@@ -0,0 +1,73 @@
+"""
+最短作业优先调度：按预估耗时从小到大安排解析和 AI 分析，短简历先出结果，扫描件 PDF 等长尾放在最后。
+
+解析阶段的预估只用队列条目已有的元数据（扩展名、字节数、内容哈希是否命中解析缓存），
+不读取文件内容、不在父进程里打开 PDF/DOCX：畸形或超大的文件只在解析 worker（隔离模式下为子进程）中处理。
+扫描件按页存图片，字节数大体随页数和是否需要 OCR 增长，足够用来排序。
+AI 分析阶段按压缩后送入模型的 token 数排序。预估只用来排序，不必精确。
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from resume_core.cache import cache
+from resume_core.cancel import CancelToken
+from resume_core.spool import item_size
+
+# 预估耗时（秒）
+COST_CACHED = 0.01
+COST_DOCX = 0.1
+COST_DOC = 0.3
+COST_PDF = 0.2
+COST_PER_MB = 0.2            # 读取与文字层提取
+COST_OCR_PER_MB = 8.0        # 开启 OCR 时：PDF 每页顶部补充 OCR、扫描页整页 OCR，大致与图片字节数成正比
+COST_DOCX_OCR_PER_MB = 4.0   # 开启 OCR 时 DOCX 的内嵌图片
+
+
+@dataclass
+class ParseCost:
+    name: str
+    size: int = 0
+    cached: bool = False
+    cost: float = 0.0
+
+
+def estimate_parse_cost(item: Dict, use_ocr: bool = True, api_key: str = None,
+                        enable_cache: bool = True) -> ParseCost:
+    name = item.get('name', 'unknown')
+    size = item_size(item)
+    if cache.contains(item.get('sha256'), enable_cache):
+        return ParseCost(name, size, cached=True, cost=COST_CACHED)
+    ocr_on = bool(use_ocr and api_key)
+    mb = size / (1024 * 1024)
+    lower = name.lower()
+    if lower.endswith('.pdf'):
+        cost = COST_PDF + mb * (COST_OCR_PER_MB if ocr_on else COST_PER_MB)
+    elif lower.endswith('.docx'):
+        cost = COST_DOCX + mb * (COST_DOCX_OCR_PER_MB if ocr_on else COST_PER_MB)
+    elif lower.endswith('.doc'):
+        cost = COST_DOC + mb * COST_PER_MB
+    else:
+        cost = 0.0   # 不支持的类型直接报错
+    return ParseCost(name, size, cost=cost)
+
+
+def order_by_parse_cost(items: Sequence[Dict], use_ocr: bool = True, api_key: str = None,
+                        enable_cache: bool = True,
+                        token: CancelToken = None) -> Tuple[List[Dict], List[ParseCost]]:
+    """
+    按预估解析耗时从小到大排序（稳定排序，同耗时保持上传顺序），同时返回各文件的预估。
+    令牌取消时停止预估，未预估的文件按原顺序排在后面
+    """
+    costs = []
+    for item in items:
+        if token is not None and token.cancelled:
+            break
+        costs.append(estimate_parse_cost(item, use_ocr, api_key, enable_cache))
+    order = sorted(range(len(costs)), key=lambda i: costs[i].cost)
+    ordered = [items[i] for i in order] + list(items[len(costs):])
+    return ordered, [costs[i] for i in order]
+
+
+def shortest_first(indices: Sequence[int], tokens: Sequence[int]) -> List[int]:
+    """AI 分析阶段：按 token 数从小到大排序"""
+    return sorted(indices, key=lambda i: tokens[i])
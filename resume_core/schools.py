@@ -0,0 +1,411 @@
+"""
+院校名单与校名匹配：内置 C9 / 985 / 211 / 双一流 / 重点师范名单及简称、曾用名，学校层次按名单确定，不依赖大模型判断。
+
+- 在简历正文中：Aho-Corasick 自动机一次扫描找出所有校名（全名和四字以上的简称、曾用名）
+- 大模型给出的学校名称：依次按整名（含"北师大"等简称）、含有名单内校名、二元组近似匹配解析为规范名称；
+  SchoolResolver 在一批结果内缓存解析结果，同样的写法只解析一次
+
+同一所学校只记最高层次（C9 > 985 > 211 > 双一流 > 重点师范），层次名称与提示词中的 tier 选项一致，
+评分规则表（resume_core.rules）直接按这些字样加分。
+附属中小学（"北京师范大学附属中学"）、独立学院（"浙江大学城市学院""天津大学仁爱学院"）、分校、网络/继续教育学院不算该校。
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+TIER_C9 = 'C9'
+TIER_985 = '985'
+TIER_211 = '211'
+TIER_DOUBLE_FIRST = '双一流'
+TIER_NORMAL = '重点师范'
+
+# ============================
+# 院校名单（按层次从高到低，一所学校只出现在最高的一档）
+# ============================
+C9_SCHOOLS = [
+    '北京大学', '清华大学', '复旦大学', '上海交通大学', '浙江大学', '南京大学',
+    '中国科学技术大学', '哈尔滨工业大学', '西安交通大学',
+]
+
+PROJECT_985_SCHOOLS = [
+    '中国人民大学', '北京航空航天大学', '北京理工大学', '中国农业大学', '北京师范大学', '中央民族大学',
+    '南开大学', '天津大学', '大连理工大学', '东北大学', '吉林大学', '同济大学', '华东师范大学',
+    '东南大学', '厦门大学', '山东大学', '中国海洋大学', '武汉大学', '华中科技大学', '湖南大学',
+    '中南大学', '中山大学', '华南理工大学', '四川大学', '电子科技大学', '重庆大学', '西北工业大学',
+    '西北农林科技大学', '兰州大学', '国防科技大学',
+]
+
+PROJECT_211_SCHOOLS = [
+    '北京交通大学', '北京工业大学', '北京科技大学', '北京化工大学', '北京邮电大学', '北京林业大学',
+    '北京中医药大学', '北京外国语大学', '中国传媒大学', '中央财经大学', '对外经济贸易大学',
+    '北京体育大学', '中央音乐学院', '中国政法大学', '华北电力大学', '中国矿业大学', '中国石油大学',
+    '中国地质大学', '天津医科大学', '河北工业大学', '太原理工大学', '内蒙古大学', '辽宁大学',
+    '大连海事大学', '延边大学', '东北师范大学', '哈尔滨工程大学', '东北农业大学', '东北林业大学',
+    '华东理工大学', '东华大学', '上海外国语大学', '上海财经大学', '上海大学', '海军军医大学',
+    '苏州大学', '南京航空航天大学', '南京理工大学', '河海大学', '江南大学',
+    '南京农业大学', '中国药科大学', '南京师范大学', '安徽大学', '合肥工业大学', '福州大学',
+    '南昌大学', '郑州大学', '武汉理工大学', '华中农业大学', '华中师范大学', '中南财经政法大学',
+    '湖南师范大学', '暨南大学', '华南师范大学', '广西大学', '海南大学', '西南交通大学',
+    '四川农业大学', '西南财经大学', '西南大学', '贵州大学', '云南大学', '西藏大学', '西北大学',
+    '西安电子科技大学', '长安大学', '陕西师范大学', '空军军医大学', '青海大学',
+    '宁夏大学', '新疆大学', '石河子大学',
+]
+
+DOUBLE_FIRST_SCHOOLS = [
+    '首都师范大学', '外交学院', '中国人民公安大学', '北京协和医学院', '中国科学院大学', '中央美术学院',
+    '中央戏剧学院', '中国音乐学院', '天津工业大学', '天津中医药大学', '山西大学', '湘潭大学',
+    '南京邮电大学', '南京林业大学', '南京信息工程大学', '南京中医药大学', '中国美术学院',
+    '上海海洋大学', '上海中医药大学', '上海体育大学', '上海音乐学院', '上海科技大学',
+    '宁波大学', '河南大学', '广州中医药大学', '华南农业大学', '广州医科大学', '南方科技大学',
+    '成都理工大学', '西南石油大学', '成都中医药大学',
+]
+
+KEY_NORMAL_SCHOOLS = [
+    '天津师范大学', '河北师范大学', '山西师范大学', '辽宁师范大学', '哈尔滨师范大学', '上海师范大学',
+    '江苏师范大学', '浙江师范大学', '杭州师范大学', '安徽师范大学', '福建师范大学', '江西师范大学',
+    '山东师范大学', '曲阜师范大学', '河南师范大学', '广西师范大学', '四川师范大学', '重庆师范大学',
+    '西北师范大学', '云南师范大学', '贵州师范大学', '内蒙古师范大学', '新疆师范大学', '湖北师范大学',
+]
+
+SCHOOL_TIERS: Dict[str, str] = {}
+for _tier, _names in [(TIER_C9, C9_SCHOOLS), (TIER_985, PROJECT_985_SCHOOLS), (TIER_211, PROJECT_211_SCHOOLS),
+                      (TIER_DOUBLE_FIRST, DOUBLE_FIRST_SCHOOLS), (TIER_NORMAL, KEY_NORMAL_SCHOOLS)]:
+    for _name in _names:
+        SCHOOL_TIERS.setdefault(_name, _tier)
+
+# 简称、曾用名（合并前的院校）、常见英文名 -> 规范名称。
+# 有歧义的简称不收录：华师（华东/华中/华南师大）、华农、东大、西大、山大、海大、湖大、中大等；
+# 是其他校名一部分的曾用名也不收录（如"石油大学"之于"东北石油大学"）
+SCHOOL_ALIASES: Dict[str, List[str]] = {
+    '北京大学': ['北大', '北京医科大学', 'Peking University', 'PKU'],
+    '清华大学': ['清华', 'Tsinghua University'],
+    '复旦大学': ['复旦', '上海医科大学', 'Fudan University'],
+    '上海交通大学': ['上交', '上海交大', '上海第二医科大学', '上海农学院', 'Shanghai Jiao Tong University', 'SJTU'],
+    '浙江大学': ['浙大', '杭州大学', '浙江农业大学', '浙江医科大学', 'Zhejiang University'],
+    '南京大学': ['南大', 'Nanjing University'],
+    '中国科学技术大学': ['中科大', '中国科大', '中国科技大学', 'University of Science and Technology of China', 'USTC'],
+    '哈尔滨工业大学': ['哈工大', '哈尔滨建筑大学', 'Harbin Institute of Technology'],
+    '西安交通大学': ['西交', '西安交大', '西安医科大学', '陕西财经学院', "Xi'an Jiaotong University"],
+    '中国人民大学': ['人大', '人民大学', 'Renmin University of China'],
+    '北京航空航天大学': ['北航', '北京航空学院', '北京航天航空大学'],
+    '北京理工大学': ['北理工', '北京工业学院'],
+    '中国农业大学': ['中国农大', '北京农业大学', '北京农业工程大学'],
+    '北京师范大学': ['北师大', '北京师大', 'Beijing Normal University', 'BNU'],
+    '中央民族大学': ['中央民族学院'],
+    '南开大学': ['南开'],
+    '天津大学': ['天大', '北洋大学'],
+    '大连理工大学': ['大工', '大连理工', '大连工学院'],
+    '东北大学': ['东北工学院'],
+    '吉林大学': ['吉大', '吉林工业大学', '白求恩医科大学', '长春科技大学', '长春邮电学院'],
+    '同济大学': ['同济', '上海铁道大学'],
+    '华东师范大学': ['华东师大', '华师大', 'East China Normal University', 'ECNU'],
+    '东南大学': ['南京工学院', '南京铁道医学院'],
+    '厦门大学': ['厦大'],
+    '山东大学': ['山东医科大学', '山东工业大学'],
+    '中国海洋大学': ['中国海大', '青岛海洋大学'],
+    '武汉大学': ['武大', '武汉水利电力大学', '武汉测绘科技大学', '湖北医科大学'],
+    '华中科技大学': ['华科', '华中科大', '华中理工大学', '同济医科大学', '武汉城市建设学院'],
+    '湖南大学': ['湖南财经学院'],
+    '中南大学': ['中南工业大学', '湖南医科大学', '长沙铁道学院'],
+    '中山大学': ['中山医科大学'],
+    '华南理工大学': ['华工', '华南理工', '华南工学院'],
+    '四川大学': ['川大', '成都科技大学', '华西医科大学'],
+    '电子科技大学': ['成电', '电子科大', '成都电讯工程学院'],
+    '重庆大学': ['重庆建筑大学'],
+    '西北工业大学': ['西工大'],
+    '西北农林科技大学': ['西北农林', '西北农业大学'],
+    '兰州大学': ['兰大'],
+    '国防科技大学': ['国防科大', '国防科学技术大学'],
+    '北京交通大学': ['北交大', '北方交通大学'],
+    '北京工业大学': ['北工大'],
+    '北京科技大学': ['北科大', '北京科大', '北京钢铁学院'],
+    '北京化工大学': ['北化'],
+    '北京邮电大学': ['北邮', '北京邮电学院'],
+    '北京林业大学': ['北林'],
+    '北京中医药大学': ['北中医'],
+    '北京外国语大学': ['北外'],
+    '中国传媒大学': ['中传', '北京广播学院'],
+    '中央财经大学': ['央财'],
+    '对外经济贸易大学': ['贸大', '对外经贸', '对外经贸大学'],
+    '中国政法大学': ['法大', '北京政法学院'],
+    '中国矿业大学': ['中国矿大', '中国矿业学院'],
+    '中国地质大学': ['中国地大'],
+    '哈尔滨工程大学': ['哈工程'],
+    '东北师范大学': ['东北师大'],
+    '华东理工大学': ['华理', '华东化工学院'],
+    '东华大学': ['中国纺织大学'],
+    '上海外国语大学': ['上外'],
+    '上海财经大学': ['上财'],
+    '上海大学': ['上大'],
+    '海军军医大学': ['第二军医大学'],
+    '空军军医大学': ['第四军医大学'],
+    '苏州大学': ['苏大'],
+    '南京航空航天大学': ['南航', '南京航空学院'],
+    '南京理工大学': ['南理工', '华东工学院'],
+    '河海大学': ['华东水利学院'],
+    '江南大学': ['无锡轻工大学'],
+    '中国药科大学': ['中国药大'],
+    '南京师范大学': ['南师大', '南京师大'],
+    '安徽大学': ['安大'],
+    '合肥工业大学': ['合工大'],
+    '福州大学': ['福大'],
+    '郑州大学': ['郑大'],
+    '武汉理工大学': ['武理工', '武汉工业大学', '武汉交通科技大学', '武汉汽车工业大学'],
+    '华中农业大学': ['华中农大'],
+    '华中师范大学': ['华中师大'],
+    '中南财经政法大学': ['中南财大', '中南财经大学'],
+    '湖南师范大学': ['湖南师大', '湖师大'],
+    '暨南大学': ['暨大'],
+    '华南师范大学': ['华南师大'],
+    '西南交通大学': ['西南交大'],
+    '四川农业大学': ['川农'],
+    '西南财经大学': ['西财', '西南财大'],
+    '西南大学': ['西南师范大学', '西南农业大学'],
+    '西安电子科技大学': ['西电', '西北电讯工程学院'],
+    '长安大学': ['西安公路交通大学'],
+    '陕西师范大学': ['陕师大', '陕西师大'],
+    '首都师范大学': ['首师大', '首都师大'],
+    '中国科学院大学': ['国科大', '中国科学院研究生院'],
+    '上海体育大学': ['上海体育学院'],
+    '南京邮电大学': ['南邮'],
+    '南京信息工程大学': ['南信大'],
+    '上海科技大学': ['上科大'],
+    '南方科技大学': ['南科大'],
+    '中央美术学院': ['央美'],
+    '中国美术学院': ['国美', '浙江美术学院'],
+    '中央戏剧学院': ['中戏'],
+    '华南农业大学': ['华南农大'],
+    '上海师范大学': ['上师大'],
+    '浙江师范大学': ['浙师大'],
+    '杭州师范大学': ['杭师大'],
+    '福建师范大学': ['福师大'],
+    '江西师范大学': ['江西师大'],
+    '山东师范大学': ['山师', '山东师大'],
+    '曲阜师范大学': ['曲师大'],
+    '河南师范大学': ['河南师大'],
+    '广西师范大学': ['广西师大'],
+    '四川师范大学': ['川师', '川师大'],
+    '西北师范大学': ['西北师大'],
+    '辽宁师范大学': ['辽师'],
+    '哈尔滨师范大学': ['哈师大'],
+    '天津师范大学': ['天津师大'],
+    '河北师范大学': ['河北师大'],
+    '安徽师范大学': ['安徽师大'],
+    '江苏师范大学': ['徐州师范大学'],
+}
+
+# 校名之后紧跟这些字样的不是该校本身：附属中小学、独立学院、非全日制学历
+_NOT_SCHOOL_RE = re.compile(
+    r'(?:第[一二三四五六七八九十]+)?附|'
+    r'(?:城市|金陵|锦城|锦江|华夏|文华|珠江|仙林|科技|独立|网络教育|继续教育|成人教育|远程教育)学院'
+)
+# 校名之后紧跟"××学院""××分校"（"天津大学仁爱学院""吉林大学珠海学院""山东大学威海分校"）：
+# 独立学院或分校，不算该校，除非连同后缀的整个名称本身在名单里。
+# 院系（"北京大学物理学院""清华大学经管学院"）以学科字样结尾，仍算该校
+_AFFILIATE_RE = re.compile(r'([一-鿿]{1,4}?)(学院|分校)')
+_DEPARTMENT_TAILS = frozenset('学语程术理管济息料境源筑药医商法文工农史乐体育闻播械子气机件化通航天政融计业利洋质命物生会治际系能义艺')
+
+
+# ============================
+# Aho-Corasick 自动机
+# ============================
+class AhoCorasick:
+    """多模式串匹配：构建一次，之后每段文本只扫描一遍即可找出所有模式串的出现位置"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        if pattern not in self._out[node]:
+            self._out[node] += (pattern,)
+
+    def _build(self):
+        # 按层次遍历计算失配指针，输出集合并入失配节点的输出
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+                queue.append(child)
+
+    def iter_matches(self, text: str):
+        """逐个产出 (起始位置, 结束位置, 模式串)，结束位置不含"""
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern in out[node]:
+                yield i + 1 - len(pattern), i + 1, pattern
+
+
+
+
+# ============================
+# 校名索引：规范名称、简称、曾用名、模糊匹配
+# ============================
+FUZZY_THRESHOLD = 0.75       # 二元组 Dice 相似度下限；四字校名错一个字只有 0.33~0.67，不会被当成另一所学校
+MIN_CONTAINED_LEN = 4        # 短于此长度的简称只做整名匹配（"北大"也是"湖北大学"的一部分）
+MAX_POSTINGS = 30            # 出现在更多校名中的二元组不用于召回候选
+
+_CJK_NAME_RE = re.compile(r'[一-鿿]+')
+_BRACKET_RE = re.compile(r'\([^()]*\)')
+_NOISE_RE = re.compile(r"[\s·・.,，。、'’‘\"“”\-_/]+")
+
+
+def normalize_school_name(name) -> str:
+    """NFKC 规范化，去掉括号里的校区说明、空白和标点，英文转小写"""
+    text = unicodedata.normalize('NFKC', str(name or ''))
+    text = _BRACKET_RE.sub('', text)
+    return _NOISE_RE.sub('', text).lower()
+
+
+def _bigrams(text: str) -> FrozenSet[str]:
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1)) or frozenset([text])
+
+
+class SchoolMatch(NamedTuple):
+    start: int
+    end: int
+    name: str        # 规范名称
+    tier: str
+
+
+class ResolvedSchool(NamedTuple):
+    name: str        # 规范名称，作为学校的唯一标识
+    tier: str
+    method: str      # exact 全名或简称 / contained 含有校名 / fuzzy 近似
+    score: float     # fuzzy 时为相似度，其余为 1.0
+
+
+class SchoolIndex:
+    def __init__(self, tiers: Dict[str, str] = None, aliases: Dict[str, List[str]] = None):
+        tiers = SCHOOL_TIERS if tiers is None else tiers
+        aliases = SCHOOL_ALIASES if aliases is None else aliases
+        self.tiers = dict(tiers)
+        # 整名匹配：规范化后的全名 / 简称 / 曾用名 / 英文名 -> 规范名称
+        self._exact: Dict[str, str] = {normalize_school_name(name): name for name in tiers}
+        # 文本中查找、模糊匹配：全名和不短于 MIN_CONTAINED_LEN 的中文简称、曾用名
+        self._contained: Dict[str, str] = {name: name for name in tiers}
+        for canonical, names in aliases.items():
+            if canonical not in self.tiers:
+                continue
+            for alias in names:
+                self._exact.setdefault(normalize_school_name(alias), canonical)
+                if len(alias) >= MIN_CONTAINED_LEN and _CJK_NAME_RE.fullmatch(alias):
+                    self._contained.setdefault(alias, canonical)
+        self._matcher = AhoCorasick(self._contained)
+        self._grams: Dict[str, FrozenSet[str]] = {name: _bigrams(name) for name in self._contained}
+        self._postings: Dict[str, List[str]] = defaultdict(list)
+        for name, grams in self._grams.items():
+            for gram in grams:
+                self._postings[gram].append(name)
+
+    def find(self, text: str) -> List[SchoolMatch]:
+        """按出现顺序返回文本中的名单内院校；重叠时取最靠左、最长的校名"""
+        if not text:
+            return []
+        matches = sorted(self._matcher.iter_matches(text), key=lambda m: (m[0], -(m[1] - m[0])))
+        found, last_end = [], 0
+        for start, end, pattern in matches:
+            if start < last_end:
+                continue
+            last_end = end
+            if _NOT_SCHOOL_RE.match(text, end):
+                continue
+            canonical = self._contained[pattern]
+            affiliate = _AFFILIATE_RE.match(text, end)
+            if affiliate and (affiliate.group(2) == '分校' or affiliate.group(1)[-1] not in _DEPARTMENT_TAILS):
+                canonical = self._exact.get(normalize_school_name(text[start:affiliate.end()]))
+                if not canonical:
+                    continue
+                end = last_end = affiliate.end()
+            found.append(SchoolMatch(start, end, canonical, self.tiers[canonical]))
+        return found
+
+    def _fuzzy(self, key: str) -> Optional[ResolvedSchool]:
+        grams = _bigrams(key)
+        # 候选只取含有较少见二元组的校名（"大学""学院"几乎每所都有），相似度仍按全部二元组计算
+        candidates = {name for gram in grams if len(self._postings.get(gram, ())) <= MAX_POSTINGS
+                      for name in self._postings[gram]}
+        scored = sorted(((2 * len(grams & self._grams[name]) / (len(grams) + len(self._grams[name])), name)
+                         for name in candidates), reverse=True)
+        if not scored or scored[0][0] < FUZZY_THRESHOLD:
+            return None
+        best_score, best = scored[0]
+        canonical = self._contained[best]
+        # 同样相似的另一所学校：有歧义，不猜
+        if any(score == best_score and self._contained[name] != canonical for score, name in scored[1:]):
+            return None
+        return ResolvedSchool(canonical, self.tiers[canonical], 'fuzzy', round(best_score, 3))
+
+    def resolve(self, name) -> Optional[ResolvedSchool]:
+        """学校名称 -> 规范名称和层次：整名（含简称、曾用名）> 含有名单内校名 > 近似校名；都不中返回 None"""
+        key = normalize_school_name(name)
+        if not key:
+            return None
+        canonical = self._exact.get(key)
+        if canonical:
+            return ResolvedSchool(canonical, self.tiers[canonical], 'exact', 1.0)
+        found = self.find(key)
+        if found:
+            return ResolvedSchool(found[0].name, found[0].tier, 'contained', 1.0)
+        return self._fuzzy(key)
+
+
+@lru_cache(maxsize=1)
+def school_index() -> SchoolIndex:
+    return SchoolIndex()
+
+
+def find_schools(text: str) -> List[SchoolMatch]:
+    return school_index().find(text)
+
+
+def resolve_school(name) -> Optional[ResolvedSchool]:
+    return school_index().resolve(name)
+
+
+class SchoolResolver:
+    """一批结果共用一个：同一个校名写法只解析一次"""
+
+    def __init__(self, index: SchoolIndex = None):
+        self.index = index or school_index()
+        self.cache: Dict[str, Optional[ResolvedSchool]] = {}
+
+    def resolve(self, name) -> Optional[ResolvedSchool]:
+        key = str(name or '')
+        if key not in self.cache:
+            self.cache[key] = self.index.resolve(key)
+        return self.cache[key]
+
+    def normalize_education(self, edu: Dict):
+        """本科、硕士学校改为规范名称，名单内院校的层次以名单为准（原地修改）；名单外的保持原样"""
+        for key in ('bachelor', 'master'):
+            hit = self.resolve(edu.get(f'{key}_school'))
+            if hit:
+                edu[f'{key}_school'] = hit.name
+                edu[f'{key}_tier'] = hit.tier
@@ -0,0 +1,188 @@
+"""
+评分与结果表：根据大模型提取的结构化信息计算综合评分，生成最终结果行。
+本模块不依赖 Streamlit，目标城市由调用方显式传入。
+"""
+from typing import List, Dict, Tuple
+
+from resume_core.preextract import PreExtracted, pre_extract, strip_stage
+from resume_core.rules import score_rows
+from resume_core.schools import SchoolResolver
+
+
+# ============================
+# 评分算法 - 0410 合并版（不再区分敏感字段）
+# ============================
+def _join(value) -> str:
+    # 大模型偶尔在列表里返回数字、null 或对象，逐项转成字符串
+    return ', '.join(str(v) for v in value if v is not None) if isinstance(value, list) else str(value)
+
+
+def score_fields(data: Dict) -> Dict:
+    """评分用到的字段，列名与结果行一致（规则表按结果行列名取特征）"""
+    basic = data.get('basic_info', {})
+    edu = data.get('education', {})
+    work = data.get('work_experience', {})
+    achieve = data.get('achievements', {})
+    ai_eval = data.get('ai_assessment', {})
+    return {
+        '性别': basic.get('gender', ''),
+        '婚姻状况': basic.get('marital_status', ''),
+        '现居地': basic.get('residence', ''),
+        '配偶工作地': basic.get('partner_location', ''),
+        '父母背景': basic.get('parents_background', ''),
+        '高中层次': edu.get('high_school_tier', ''),
+        '本科层次': edu.get('bachelor_tier', ''),
+        '硕士层次': edu.get('master_tier', ''),
+        '海外留学': edu.get('study_abroad_years', ''),
+        '交换经历': edu.get('exchange_experience', ''),
+        '单位档次': work.get('school_tier', ''),
+        '班主任年限': work.get('head_teacher_years', ''),
+        '管理职务': work.get('management_role', ''),
+        '非教空窗': work.get('non_teaching_gap', ''),
+        '海外工作': work.get('overseas_work_years', ''),
+        '荣誉称号': _join(achieve.get('honor_titles', [])),
+        '教学竞赛': _join(achieve.get('teaching_competition', [])),
+        '学术成果': _join(achieve.get('academic_results', [])),
+        'AI潜质分': ai_eval.get('potential_score', ''),
+    }
+
+
+def calculate_score(data: Dict, target_city: str = "") -> Tuple[int, str]:
+    """
+    简历评分算法 - 0410合并版
+    规则见 resume_core.rules.RULES_0410；批量评分直接用 score_rows，不要逐行调用本函数
+    返回: (总分, 评分详情)
+    """
+    scores, details = score_rows([score_fields(data)], target_city)
+    return int(scores[0]), details[0]
+
+
+# ============================
+# 结果处理
+# ============================
+def process_results(api_results: List[Dict], debug_mode: bool = False, target_city: str = "") -> Tuple[List[Dict], List[Dict]]:
+    """处理API结果，生成最终表格 - 0410合并版"""
+    final_results = []
+    need_review = []
+    scored_rows = []
+    schools = SchoolResolver()
+    
+    for result in api_results:
+        filename = result['filename']
+        api_data = result.get('api_result', {})
+        
+        if 'error' in api_data:
+            row = {
+                '文件名': filename,
+                '处理状态': '失败',
+                '错误信息': api_data['error'],
+            }
+            if debug_mode:
+                row['_debug_extracted_text'] = result.get('full_content', result.get('parsed_content', ''))
+                row['_debug_prompt'] = api_data.get('_debug_prompt', '')
+                row['_debug_raw_response'] = api_data.get('_debug_raw_response', '')
+            final_results.append(row)
+            continue
+        
+        basic = api_data.get('basic_info', {})
+        edu = api_data.get('education', {})
+        work = api_data.get('work_experience', {})
+        ai_eval = api_data.get('ai_assessment', {})
+        # 本地预提取的字段（调用大模型前已算好；旧任务日志里没有的现算）
+        local = (PreExtracted.from_dict(result['pre_extracted']) if result.get('pre_extracted')
+                 else pre_extract(result.get('full_content', ''), filename))
+        
+        # 姓名、性别、学科以大模型为准，缺失时用正文"姓名：""性别："或文件名中的；学科统一去掉"高中"等前缀
+        basic['name'] = basic.get('name') or local.name
+        basic['gender'] = basic.get('gender') or local.gender
+        basic['subject'] = strip_stage(basic.get('subject', '')) or local.subject
+        # 手机号、按出生年份算出（或正文写明）的年龄以本地为准
+        basic['phone'] = local.phone or basic.get('phone', '')
+        if local.age:
+            basic['age'] = local.age
+        # 学校名称大模型没给出时用本地按学历归类的结果；再统一解析为规范名称，名单内院校的层次以名单为准
+        for key in ('bachelor', 'master'):
+            edu[f'{key}_school'] = edu.get(f'{key}_school') or getattr(local, f'{key}_school')
+        schools.normalize_education(edu)
+        # 毕业年份只在本地找到的是同一所学校时填写
+        grad_years = {}
+        for key in ('bachelor', 'master'):
+            local_school = getattr(local, f'{key}_school')
+            same_school = local_school and local_school == edu[f'{key}_school']
+            grad_years[key] = (getattr(local, f'{key}_year') or '') if same_school else ''
+        
+        # 检查是否需要人工复核
+        needs_review = False
+        review_fields = []
+        for field_name, key in [('姓名', 'name'), ('性别', 'gender'), ('学科', 'subject')]:
+            val = basic.get(key, '')
+            if not val or val in ['null', 'None', '']:
+                needs_review = True
+                review_fields.append(field_name)
+        
+        # 0410 完整字段（删除敏感字样）
+        row = {
+            '文件名': filename,
+            '处理状态': '需复核' if needs_review else '成功',
+            # 基本信息
+            '姓名': basic.get('name', ''),
+            '手机号': basic.get('phone', ''),
+            '邮箱': local.email,
+            '性别': basic.get('gender', ''),
+            '年龄': basic.get('age', ''),
+            '出生年份': local.birth_year or '',
+            '任教学科': basic.get('subject', ''),
+            '婚姻状况': basic.get('marital_status', ''),
+            '现居地': basic.get('residence', ''),
+            # 教育背景
+            '高中层次': edu.get('high_school_tier', ''),
+            '本科学校': edu.get('bachelor_school', ''),
+            '本科层次': edu.get('bachelor_tier', ''),
+            '本科毕业年份': grad_years['bachelor'],
+            '硕士学校': edu.get('master_school', ''),
+            '硕士层次': edu.get('master_tier', ''),
+            '硕士毕业年份': grad_years['master'],
+            '海外留学': edu.get('study_abroad_years', ''),
+            '交换经历': edu.get('exchange_experience', ''),
+            # 工作经历
+            '现工作单位': work.get('current_company', ''),
+            '单位档次': work.get('school_tier', ''),
+            '教龄': work.get('teaching_years', ''),
+            '班主任年限': work.get('head_teacher_years', ''),
+            '管理职务': work.get('management_role', ''),
+            '非教空窗': work.get('non_teaching_gap', ''),
+            '海外工作': work.get('overseas_work_years', ''),
+            # 成就荣誉
+            '荣誉称号': _join(api_data.get('achievements', {}).get('honor_titles', '')),
+            '教学竞赛': _join(api_data.get('achievements', {}).get('teaching_competition', '')),
+            '学术成果': _join(api_data.get('achievements', {}).get('academic_results', '')),
+            # 评分（合并版）：整批算完后统一填入
+            '综合评分': 0,
+            '评分详情': '',
+            # AI评估
+            'AI评语': ai_eval.get('summary', ''),
+            '风险提示': ai_eval.get('risk_warning', ''),
+            'AI潜质分': ai_eval.get('potential_score', ''),
+            # 家庭信息
+            '配偶工作地': basic.get('partner_location', ''),
+            '父母背景': basic.get('parents_background', ''),
+            '需复核字段': ','.join(review_fields) if needs_review else ''
+        }
+        
+        if debug_mode:
+            row['_debug_extracted_text'] = result.get('full_content', result.get('parsed_content', ''))
+            row['_debug_prompt'] = api_data.get('_debug_prompt', '')
+            row['_debug_raw_response'] = api_data.get('_debug_raw_response', '')
+        
+        final_results.append(row)
+        scored_rows.append(row)
+        if needs_review:
+            need_review.append(row)
+    
+    # 整批向量化评分（规则表见 resume_core.rules）
+    scores, details = score_rows(scored_rows, target_city)
+    for row, total_score, score_logs in zip(scored_rows, scores, details):
+        row['综合评分'] = int(total_score)
+        row['评分详情'] = score_logs
+    
+    return final_results, need_review
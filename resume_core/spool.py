@@ -0,0 +1,140 @@
+"""
+磁盘暂存区（blob spool）：上传队列只保存文件句柄，不再把文件字节放进 st.session_state。
+
+- 按内容 SHA-256 寻址，同一会话内重复内容只落盘一次
+- 写入时边读边算哈希，上传文件只读一遍
+- 每个会话独立目录 + 配额，会话对象被回收（会话结束）或进程退出时自动删除目录
+- 解析器按需从磁盘读取，服务端内存只与正在处理的文件数量相关，与上传总量无关
+"""
+import os
+import time
+import uuid
+import shutil
+import hashlib
+import tempfile
+import weakref
+from typing import Dict, Union, BinaryIO
+
+SPOOL_ROOT = os.path.join(tempfile.gettempdir(), "resume_spool")
+DEFAULT_QUOTA_MB = 4096           # 单会话暂存上限
+STALE_SESSION_SECONDS = 12 * 3600  # 进程崩溃等原因遗留的会话目录，超过该时长未修改即清理
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class SpoolQuotaExceeded(Exception):
+    """会话暂存空间超出配额"""
+
+
+def _remove_dir(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+class BlobSpool:
+    """单个会话的内容寻址暂存区"""
+    def __init__(self, root: str = SPOOL_ROOT, session_id: str = None, quota_mb: int = DEFAULT_QUOTA_MB):
+        self.root = root
+        self.session_id = session_id or uuid.uuid4().hex
+        self.dir = os.path.join(root, self.session_id)
+        self.quota_bytes = int(quota_mb) * 1024 * 1024
+        self.used_bytes = 0
+        self._sizes: Dict[str, int] = {}
+        os.makedirs(self.dir, exist_ok=True)
+        self._sweep_stale()
+        # 会话结束（session_state 被释放）或进程退出时删除本会话目录
+        self._finalizer = weakref.finalize(self, _remove_dir, self.dir)
+
+    def _sweep_stale(self):
+        now = time.time()
+        try:
+            entries = os.listdir(self.root)
+        except OSError:
+            return
+        for name in entries:
+            path = os.path.join(self.root, name)
+            if name == self.session_id or not os.path.isdir(path):
+                continue
+            try:
+                if now - os.path.getmtime(path) > STALE_SESSION_SECONDS:
+                    _remove_dir(path)
+            except OSError:
+                continue
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.dir, sha256)
+
+    def put(self, source: Union[bytes, bytearray, BinaryIO]) -> Dict:
+        """
+        写入一份内容，返回句柄 {'sha256', 'size', 'blob'}。
+        source 可以是 bytes 或文件对象（分块读取，不会整体载入内存）。
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=".incoming-")
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if isinstance(source, (bytes, bytearray, memoryview)):
+                    chunks = (source[i:i + COPY_CHUNK_SIZE] for i in range(0, len(source), COPY_CHUNK_SIZE))
+                else:
+                    try:
+                        source.seek(0)
+                    except Exception:
+                        pass
+                    chunks = iter(lambda: source.read(COPY_CHUNK_SIZE), b'')
+                for chunk in chunks:
+                    size += len(chunk)
+                    if self.used_bytes + size > self.quota_bytes:
+                        raise SpoolQuotaExceeded(
+                            f"暂存空间超出配额 ({self.quota_bytes / 1024 / 1024:.0f}MB)，请先处理或清空队列")
+                    hasher.update(chunk)
+                    out.write(chunk)
+
+            sha256 = hasher.hexdigest()
+            final_path = self._path(sha256)
+            if sha256 in self._sizes or os.path.exists(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.replace(tmp_path, final_path)
+                self.used_bytes += size
+            self._sizes[sha256] = size
+            return {'sha256': sha256, 'size': size, 'blob': final_path}
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def release(self, sha256: str):
+        """删除一份不再需要的内容"""
+        size = self._sizes.pop(sha256, None)
+        try:
+            os.unlink(self._path(sha256))
+        except OSError:
+            return
+        if size:
+            self.used_bytes -= size
+
+    def clear(self):
+        """清空本会话暂存的全部内容（清空队列时调用）"""
+        for sha256 in list(self._sizes):
+            self.release(sha256)
+
+    def cleanup(self):
+        """立即删除整个会话目录"""
+        self._finalizer()
+
+
+def read_item_bytes(item: Dict) -> bytes:
+    """读取队列条目的文件内容：优先内存中的 bytes，否则从暂存区按需读取"""
+    data = item.get('bytes')
+    if data is not None:
+        return data
+    blob = item.get('blob')
+    if blob:
+        with open(blob, 'rb') as f:
+            return f.read()
+    return b''
+
+
+def item_size(item: Dict) -> int:
+    if item.get('bytes') is not None:
+        return len(item['bytes'])
+    return item.get('size', 0)
@@ -0,0 +1,296 @@
+"""
+候选人库：各批次的结果写入本地 SQLite，跨批次累积，可按学科、评分、手机号、上传日期查询。
+
+表结构：
+    runs        每次批处理一行：方案、提示词版本、模型、目标城市、文件数
+    files       每个简历文件（按内容哈希）一行：文件名、大小、首次上传时间、最近一次批次
+    candidates  提取出的字段：常用字段单独成列并建索引，完整结果行存 JSON
+    scores      评分：同一份简历每个分析方案保留最新一次评分；学科、上传时间冗余一份，
+                按 (方案, 学科, 评分) 等组合索引查询时不必回表
+
+同一份简历（内容哈希相同）再次处理时覆盖更新，首次上传时间不变；
+解析或提取失败的结果不会覆盖已有的成功结果。写入在一个事务内批量完成。
+"""
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_STORE_PATH = ".resume_store/candidates.db"
+STATUS_FAILED = '失败'
+STATUS_UNFINISHED = '未完成'    # 批次停止时还没解析完或没分析完的文件，只出现在本批结果表里
+
+# 结果行列名 -> candidates 表列名
+CANDIDATE_COLUMNS = {
+    '处理状态': 'status',
+    '姓名': 'name',
+    '手机号': 'phone',
+    '性别': 'gender',
+    '年龄': 'age',
+    '任教学科': 'subject',
+    '本科学校': 'bachelor_school',
+    '本科层次': 'bachelor_tier',
+    '硕士学校': 'master_school',
+    '硕士层次': 'master_tier',
+    '现工作单位': 'employer',
+    '教龄': 'teaching_years',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    created_at   REAL NOT NULL,
+    profile      TEXT,
+    prompt_key   TEXT,
+    model        TEXT,
+    target_city  TEXT,
+    files        INTEGER,
+    rows         INTEGER,
+    config       TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    sha256       TEXT PRIMARY KEY,
+    filename     TEXT NOT NULL,
+    size         INTEGER,
+    uploaded_at  REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    last_run_id  TEXT
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    sha256          TEXT PRIMARY KEY REFERENCES files(sha256),
+    run_id          TEXT,
+    status          TEXT,
+    name            TEXT,
+    phone           TEXT,
+    gender          TEXT,
+    age             TEXT,
+    subject         TEXT,
+    bachelor_school TEXT,
+    bachelor_tier   TEXT,
+    master_school   TEXT,
+    master_tier     TEXT,
+    employer        TEXT,
+    teaching_years  TEXT,
+    fields          TEXT,
+    updated_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    sha256       TEXT NOT NULL REFERENCES files(sha256),
+    profile      TEXT NOT NULL,
+    score        INTEGER,
+    detail       TEXT,
+    subject      TEXT,
+    uploaded_at  REAL,
+    target_city  TEXT,
+    run_id       TEXT,
+    scored_at    REAL NOT NULL,
+    PRIMARY KEY (sha256, profile)
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_subject ON candidates(subject);
+CREATE INDEX IF NOT EXISTS idx_candidates_phone ON candidates(phone);
+CREATE INDEX IF NOT EXISTS idx_files_uploaded_at ON files(uploaded_at);
+CREATE INDEX IF NOT EXISTS idx_scores_profile_score ON scores(profile, score, uploaded_at);
+CREATE INDEX IF NOT EXISTS idx_scores_profile_subject_score ON scores(profile, subject, score, uploaded_at);
+CREATE INDEX IF NOT EXISTS idx_scores_profile_uploaded_at ON scores(profile, uploaded_at);
+"""
+
+_UPSERT_FILE = """
+INSERT INTO files (sha256, filename, size, uploaded_at, last_seen, last_run_id)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(sha256) DO UPDATE SET
+    filename = excluded.filename, size = excluded.size,
+    last_seen = excluded.last_seen, last_run_id = excluded.last_run_id
+"""
+
+_CANDIDATE_FIELDS = ['sha256', 'run_id'] + list(CANDIDATE_COLUMNS.values()) + ['fields', 'updated_at']
+_UPSERT_CANDIDATE = f"""
+INSERT INTO candidates ({', '.join(_CANDIDATE_FIELDS)})
+VALUES ({', '.join('?' * len(_CANDIDATE_FIELDS))})
+ON CONFLICT(sha256) DO UPDATE SET
+    {', '.join(f'{c} = excluded.{c}' for c in _CANDIDATE_FIELDS[1:])}
+WHERE excluded.status != '{STATUS_FAILED}' OR candidates.status = '{STATUS_FAILED}'
+"""
+
+_UPSERT_SCORE = """
+INSERT INTO scores (sha256, profile, score, detail, subject, uploaded_at, target_city, run_id, scored_at)
+VALUES (?1, ?2, ?3, ?4, ?5, (SELECT uploaded_at FROM files WHERE sha256 = ?1), ?6, ?7, ?8)
+ON CONFLICT(sha256, profile) DO UPDATE SET
+    score = excluded.score, detail = excluded.detail, subject = excluded.subject,
+    target_city = excluded.target_city, run_id = excluded.run_id, scored_at = excluded.scored_at
+"""
+
+
+def normalize_phone(value) -> str:
+    """只保留数字，去掉 +86 前缀，便于按手机号精确查找"""
+    digits = ''.join(c for c in str(value or '') if c.isdigit())
+    if len(digits) == 13 and digits.startswith('86'):
+        digits = digits[2:]
+    return digits
+
+
+def _text(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value)
+    return str(value)
+
+
+def _score(value) -> Optional[int]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else int(number)
+
+
+def file_key(name: str) -> str:
+    """没有内容哈希的条目按文件名生成键"""
+    return 'name:' + hashlib.sha256(name.encode('utf-8')).hexdigest()
+
+
+class CandidateStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---------- 写入 ----------
+    def upsert_results(self, rows: Sequence[Dict], items: Sequence[Dict], run_id: str, profile: str,
+                       target_city: str = "", run_info: Dict = None) -> int:
+        """
+        批量写入一个批次的结果行（一个事务）。items 为队列条目，用于把文件名对应到内容哈希和大小。
+        run_info 可带 prompt_key / model / config，记入 runs 表。返回写入的行数。
+        """
+        by_name = {}
+        for item in items:
+            by_name[item['name']] = item
+            for dup in item.get('duplicate_names') or []:
+                by_name.setdefault(dup, item)
+        now = time.time()
+        file_rows, candidate_rows, score_rows = [], [], []
+        seen = set()
+        for row in rows:
+            filename = row.get('文件名', '')
+            item = by_name.get(filename, {})
+            sha = item.get('sha256') or file_key(filename)
+            if sha in seen:
+                continue
+            seen.add(sha)
+            file_rows.append((sha, filename, item.get('size'), now, now, run_id))
+            fields = {k: v for k, v in row.items() if not k.startswith('_debug_')}
+            values = {col: _text(row.get(key)) for key, col in CANDIDATE_COLUMNS.items()}
+            values['phone'] = normalize_phone(values['phone']) or None
+            candidate_rows.append((sha, run_id, *values.values(),
+                                   json.dumps(fields, ensure_ascii=False, default=str), now))
+            if row.get('处理状态') != STATUS_FAILED and _score(row.get('综合评分')) is not None:
+                score_rows.append((sha, profile, _score(row.get('综合评分')), _text(row.get('评分详情')),
+                                   values['subject'], target_city, run_id, now))
+        info = run_info or {}
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, created_at, profile, prompt_key, model, target_city, files, rows, config)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, now, profile, info.get('prompt_key'), info.get('model'), target_city,
+                 len(items), len(rows), json.dumps(info.get('config') or {}, ensure_ascii=False))
+            )
+            conn.executemany(_UPSERT_FILE, file_rows)
+            conn.executemany(_UPSERT_CANDIDATE, candidate_rows)
+            conn.executemany(_UPSERT_SCORE, score_rows)
+            conn.execute("PRAGMA optimize")
+        return len(candidate_rows)
+
+    # ---------- 查询 ----------
+    def search(self, subject: str = None, min_score: float = None, max_score: float = None,
+               since: float = None, until: float = None, phone: str = None, name: str = None,
+               profile: str = None, status: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        按条件查询历史候选人，按评分从高到低返回。
+        since / until 为上传时间（时间戳）；指定 profile 时走评分表的组合索引，
+        否则每个方案的评分各占一行（未评分的只有一行，评分为空）。
+        """
+        source, params = self._source(subject, min_score, max_score, since, until, phone, name, profile, status)
+        order = "s.uploaded_at" if profile else "f.uploaded_at"
+        sql = (
+            "SELECT f.sha256, f.filename, f.uploaded_at, c.status, c.name, c.phone, c.gender, c.age, c.subject,"
+            " c.bachelor_school, c.bachelor_tier, c.master_school, c.master_tier, c.employer, c.teaching_years,"
+            " s.profile, s.score, s.detail, c.run_id" + source +
+            f" ORDER BY s.score DESC, {order} DESC LIMIT ? OFFSET ?"
+        )
+        with closing(self._connect()) as conn:
+            return [dict(r) for r in conn.execute(sql, params + [limit, offset])]
+
+    def count(self, subject: str = None, min_score: float = None, max_score: float = None,
+              since: float = None, until: float = None, phone: str = None, name: str = None,
+              profile: str = None, status: str = None) -> int:
+        source, params = self._source(subject, min_score, max_score, since, until, phone, name, profile, status,
+                                      count_only=True)
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*)" + source, params).fetchone()[0]
+
+    @staticmethod
+    def _source(subject, min_score, max_score, since, until, phone, name, profile, status, count_only=False):
+        """
+        FROM ... WHERE 子句与参数；指定方案时从评分表出发，学科和上传时间用评分表上的冗余列。
+        只计数且不按候选人字段过滤时不连接其它表
+        """
+        if profile:
+            source = " FROM scores s"
+            if not count_only or phone or name or status:
+                source += " JOIN candidates c ON c.sha256 = s.sha256"
+            if not count_only:
+                source += " JOIN files f ON f.sha256 = s.sha256"
+            clauses, params = ["s.profile = ?"], [profile]
+            subject_col, uploaded_col = "s.subject", "s.uploaded_at"
+        else:
+            source = (" FROM candidates c JOIN files f ON f.sha256 = c.sha256"
+                      " LEFT JOIN scores s ON s.sha256 = c.sha256")
+            clauses, params = [], []
+            subject_col, uploaded_col = "c.subject", "f.uploaded_at"
+        for clause, value in (
+            (f"{subject_col} = ?", subject or None),
+            ("s.score >= ?", min_score),
+            ("s.score <= ?", max_score),
+            (f"{uploaded_col} >= ?", since),
+            (f"{uploaded_col} < ?", until),
+            ("c.phone = ?", normalize_phone(phone) if phone else None),
+            ("c.name = ?", name or None),
+            ("c.status = ?", status or None),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return source + (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def candidate(self, sha256: str) -> Optional[Dict]:
+        """一份简历的完整结果行（最近一次写入）"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT fields FROM candidates WHERE sha256 = ?", (sha256,)).fetchone()
+        return json.loads(row['fields']) if row else None
+
+    def subjects(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [r[0] for r in conn.execute(
+                "SELECT DISTINCT subject FROM candidates WHERE subject IS NOT NULL AND subject != '' ORDER BY subject")]
+
+    def stats(self) -> Dict:
+        with closing(self._connect()) as conn:
+            return {
+                'runs': conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0],
+                'files': conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+                'candidates': conn.execute("SELECT COUNT(*) FROM candidates WHERE status != ?", (STATUS_FAILED,)).fetchone()[0],
+            }